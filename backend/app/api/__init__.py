@@ -3,7 +3,7 @@ API 路由模块
 """
 
 from fastapi import APIRouter
-from app.api import auth, flash, upload, meeting, folder, contact, admin, ai_models, ai_prompts
+from app.api import auth, flash, upload, meeting, folder, contact, admin, ai_models, ai_prompts, search, stats
 
 # 创建主路由
 api_router = APIRouter()
@@ -15,6 +15,8 @@ api_router.include_router(meeting.router, prefix="/meeting", tags=["会议纪要
 api_router.include_router(upload.router, prefix="/upload", tags=["文件上传"])
 api_router.include_router(folder.router, tags=["知识库"])  # ✨新增
 api_router.include_router(contact.router, prefix="/contacts", tags=["联系人"])  # ✨新增
+api_router.include_router(search.router, prefix="/search", tags=["搜索"])
+api_router.include_router(stats.router, prefix="/stats", tags=["统计"])
 
 # 管理员相关路由 ✨新增
 api_router.include_router(admin.router)
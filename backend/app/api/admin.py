@@ -2,36 +2,44 @@
 管理员认证 API
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-import bcrypt
 from loguru import logger
 
 from app.database import get_db
-from app.models import AdminUser
+from app.models import AdminUser, User, TingwuTask
 from app.schemas import (
     AdminLoginRequest,
     AdminLoginResponse,
     AdminUserResponse,
+    UserStatusUpdate,
     ResponseModel
 )
 from app.utils.jwt import create_access_token
+from app.utils.auth_cache import auth_cache
+from app.utils.metrics import metrics
+from app.utils.db_pool import pool_status
+from app.utils.login_limiter import admin_login_limiter
+from app.utils.password import password_hasher, PasswordHasherBusy
+from app.services.admin_activity_service import admin_activity_service
+from app.services.job_queue import job_queue
 from app.dependencies import get_current_admin, get_current_superuser
 
 router = APIRouter(prefix="/admin", tags=["管理员"])
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（在密码线程池中执行，不阻塞事件循环）"""
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
 @router.post("/login", response_model=ResponseModel)
 async def admin_login(
     request: AdminLoginRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
@@ -39,12 +47,27 @@ async def admin_login(
     
     - **username**: 用户名
     - **password**: 密码
+    
+    同一用户名/IP 连续失败过多时返回 429
     """
+    client_ip = http_request.client.host if http_request.client else None
+    
+    # 限流检查在密码校验之前，被限流的请求不消耗 CPU；
+    # 本次尝试先计入失败次数，登录成功或非凭据原因失败时再撤销（使用 Redis 时在线程池中访问）
+    retry_after, attempt_id = await run_in_threadpool(admin_login_limiter.acquire, request.username, client_ip)
+    if retry_after:
+        logger.warning(f"管理员登录被限流: {request.username} ({client_ip})")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="登录失败次数过多，请稍后再试",
+            headers={"Retry-After": str(retry_after)}
+        )
+    
     try:
-        # 查询管理员
-        admin = db.query(AdminUser).filter(
-            AdminUser.username == request.username
-        ).first()
+        # 查询管理员（在线程池中查询，不阻塞事件循环）
+        admin = await run_in_threadpool(
+            db.query(AdminUser).filter(AdminUser.username == request.username).first
+        )
         
         if not admin:
             raise HTTPException(
@@ -53,7 +76,7 @@ async def admin_login(
             )
         
         # 验证密码
-        if not verify_password(request.password, admin.password_hash):
+        if not await verify_password(request.password, admin.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="用户名或密码错误"
@@ -61,11 +84,26 @@ async def admin_login(
         
         # 检查账号状态
         if not admin.is_active:
+            await run_in_threadpool(admin_login_limiter.release, request.username, client_ip, attempt_id)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="账号已被禁用"
             )
         
+        await run_in_threadpool(admin_login_limiter.reset, request.username, client_ip, attempt_id)
+        
+        # bcrypt cost 配置变化后用新 cost 重新哈希
+        if password_hasher.needs_rehash(admin.password_hash):
+            try:
+                admin.password_hash = await password_hasher.hash(request.password)
+                await run_in_threadpool(db.commit)
+                logger.info(f"管理员密码已按新 cost 重新哈希: {admin.username}")
+            except PasswordHasherBusy:
+                # 不影响本次登录，下次登录再重新哈希
+                db.rollback()
+        
+        admin_activity_service.touch(admin)
+        
         # 生成 Token（存储 admin_id）
         token = create_access_token({"sub": admin.id})
         
@@ -84,7 +122,16 @@ async def admin_login(
         
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        await run_in_threadpool(admin_login_limiter.release, request.username, client_ip, attempt_id)
+        logger.warning(f"管理员登录繁忙，密码校验排队已满: {request.username}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="登录繁忙，请稍后再试",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
+        await run_in_threadpool(admin_login_limiter.release, request.username, client_ip, attempt_id)
         logger.error(f"管理员登录失败: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -120,3 +167,111 @@ async def admin_logout(
         message="登出成功"
     )
 
+
+@router.put("/users/{user_id}/status", response_model=ResponseModel)
+def update_user_status(
+    user_id: str,
+    request: UserStatusUpdate,
+    admin: AdminUser = Depends(get_current_superuser),
+    db: Session = Depends(get_db)
+):
+    """
+    启用/停用小程序用户 ✨新增
+    
+    需要超级管理员权限；停用后立即清除该用户的认证缓存，后续请求返回 403
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="用户不存在"
+        )
+    
+    user.is_active = request.is_active
+    db.commit()
+    auth_cache.invalidate_user(user_id)
+    
+    logger.info(f"管理员 {admin.username} {'启用' if request.is_active else '停用'}用户: {user_id}")
+    
+    return ResponseModel(
+        code=200,
+        message="更新成功",
+        data={"user_id": user_id, "is_active": request.is_active}
+    )
+
+
+@router.get("/metrics", response_model=ResponseModel)
+async def get_metrics(
+    format: str = "json",
+    admin: AdminUser = Depends(get_current_admin)
+):
+    """
+    查看进程内指标（接口耗时、微信接口耗时等直方图）✨新增
+    
+    - **format**: json（默认，含 p50/p90/p99 估算）/ prometheus（文本格式）
+    
+    多进程部署时每个 worker 单独统计
+    """
+    if format == "prometheus":
+        return PlainTextResponse(metrics.render_prometheus())
+    
+    return ResponseModel(
+        code=200,
+        message="success",
+        data=metrics.snapshot()
+    )
+
+
+@router.get("/jobs", response_model=ResponseModel)
+def get_job_stats(
+    admin: AdminUser = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    查看后台任务队列状态 ✨新增
+    
+    - **counts**: 各类任务按状态（pending / running / succeeded / failed）的数量
+    - **running_here**: 本进程执行中的任务数，**concurrency**: 各类任务的并发上限
+    - **tingwu_tasks**: 等待通义听悟完成的任务数（由轮询线程统一查询）
+    """
+    data = job_queue.stats(db)
+    data["tingwu_tasks"] = db.query(func.count(TingwuTask.task_id)).scalar()
+    
+    return ResponseModel(
+        code=200,
+        message="success",
+        data=data
+    )
+
+
+@router.get("/db/pool", response_model=ResponseModel)
+async def get_db_pool_status(
+    admin: AdminUser = Depends(get_current_admin)
+):
+    """
+    查看数据库连接池状态 ✨新增
+    
+    - **pools**: 各引擎当前的常驻/借出/溢出连接数
+    - **metrics**: 取连接等待时间直方图、溢出连接和等待超时次数（进程启动以来）
+    - **replica**: 只读副本路由状态（最近一次测得的副本延迟、阈值），各路由原因计数见 metrics 中的 db_read_route_total
+    
+    等待时间 p99 升高或出现超时时，调大 DB_POOL_SIZE / DB_MAX_OVERFLOW（注意数据库总连接数 = worker 数 × 每进程连接数）
+    """
+    from app.database import engine, async_engine, replica_engine, replica_router
+    
+    db_metrics = metrics.snapshot(prefix="db_pool")
+    db_metrics["counters"].update(metrics.snapshot(prefix="db_read_route")["counters"])
+    
+    return ResponseModel(
+        code=200,
+        message="success",
+        data={
+            "pools": {
+                "primary": pool_status(engine),
+                "async": pool_status(async_engine.sync_engine if async_engine is not None else None),
+                "replica": pool_status(replica_engine),
+            },
+            "replica": replica_router.status(),
+            "metrics": db_metrics,
+        }
+    )
@@ -3,6 +3,7 @@ AI 模型管理 API
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import Optional
 from loguru import logger
@@ -33,7 +34,7 @@ user_router = APIRouter(prefix="/ai-models", tags=["AI模型"])
 # ============ 管理员接口 ============
 
 @admin_router.get("", response_model=ResponseModel)
-async def list_ai_models(
+def list_ai_models(
     skip: int = 0,
     limit: int = 100,
     provider: Optional[str] = None,
@@ -85,7 +86,7 @@ async def list_ai_models(
 
 
 @admin_router.post("", response_model=ResponseModel)
-async def create_ai_model(
+def create_ai_model(
     request: AIModelCreate,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
@@ -145,7 +146,7 @@ async def create_ai_model(
 
 
 @admin_router.get("/{model_id}", response_model=ResponseModel)
-async def get_ai_model(
+def get_ai_model(
     model_id: str,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
@@ -169,7 +170,7 @@ async def get_ai_model(
 
 
 @admin_router.put("/{model_id}", response_model=ResponseModel)
-async def update_ai_model(
+def update_ai_model(
     model_id: str,
     request: AIModelUpdate,
     db: Session = Depends(get_db),
@@ -221,7 +222,7 @@ async def update_ai_model(
 
 
 @admin_router.delete("/{model_id}", response_model=ResponseModel)
-async def delete_ai_model(
+def delete_ai_model(
     model_id: str,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
@@ -299,7 +300,7 @@ async def test_ai_model(
 # ============ 用户接口 ============
 
 @user_router.get("/available", response_model=ResponseModel)
-async def get_available_models(
+def get_available_models(
     db: Session = Depends(get_db),
     user = Depends(get_current_user)
 ):
@@ -362,8 +363,8 @@ async def chat_with_ai(
     - **max_tokens**: 最大token数（可选）
     """
     try:
-        # 获取 LLM 实例
-        llm = get_llm(model_id=request.model_id, db=db)
+        # 获取 LLM 实例（读取模型配置，放到线程池执行）
+        llm = await run_in_threadpool(get_llm, model_id=request.model_id, db=db)
         
         # 构建消息
         messages = []
@@ -23,7 +23,7 @@ router = APIRouter(prefix="/admin/ai-prompts", tags=["AI提示词管理"])
 
 
 @router.get("", response_model=ResponseModel)
-async def list_ai_prompts(
+def list_ai_prompts(
     skip: int = 0,
     limit: int = 100,
     scenario: Optional[str] = None,
@@ -76,7 +76,7 @@ async def list_ai_prompts(
 
 
 @router.post("", response_model=ResponseModel)
-async def create_ai_prompt(
+def create_ai_prompt(
     request: AIPromptCreate,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
@@ -134,7 +134,7 @@ async def create_ai_prompt(
 
 
 @router.get("/{prompt_id}", response_model=ResponseModel)
-async def get_ai_prompt(
+def get_ai_prompt(
     prompt_id: str,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
@@ -158,7 +158,7 @@ async def get_ai_prompt(
 
 
 @router.put("/{prompt_id}", response_model=ResponseModel)
-async def update_ai_prompt(
+def update_ai_prompt(
     prompt_id: str,
     request: AIPromptUpdate,
     db: Session = Depends(get_db),
@@ -213,7 +213,7 @@ async def update_ai_prompt(
 
 
 @router.delete("/{prompt_id}", response_model=ResponseModel)
-async def delete_ai_prompt(
+def delete_ai_prompt(
     prompt_id: str,
     db: Session = Depends(get_db),
     admin: AdminUser = Depends(get_current_admin)
@@ -3,6 +3,7 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime
 from loguru import logger
@@ -12,11 +13,46 @@ from app.models import User
 from app.dependencies import get_current_user
 from app.schemas import WeChatLoginRequest, LoginResponse, ResponseModel, UserResponse
 from app.utils.jwt import create_access_token
+from app.utils.auth_cache import auth_cache
 from app.utils.wechat import code2session
 
 router = APIRouter()
 
 
+def _upsert_user(db: Session, openid: str, unionid, login_data: WeChatLoginRequest):
+    """创建或更新登录用户（同步数据库操作，由登录接口放到线程池执行）"""
+    # 查询用户是否已存在
+    user = db.query(User).filter(User.openid == openid).first()
+    is_new_user = user is None
+    
+    if is_new_user:
+        # 创建新用户
+        user = User(
+            openid=openid,
+            unionid=unionid,
+            nickname=login_data.nickname,
+            avatar=login_data.avatar,
+            last_login=datetime.utcnow()
+        )
+        db.add(user)
+        logger.info(f"New user created: {openid}")
+    else:
+        # 更新用户信息
+        user.last_login = datetime.utcnow()
+        if login_data.nickname:
+            user.nickname = login_data.nickname
+        if login_data.avatar:
+            user.avatar = login_data.avatar
+        if unionid:
+            user.unionid = unionid
+        logger.info(f"User logged in: {openid}")
+    
+    db.commit()
+    db.refresh(user)
+    
+    return user, is_new_user
+
+
 @router.post("/login", response_model=ResponseModel)
 async def wechat_login(
     login_data: WeChatLoginRequest,
@@ -36,34 +72,11 @@ async def wechat_login(
         if not openid:
             raise HTTPException(status_code=400, detail="Invalid WeChat code")
         
-        # 查询用户是否已存在
-        user = db.query(User).filter(User.openid == openid).first()
-        is_new_user = user is None
-        
-        if is_new_user:
-            # 创建新用户
-            user = User(
-                openid=openid,
-                unionid=unionid,
-                nickname=login_data.nickname,
-                avatar=login_data.avatar,
-                last_login=datetime.utcnow()
-            )
-            db.add(user)
-            logger.info(f"New user created: {openid}")
-        else:
-            # 更新用户信息
-            user.last_login = datetime.utcnow()
-            if login_data.nickname:
-                user.nickname = login_data.nickname
-            if login_data.avatar:
-                user.avatar = login_data.avatar
-            if unionid:
-                user.unionid = unionid
-            logger.info(f"User logged in: {openid}")
+        # 创建或更新用户（数据库操作放到线程池，不阻塞事件循环）
+        user, is_new_user = await run_in_threadpool(_upsert_user, db, openid, unionid, login_data)
         
-        db.commit()
-        db.refresh(user)
+        # 昵称/头像可能已更新，刷新认证缓存中的用户快照
+        await auth_cache.call(auth_cache.set_user, user)
         
         # 生成 JWT Token
         access_token = create_access_token(data={"sub": user.id})
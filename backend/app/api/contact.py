@@ -10,7 +10,7 @@ from loguru import logger
 
 from app.database import get_db
 from app.models import User, Contact
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_read_db
 from app.schemas import (
     ContactCreate,
     ContactUpdate,
@@ -23,7 +23,7 @@ router = APIRouter()
 
 
 @router.post("/create", response_model=ResponseModel)
-async def create_contact(
+def create_contact(
     contact_data: ContactCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -72,9 +72,9 @@ async def create_contact(
 
 
 @router.get("/list", response_model=ResponseModel)
-async def get_contact_list(
+def get_contact_list(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     获取联系人列表
@@ -100,7 +100,7 @@ async def get_contact_list(
 
 
 @router.get("/{contact_id}", response_model=ResponseModel)
-async def get_contact_detail(
+def get_contact_detail(
     contact_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -124,7 +124,7 @@ async def get_contact_detail(
 
 
 @router.put("/{contact_id}", response_model=ResponseModel)
-async def update_contact(
+def update_contact(
     contact_id: int,
     contact_data: ContactUpdate,
     current_user: User = Depends(get_current_user),
@@ -165,7 +165,7 @@ async def update_contact(
 
 
 @router.delete("/{contact_id}", response_model=ResponseModel)
-async def delete_contact(
+def delete_contact(
     contact_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
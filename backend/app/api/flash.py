@@ -2,30 +2,38 @@
 闪记相关 API
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import Optional
 from loguru import logger
 import json
 
 from app.database import get_db
-from app.models import User, Flash
-from app.dependencies import get_current_user
+from app.models import User, Flash, FlashTag
+from app.dependencies import get_current_user, get_read_db
+from app.utils.pagination import apply_keyset, page_of
+from app.utils.etag import make_etag, etag_matches, not_modified, etag_headers
+from app.utils.responses import json_response
 from app.schemas import (
     FlashCreate,
     FlashUpdate,
     FlashResponse,
     FlashListResponse,
+    FlashBatchRequest,
+    BatchItemResult,
+    BatchResponse,
     ResponseModel
 )
 from app.services.ai_processor import process_flash_ai_async, check_flash_ai_status
+from app.services.search import search_service
+from app.services.embedding import embedding_service
+from app.services.stats_service import stats_service
 
 router = APIRouter()
 
 
 @router.post("/create", response_model=ResponseModel)
-async def create_flash(
+def create_flash(
     flash_data: FlashCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -50,8 +58,11 @@ async def create_flash(
         )
         
         db.add(flash)
+        stats_service.add_flash(db, flash)
         db.commit()
         db.refresh(flash)
+        search_service.index_flash(db, flash)
+        embedding_service.index_flash(db, flash)
         
         logger.info(f"Flash created: {flash.id} by user {current_user.id}")
         
@@ -78,19 +89,22 @@ async def create_flash(
 
 
 @router.get("/list", response_model=ResponseModel)
-async def get_flash_list(
+def get_flash_list(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     category: Optional[str] = Query(None, description="分类筛选"),
     keyword: Optional[str] = Query(None, description="关键词搜索"),
     is_favorite: Optional[bool] = Query(None, description="仅收藏"),
+    cursor: Optional[str] = Query(None, description="游标（上一页返回的 next_cursor），传入后忽略 page"),
+    with_total: bool = Query(True, description="是否统计总数，游标翻页时可传 false 省去 COUNT"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     获取闪记列表
     
     支持分页、分类筛选、关键词搜索、收藏筛选
+    支持游标翻页：按 (created_at, id) 定位，深度翻页与第一页成本相同
     """
     try:
         # 构建查询
@@ -112,39 +126,144 @@ async def get_flash_list(
             )
         
         # 总数
-        total = query.count()
+        total = query.count() if with_total else None
         
-        # 分页
-        flashes = query.order_by(desc(Flash.created_at))\
-            .offset((page - 1) * page_size)\
-            .limit(page_size)\
-            .all()
+        # 排序（id 作为最后的排序键，保证顺序稳定、游标唯一）
+        sort_columns = (Flash.created_at, Flash.id)
+        try:
+            query = apply_keyset(query, sort_columns, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        return ResponseModel(
-            code=200,
-            message="success",
-            data=FlashListResponse(
-                total=total,
-                page=page,
-                page_size=page_size,
-                items=[FlashResponse.from_orm(f) for f in flashes]
+        if not cursor:
+            query = query.offset((page - 1) * page_size)
+        
+        # 分页（多取一条用于判断是否还有下一页）
+        flashes = query.limit(page_size + 1).all()
+        flashes, has_more, next_cursor = page_of(
+            flashes, page_size,
+            key=lambda f: [f.created_at, f.id]
+        )
+        
+        return json_response(
+            ResponseModel(
+                code=200,
+                message="success",
+                data=FlashListResponse(
+                    total=total,
+                    page=page,
+                    page_size=page_size,
+                    items=[FlashResponse.from_orm(f) for f in flashes],
+                    has_more=has_more,
+                    next_cursor=next_cursor
+                )
             )
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get flash list error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/batch", response_model=ResponseModel)
+def batch_flashes(
+    batch: FlashBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    批量操作闪记 ✨新增
+
+    支持 favorite / unfavorite / delete，
+    一次请求只做一条按用户限定的 UPDATE/DELETE，单个事务提交，返回每个ID的结果
+    """
+    ids = list(dict.fromkeys(batch.ids))
+
+    # 只读取统计扣减需要的小字段
+    owned = db.query(Flash.id, Flash.user_id, Flash.created_at, Flash.audio_duration, Flash.category).filter(
+        Flash.user_id == current_user.id,
+        Flash.id.in_(ids)
+    ).all()
+    owned_ids = [row.id for row in owned]
+
+    try:
+        if owned_ids:
+            scope = db.query(Flash).filter(
+                Flash.user_id == current_user.id,
+                Flash.id.in_(owned_ids)
+            )
+
+            if batch.action == "delete":
+                stats_service.remove_many(db, "flash", owned)
+                db.query(FlashTag).filter(
+                    FlashTag.flash_id.in_(owned_ids)
+                ).delete(synchronize_session=False)
+                scope.delete(synchronize_session=False)
+            else:
+                value = batch.action == "favorite"
+                # 只更新值有变化的行，批量 UPDATE 不触发 before_update，需手动递增版本号
+                scope.filter(Flash.is_favorite != value).update(
+                    {Flash.is_favorite: value, Flash.version: Flash.version + 1},
+                    synchronize_session=False
+                )
+
+            db.commit()
+
+        if batch.action == "delete" and owned_ids:
+            search_service.remove_many(db, "flash", owned_ids)
+            embedding_service.remove_many(db, "flash", owned_ids)
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Batch flash error: action={batch.action}, {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    owned_set = set(owned_ids)
+    results = [
+        BatchItemResult(id=flash_id, success=True) if flash_id in owned_set
+        else BatchItemResult(id=flash_id, success=False, error="闪记不存在")
+        for flash_id in ids
+    ]
+
+    logger.info(f"Flash batch {batch.action}: user={current_user.id}, {len(owned_ids)}/{len(ids)}")
+
+    return ResponseModel(
+        code=200,
+        message="批量操作完成",
+        data=BatchResponse(
+            action=batch.action,
+            succeeded=len(owned_ids),
+            failed=len(ids) - len(owned_ids),
+            results=results
+        )
+    )
+
+
 @router.get("/{flash_id}", response_model=ResponseModel)
-async def get_flash_detail(
+def get_flash_detail(
     flash_id: str,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     获取闪记详情
+    
+    支持条件请求：携带上次响应的 ETag 作为 If-None-Match，未修改时返回 304
     """
+    if if_none_match:
+        # 只查询版本号，命中时不加载正文
+        version = db.query(Flash.version).filter(
+            Flash.id == flash_id,
+            Flash.user_id == current_user.id
+        ).scalar()
+        if version is not None:
+            etag = make_etag("flash", flash_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    
     flash = db.query(Flash).filter(
         Flash.id == flash_id,
         Flash.user_id == current_user.id
@@ -153,15 +272,18 @@ async def get_flash_detail(
     if not flash:
         raise HTTPException(status_code=404, detail="闪记不存在")
     
-    return ResponseModel(
-        code=200,
-        message="success",
-        data=FlashResponse.from_orm(flash)
+    return json_response(
+        ResponseModel(
+            code=200,
+            message="success",
+            data=FlashResponse.from_orm(flash)
+        ),
+        headers=etag_headers(make_etag("flash", flash.id, flash.version))
     )
 
 
 @router.put("/{flash_id}", response_model=ResponseModel)
-async def update_flash(
+def update_flash(
     flash_id: str,
     flash_data: FlashUpdate,
     current_user: User = Depends(get_current_user),
@@ -181,14 +303,18 @@ async def update_flash(
     try:
         # 更新字段
         update_data = flash_data.dict(exclude_unset=True)
+        old_category = flash.category
         for field, value in update_data.items():
             # keywords 需要转换为 JSON 字符串
             if field == 'keywords' and value is not None:
                 value = json.dumps(value, ensure_ascii=False)
             setattr(flash, field, value)
+        stats_service.recategorize_flash(db, flash, old_category)
         
         db.commit()
         db.refresh(flash)
+        search_service.index_flash(db, flash)
+        embedding_service.index_flash(db, flash)
         
         logger.info(f"Flash updated: {flash_id}")
         
@@ -205,7 +331,7 @@ async def update_flash(
 
 
 @router.delete("/{flash_id}", response_model=ResponseModel)
-async def delete_flash(
+def delete_flash(
     flash_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -222,8 +348,11 @@ async def delete_flash(
         raise HTTPException(status_code=404, detail="闪记不存在")
     
     try:
+        stats_service.remove_flash(db, flash)
         db.delete(flash)
         db.commit()
+        search_service.remove(db, "flash", flash_id)
+        embedding_service.remove(db, "flash", flash_id)
         
         logger.info(f"Flash deleted: {flash_id}")
         
@@ -240,7 +369,7 @@ async def delete_flash(
 
 
 @router.put("/{flash_id}/favorite", response_model=ResponseModel)
-async def toggle_favorite(
+def toggle_favorite(
     flash_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -274,7 +403,7 @@ async def toggle_favorite(
 
 
 @router.get("/{flash_id}/ai-status", response_model=ResponseModel)
-async def get_flash_ai_status(
+def get_flash_ai_status(
     flash_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -5,18 +5,18 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, get_read_db
 from app.models import User, Folder, Meeting
 from app.schemas import FolderCreate, FolderUpdate, FolderResponse, FolderListResponse, ResponseModel
+from app.services.folder_count_service import folder_count_service
 
 router = APIRouter(prefix="/folders", tags=["folders"])
 
 
 @router.post("", response_model=ResponseModel)
-async def create_folder(
+def create_folder(
     data: FolderCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -58,42 +58,33 @@ async def create_folder(
 
 
 @router.get("", response_model=ResponseModel)
-async def get_folders(
+def get_folders(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """获取知识库列表（带会议数量统计）"""
 
-    # 查询所有知识库，并关联统计会议数量
-    folders_with_count = db.query(
-        Folder,
-        func.count(Meeting.id).label('meeting_count')
-    ).outerjoin(
-        Meeting,
-        (Meeting.folder_id == Folder.id) & (Meeting.user_id == current_user.id)
+    # 会议数量直接读取冗余计数，不再关联会议表统计
+    folders = db.query(
+        Folder.id, Folder.name, Folder.meeting_count, Folder.created_at
     ).filter(
         Folder.user_id == current_user.id
-    ).group_by(
-        Folder.id
     ).order_by(
         Folder.created_at.desc()
     ).all()
 
     # 构建响应
     items = []
-    for folder, count in folders_with_count:
+    for folder in folders:
         items.append(FolderResponse(
             id=folder.id,
             name=folder.name,
-            count=count,
+            count=max(folder.meeting_count, 0),
             created_at=folder.created_at
         ))
 
-    # 统计未分类的会议数量（folder_id 为 NULL）
-    uncategorized_count = db.query(func.count(Meeting.id)).filter(
-        Meeting.user_id == current_user.id,
-        Meeting.folder_id == None
-    ).scalar() or 0
+    # 未分类的会议数量（folder_id 为 NULL）
+    uncategorized_count = folder_count_service.get_uncategorized_count(db, current_user.id)
 
     response = FolderListResponse(items=items)
 
@@ -108,7 +99,7 @@ async def get_folders(
 
 
 @router.get("/{folder_id}", response_model=ResponseModel)
-async def get_folder(
+def get_folder(
     folder_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -124,16 +115,10 @@ async def get_folder(
     if not folder:
         raise HTTPException(status_code=404, detail="知识库不存在")
     
-    # 统计会议数量
-    count = db.query(func.count(Meeting.id)).filter(
-        Meeting.folder_id == folder_id,
-        Meeting.user_id == current_user.id
-    ).scalar()
-    
     response = FolderResponse(
         id=folder.id,
         name=folder.name,
-        count=count or 0,
+        count=max(folder.meeting_count, 0),
         created_at=folder.created_at
     )
     
@@ -145,7 +130,7 @@ async def get_folder(
 
 
 @router.put("/{folder_id}", response_model=ResponseModel)
-async def update_folder(
+def update_folder(
     folder_id: int,
     data: FolderUpdate,
     current_user: User = Depends(get_current_user),
@@ -177,16 +162,10 @@ async def update_folder(
     db.commit()
     db.refresh(folder)
     
-    # 统计会议数量
-    count = db.query(func.count(Meeting.id)).filter(
-        Meeting.folder_id == folder_id,
-        Meeting.user_id == current_user.id
-    ).scalar()
-    
     response = FolderResponse(
         id=folder.id,
         name=folder.name,
-        count=count or 0,
+        count=max(folder.meeting_count, 0),
         created_at=folder.created_at
     )
     
@@ -198,7 +177,7 @@ async def update_folder(
 
 
 @router.delete("/{folder_id}", response_model=ResponseModel)
-async def delete_folder(
+def delete_folder(
     folder_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -214,7 +193,18 @@ async def delete_folder(
     if not folder:
         raise HTTPException(status_code=404, detail="知识库不存在")
     
-    # 删除知识库（由于设置了 ondelete="SET NULL"，相关会议的 folder_id 会自动置空）
+    # 先把会议移到未分类（不依赖数据库外键 SET NULL，SQLite 默认不启用外键约束）
+    # 批量 UPDATE 不触发 before_update，需手动递增版本号
+    moved = db.query(Meeting).filter(
+        Meeting.folder_id == folder_id,
+        Meeting.user_id == current_user.id
+    ).update(
+        {Meeting.folder_id: None, Meeting.version: Meeting.version + 1},
+        synchronize_session=False
+    )
+    folder_count_service.apply(db, current_user.id, {None: moved})
+    
+    # 删除知识库
     db.delete(folder)
     db.commit()
     
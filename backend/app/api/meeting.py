@@ -2,40 +2,78 @@
 会议纪要相关 API
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, joinedload
 from typing import Optional
 from loguru import logger
 import json
 
-from app.database import get_db
-from app.models import User, Meeting, MeetingStatus, MeetingSpeaker, Contact
-from app.dependencies import get_current_user
+from app.database import get_db, get_async_db, fetch_first
+from app.models import User, Meeting, MeetingStatus, MeetingSpeaker, Contact, Folder, release_meeting_contents
+from app.dependencies import get_current_user, get_read_db
+from app.utils.pagination import apply_keyset, page_of
+from app.utils.etag import make_etag, etag_matches, not_modified, etag_headers
+from app.utils.responses import json_response
 from app.schemas import (
     MeetingCreate,
     MeetingUpdate,
     MeetingResponse,
+    MeetingListItem,
     MeetingListResponse,
     MeetingStatusResponse,
+    TranscriptParagraph,
+    TranscriptParagraphListResponse,
     GenerateSummaryRequest,
     SpeakerMapRequest,
+    SpeakerBatchMapRequest,
     SpeakerResponse,
     SpeakerListResponse,
     ContactResponse,
+    MeetingBatchRequest,
+    BatchItemResult,
+    BatchResponse,
     ResponseModel
 )
 from app.services.meeting_processor import (
     process_meeting_transcription_async,
     process_meeting_summary_async,
-    check_meeting_ai_status
+    meeting_status_info,
+    meeting_status_columns
 )
+from app.services.transcript_service import get_transcript_index
+from app.services.search import search_service
+from app.services.embedding import embedding_service
+from app.services.stats_service import stats_service
+from app.services.folder_count_service import folder_count_service
 
 router = APIRouter()
 
 
+# 列表卡片所需的列：列表接口只查询这些列，transcript 等大字段仅由详情接口返回
+MEETING_LIST_COLUMNS = (
+    Meeting.id,
+    Meeting.title,
+    Meeting.participants,
+    Meeting.meeting_date,
+    Meeting.audio_url,
+    Meeting.audio_duration,
+    Meeting.is_favorite,
+    Meeting.is_viewed,
+    Meeting.tags,
+    Meeting.folder_id,
+    Meeting.status,
+    Meeting.created_at,
+)
+
+# 是否已有转录：只看自身列和 content_id（共享内容只为有内容的会议创建），
+# 不使用 Meeting.transcript 的 COALESCE 表达式（每行一个关联子查询）
+HAS_TRANSCRIPT = or_(Meeting._transcript.isnot(None), Meeting.content_id.isnot(None)).label("has_transcript")
+
+
 @router.post("/create", response_model=ResponseModel)
-async def create_meeting(
+def create_meeting(
     meeting_data: MeetingCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -60,8 +98,12 @@ async def create_meeting(
         )
 
         db.add(meeting)
+        stats_service.add_meeting(db, meeting)
+        folder_count_service.add_meeting(db, meeting)
         db.commit()
         db.refresh(meeting)
+        search_service.index_meeting(db, meeting)
+        embedding_service.index_meeting(db, meeting)
 
         logger.info(f"Meeting created: {meeting.id} by user {current_user.id}")
 
@@ -78,24 +120,32 @@ async def create_meeting(
 
 
 @router.get("/list", response_model=ResponseModel)
-async def get_meeting_list(
+def get_meeting_list(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     status: Optional[str] = Query(None, description="状态筛选"),
     is_favorite: Optional[bool] = Query(None, description="收藏筛选"),
     folder_id: Optional[str] = Query(None, description="知识库ID筛选，传 'uncategorized' 查询未分类"),  # ✨新增
     sort_by: Optional[str] = Query("time", description="排序方式: time/favorite"),
+    cursor: Optional[str] = Query(None, description="游标（上一页返回的 next_cursor），传入后忽略 page"),
+    with_total: bool = Query(True, description="是否统计总数，游标翻页时可传 false 省去 COUNT"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     获取会议纪要列表
 
     支持分页、状态筛选、收藏筛选、知识库筛选、排序
+    列表项只包含卡片展示所需字段，完整转录/摘要请通过详情接口获取
     folder_id 参数：
     - None: 查询所有会议
     - 'uncategorized': 查询未分类的会议（folder_id 为 NULL）
     - 数字ID: 查询指定知识库的会议
+
+    翻页方式：
+    - page: 传统页码翻页
+    - cursor: 游标翻页，按 (created_at, id) 或 (is_favorite, created_at, id) 定位，
+      深度翻页与第一页成本相同；配合 with_total=false 可避免每次 COUNT
     """
     try:
         # 构建查询
@@ -127,46 +177,189 @@ async def get_meeting_list(
                     pass  # 忽略无效的 folder_id
         
         # 总数
-        total = query.count()
+        total = query.count() if with_total else None
         
-        # 排序
+        # 排序（id 作为最后的排序键，保证顺序稳定、游标唯一）
         if sort_by == "favorite":
             # 收藏优先，然后按时间倒序
-            query = query.order_by(desc(Meeting.is_favorite), desc(Meeting.created_at))
+            sort_columns = (Meeting.is_favorite, Meeting.created_at, Meeting.id)
         else:
             # 默认按时间倒序
-            query = query.order_by(desc(Meeting.created_at))
+            sort_columns = (Meeting.created_at, Meeting.id)
         
-        # 分页
-        meetings = query.offset((page - 1) * page_size)\
-            .limit(page_size)\
+        try:
+            query = apply_keyset(query, sort_columns, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if not cursor:
+            query = query.offset((page - 1) * page_size)
+        
+        # 分页（仅加载列表卡片所需的列，has_transcript 在数据库中计算，不读取转录文本）
+        # 多取一条用于判断是否还有下一页
+        rows = query.options(load_only(*MEETING_LIST_COLUMNS))\
+            .add_columns(HAS_TRANSCRIPT)\
+            .limit(page_size + 1)\
             .all()
         
-        return ResponseModel(
-            code=200,
-            message="success",
-            data=MeetingListResponse(
-                total=total,
-                page=page,
-                page_size=page_size,
-                items=[MeetingResponse.from_orm(m) for m in meetings]
+        rows, has_more, next_cursor = page_of(
+            rows, page_size,
+            key=lambda row: [getattr(row[0], col.key) for col in sort_columns]
+        )
+        
+        return json_response(
+            ResponseModel(
+                code=200,
+                message="success",
+                data=MeetingListResponse(
+                    total=total,
+                    page=page,
+                    page_size=page_size,
+                    items=[MeetingListItem.from_orm(m, has_transcript=has_transcript) for m, has_transcript in rows],
+                    has_more=has_more,
+                    next_cursor=next_cursor
+                )
             )
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get meeting list error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/batch", response_model=ResponseModel)
+def batch_meetings(
+    batch: MeetingBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    批量操作会议纪要 ✨新增
+
+    支持 move / favorite / unfavorite / mark_viewed / delete，
+    一次请求只做一条按用户限定的 UPDATE/DELETE，单个事务提交，返回每个ID的结果
+    """
+    ids = list(dict.fromkeys(batch.ids))
+
+    if batch.action == "move" and batch.folder_id is not None:
+        folder_exists = db.query(Folder.id).filter(
+            Folder.id == batch.folder_id,
+            Folder.user_id == current_user.id
+        ).first()
+        if not folder_exists:
+            raise HTTPException(status_code=404, detail="知识库不存在")
+
+    # 只读取统计/计数需要的小字段
+    owned = db.query(
+        Meeting.id, Meeting.user_id, Meeting.folder_id, Meeting.content_id, Meeting.created_at, Meeting.audio_duration
+    ).filter(
+        Meeting.user_id == current_user.id,
+        Meeting.id.in_(ids)
+    ).all()
+    owned_ids = [row.id for row in owned]
+
+    try:
+        if owned_ids:
+            scope = db.query(Meeting).filter(
+                Meeting.user_id == current_user.id,
+                Meeting.id.in_(owned_ids)
+            )
+
+            if batch.action == "delete":
+                stats_service.remove_many(db, "meeting", owned)
+                folder_count_service.apply(
+                    db, current_user.id,
+                    folder_count_service.deltas_for_removal(row.folder_id for row in owned)
+                )
+                db.query(MeetingSpeaker).filter(
+                    MeetingSpeaker.meeting_id.in_(owned_ids)
+                ).delete(synchronize_session=False)
+                scope.delete(synchronize_session=False)
+                # 批量 DELETE 不经过 ORM 事件，需自行清理不再被引用的共享内容
+                release_meeting_contents(db, [row.content_id for row in owned])
+            else:
+                if batch.action == "move":
+                    column, value = Meeting.folder_id, batch.folder_id
+                elif batch.action == "mark_viewed":
+                    column, value = Meeting.is_viewed, True
+                else:
+                    column, value = Meeting.is_favorite, batch.action == "favorite"
+
+                # 只更新值有变化的行，批量 UPDATE 不触发 before_update，需手动递增版本号
+                if value is None:
+                    changed = column.isnot(None)
+                else:
+                    changed = or_(column.is_(None), column != value)
+                scope.filter(changed).update(
+                    {column: value, Meeting.version: Meeting.version + 1},
+                    synchronize_session=False
+                )
+
+                if batch.action == "move":
+                    moved = [row.folder_id for row in owned if row.folder_id != batch.folder_id]
+                    deltas = folder_count_service.deltas_for_removal(moved)
+                    if moved:
+                        deltas[batch.folder_id] = deltas.get(batch.folder_id, 0) + len(moved)
+                    folder_count_service.apply(db, current_user.id, deltas)
+
+            db.commit()
+
+        if batch.action == "delete" and owned_ids:
+            search_service.remove_many(db, "meeting", owned_ids)
+            embedding_service.remove_many(db, "meeting", owned_ids)
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Batch meeting error: action={batch.action}, {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    owned_set = set(owned_ids)
+    results = [
+        BatchItemResult(id=meeting_id, success=True) if meeting_id in owned_set
+        else BatchItemResult(id=meeting_id, success=False, error="会议纪要不存在")
+        for meeting_id in ids
+    ]
+
+    logger.info(f"Meeting batch {batch.action}: user={current_user.id}, {len(owned_ids)}/{len(ids)}")
+
+    return ResponseModel(
+        code=200,
+        message="批量操作完成",
+        data=BatchResponse(
+            action=batch.action,
+            succeeded=len(owned_ids),
+            failed=len(ids) - len(owned_ids),
+            results=results
+        )
+    )
+
+
 @router.get("/{meeting_id}", response_model=ResponseModel)
-async def get_meeting_detail(
+def get_meeting_detail(
     meeting_id: str,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     获取会议纪要详情
+    
+    支持条件请求：携带上次响应的 ETag 作为 If-None-Match，未修改时返回 304，
+    不加载转录/摘要等大字段
     """
+    if if_none_match:
+        # 只查询版本号（走主键索引），命中时不读取大字段
+        version = db.query(Meeting.version).filter(
+            Meeting.id == meeting_id,
+            Meeting.user_id == current_user.id
+        ).scalar()
+        if version is not None:
+            etag = make_etag("meeting", meeting_id, version)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+    
     meeting = db.query(Meeting).filter(
         Meeting.id == meeting_id,
         Meeting.user_id == current_user.id
@@ -175,15 +368,84 @@ async def get_meeting_detail(
     if not meeting:
         raise HTTPException(status_code=404, detail="会议纪要不存在")
     
-    return ResponseModel(
-        code=200,
-        message="success",
-        data=MeetingResponse.from_orm(meeting)
+    # ETag 取自实际返回的这一行，避免两次查询之间被更新导致版本错配
+    return json_response(
+        ResponseModel(
+            code=200,
+            message="success",
+            data=MeetingResponse.from_orm(meeting)
+        ),
+        headers=etag_headers(make_etag("meeting", meeting.id, meeting.version))
     )
 
 
+@router.get("/{meeting_id}/paragraphs", response_model=ResponseModel)
+def get_meeting_paragraphs(
+    meeting_id: str,
+    start_ms: Optional[int] = Query(None, ge=0, description="时间窗口起点（毫秒，含）"),
+    end_ms: Optional[int] = Query(None, ge=0, description="时间窗口终点（毫秒，不含）"),
+    offset: int = Query(0, ge=0, description="跳过的段落数（在时间/说话人过滤之后）"),
+    limit: int = Query(50, ge=1, le=200, description="返回的段落数"),
+    speaker_id: Optional[str] = Query(None, description="说话人ID筛选，多个用逗号分隔"),
+    include_words: bool = Query(False, description="是否返回词级数据"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    分段获取会议转录段落
+
+    播放页按需加载：按 [start_ms, end_ms) 时间窗口或 offset/limit 段落范围读取，
+    可按说话人过滤，词级数据仅在 include_words=true 时返回
+    """
+    if start_ms is not None and end_ms is not None and end_ms <= start_ms:
+        raise HTTPException(status_code=400, detail="end_ms 必须大于 start_ms")
+
+    # 只查询行版本：段落索引按 (会议ID, 版本) 缓存，命中时不读取段落大字段
+    version = db.query(Meeting.version).filter(
+        Meeting.id == meeting_id,
+        Meeting.user_id == current_user.id
+    ).scalar()
+
+    if version is None:
+        raise HTTPException(status_code=404, detail="会议纪要不存在")
+
+    try:
+        index = get_transcript_index(
+            meeting_id,
+            version,
+            lambda: db.query(Meeting.transcript_paragraphs).filter(Meeting.id == meeting_id).scalar()
+        )
+        speaker_ids = {s.strip() for s in speaker_id.split(',') if s.strip()} if speaker_id else None
+        matched = index.select(start_ms=start_ms, end_ms=end_ms, speaker_ids=speaker_ids)
+        total = len(matched)
+        items = [
+            TranscriptParagraph(**index.to_item(i, include_words=include_words))
+            for i in matched[offset:offset + limit]
+        ]
+
+        next_offset = offset + len(items)
+        has_more = next_offset < total
+
+        return ResponseModel(
+            code=200,
+            message="success",
+            data=TranscriptParagraphListResponse(
+                total=total,
+                offset=offset,
+                limit=limit,
+                has_more=has_more,
+                next_offset=next_offset if has_more else None,
+                items=items
+            )
+        )
+
+    except Exception as e:
+        logger.error(f"Get meeting paragraphs error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/{meeting_id}", response_model=ResponseModel)
-async def update_meeting(
+def update_meeting(
     meeting_id: str,
     meeting_data: MeetingUpdate,
     current_user: User = Depends(get_current_user),
@@ -203,15 +465,24 @@ async def update_meeting(
     try:
         # 更新字段
         update_data = meeting_data.dict(exclude_unset=True)
+        old_folder_id = meeting.folder_id
         for field, value in update_data.items():
             # participants 需要转换为 JSON 字符串
             if field == 'participants' and value is not None:
                 value = json.dumps(value, ensure_ascii=False)
             setattr(meeting, field, value)
         
+        if "folder_id" in update_data:
+            folder_count_service.move_meeting(db, current_user.id, old_folder_id, meeting.folder_id)
+        
         db.commit()
         db.refresh(meeting)
         
+        # 仅在可检索字段变化时重建索引（移动知识库、改日期无需重新分词）
+        if update_data.keys() & {"title", "participants", "summary"}:
+            search_service.index_meeting(db, meeting)
+            embedding_service.index_meeting(db, meeting)
+        
         logger.info(f"Meeting updated: {meeting_id}")
         
         return ResponseModel(
@@ -227,7 +498,7 @@ async def update_meeting(
 
 
 @router.delete("/{meeting_id}", response_model=ResponseModel)
-async def delete_meeting(
+def delete_meeting(
     meeting_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -244,8 +515,12 @@ async def delete_meeting(
         raise HTTPException(status_code=404, detail="会议纪要不存在")
     
     try:
+        stats_service.remove_meeting(db, meeting)
+        folder_count_service.remove_meeting(db, meeting)
         db.delete(meeting)
         db.commit()
+        search_service.remove(db, "meeting", meeting_id)
+        embedding_service.remove(db, "meeting", meeting_id)
         
         logger.info(f"Meeting deleted: {meeting_id}")
         
@@ -262,7 +537,7 @@ async def delete_meeting(
 
 
 @router.put("/{meeting_id}/favorite", response_model=ResponseModel)
-async def toggle_meeting_favorite(
+def toggle_meeting_favorite(
     meeting_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -299,7 +574,7 @@ async def toggle_meeting_favorite(
 
 
 @router.post("/{meeting_id}/copy", response_model=ResponseModel)
-async def copy_meeting(
+def copy_meeting(
     meeting_id: str,
     copy_data: dict,
     current_user: User = Depends(get_current_user),
@@ -308,12 +583,18 @@ async def copy_meeting(
     """
     复制会议纪要到指定知识库
     
+    副本与原会议共享同一条只读内容记录（转录、摘要、思维导图、要点、行动项），
+    只单独保存标题、知识库、收藏、已查看等元数据；任一方修改内容时才各自拷贝（写时复制）。
+    因此复制耗时与占用空间与转录长度无关，响应只返回副本的列表卡片字段
+    
     Args:
         meeting_id: 要复制的会议ID
         copy_data: {"folder_id": int | null}
     """
-    # 查找原会议
-    original_meeting = db.query(Meeting).filter(
+    # 查找原会议（不加载内容大字段）
+    original_meeting = db.query(Meeting).options(
+        load_only(*MEETING_LIST_COLUMNS, Meeting.user_id, Meeting.ai_model_id, Meeting.content_id)
+    ).filter(
         Meeting.id == meeting_id,
         Meeting.user_id == current_user.id
     ).first()
@@ -322,7 +603,7 @@ async def copy_meeting(
         raise HTTPException(status_code=404, detail="会议纪要不存在")
     
     try:
-        # 创建新的会议副本
+        # 创建新的会议副本，引用共享内容
         new_meeting = Meeting(
             user_id=current_user.id,
             folder_id=copy_data.get('folder_id'),
@@ -331,27 +612,32 @@ async def copy_meeting(
             meeting_date=original_meeting.meeting_date,
             audio_url=original_meeting.audio_url,
             audio_duration=original_meeting.audio_duration,
-            transcript=original_meeting.transcript,
-            summary=original_meeting.summary,
-            conversational_summary=original_meeting.conversational_summary,
-            mind_map=original_meeting.mind_map,
-            key_points=original_meeting.key_points,
-            action_items=original_meeting.action_items,
+            content_id=original_meeting.share_content(),
             tags=original_meeting.tags,
+            ai_model_id=original_meeting.ai_model_id,
             status=original_meeting.status,
             is_favorite=False  # 副本默认不收藏
         )
         
         db.add(new_meeting)
+        stats_service.add_meeting(db, new_meeting)
+        folder_count_service.add_meeting(db, new_meeting)
         db.commit()
-        db.refresh(new_meeting)
+        
+        # 检索索引和向量直接复制源文档的，不重新分词/计算
+        if not search_service.copy_document(db, "meeting", meeting_id, new_meeting):
+            search_service.index_meeting(db, new_meeting)
+        if not embedding_service.copy(db, "meeting", meeting_id, new_meeting.id, new_meeting.user_id):
+            embedding_service.index_meeting(db, new_meeting)
+        
+        row = db.query(*MEETING_LIST_COLUMNS).add_columns(HAS_TRANSCRIPT).filter(Meeting.id == new_meeting.id).one()
         
         logger.info(f"Meeting copied: {meeting_id} -> {new_meeting.id}, folder_id={copy_data.get('folder_id')}")
         
         return ResponseModel(
             code=200,
             message="会议已复制",
-            data=MeetingResponse.from_orm(new_meeting)
+            data=MeetingListItem.from_orm(row, has_transcript=row.has_transcript)
         )
     
     except Exception as e:
@@ -364,38 +650,47 @@ async def copy_meeting(
 async def get_meeting_status(
     meeting_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Optional[AsyncSession] = Depends(get_async_db)
 ):
     """
     查询会议纪要的 AI 处理状态
     
-    用于轮询查询处理进度
+    用于轮询查询处理进度；使用异步会话，一次只读取状态列，不阻塞事件循环
     """
-    # 验证权限
-    meeting = db.query(Meeting).filter(
+    row = await fetch_first(db, select(*meeting_status_columns()).where(
         Meeting.id == meeting_id,
         Meeting.user_id == current_user.id
-    ).first()
+    ))
     
-    if not meeting:
+    if not row:
         raise HTTPException(status_code=404, detail="会议纪要不存在")
     
-    try:
-        status_info = check_meeting_ai_status(meeting_id)
-        
-        return ResponseModel(
-            code=200,
-            message="success",
-            data=status_info
-        )
-    
-    except Exception as e:
-        logger.error(f"Get meeting status error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return ResponseModel(
+        code=200,
+        message="success",
+        data=meeting_status_info(meeting_id, row[0], row[1])
+    )
+
+
+def _speaker_response(speaker_map: MeetingSpeaker, contact: Optional[Contact]) -> SpeakerResponse:
+    """构建说话人响应（联系人由调用方预先加载，不再逐条查询）"""
+    if contact:
+        display_name = contact.name
+        contact_info = ContactResponse.from_orm(contact)
+    else:
+        display_name = speaker_map.custom_name or speaker_map.speaker_id
+        contact_info = None
+
+    return SpeakerResponse(
+        speaker_id=speaker_map.speaker_id,
+        display_name=display_name,
+        contact_id=speaker_map.contact_id,
+        contact=contact_info
+    )
 
 
 @router.post("/{meeting_id}/speakers/map", response_model=ResponseModel)
-async def map_speaker(
+def map_speaker(
     meeting_id: str,
     speaker_data: SpeakerMapRequest,
     current_user: User = Depends(get_current_user),
@@ -415,7 +710,7 @@ async def map_speaker(
         }
     """
     # 验证会议权限
-    meeting = db.query(Meeting).filter(
+    meeting = db.query(Meeting.id).filter(
         Meeting.id == meeting_id,
         Meeting.user_id == current_user.id
     ).first()
@@ -428,6 +723,7 @@ async def map_speaker(
         raise HTTPException(status_code=400, detail="请提供联系人ID或自定义名称")
     
     # 如果提供了联系人ID，验证联系人是否存在
+    contact = None
     if speaker_data.contact_id:
         contact = db.query(Contact).filter(
             Contact.id == speaker_data.contact_id,
@@ -458,30 +754,17 @@ async def map_speaker(
             )
             db.add(speaker_map)
         
-        db.commit()
-        db.refresh(speaker_map)
-        
-        # 构建响应
-        display_name = speaker_data.custom_name
-        contact_info = None
+        # 构建响应（复用上面已查询的联系人，提交后无需再刷新）
+        speaker = _speaker_response(speaker_map, contact)
         
-        if speaker_data.contact_id:
-            contact = db.query(Contact).filter(Contact.id == speaker_data.contact_id).first()
-            if contact:
-                display_name = contact.name
-                contact_info = ContactResponse.from_orm(contact)
+        db.commit()
         
-        logger.info(f"Speaker mapped: meeting={meeting_id}, speaker={speaker_data.speaker_id}, name={display_name}")
+        logger.info(f"Speaker mapped: meeting={meeting_id}, speaker={speaker_data.speaker_id}, name={speaker.display_name}")
         
         return ResponseModel(
             code=200,
             message="标注成功",
-            data=SpeakerResponse(
-                speaker_id=speaker_data.speaker_id,
-                display_name=display_name,
-                contact_id=speaker_data.contact_id,
-                contact=contact_info
-            )
+            data=speaker
         )
     
     except Exception as e:
@@ -490,8 +773,97 @@ async def map_speaker(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{meeting_id}/speakers/batch", response_model=ResponseModel)
+def batch_map_speakers(
+    meeting_id: str,
+    batch: SpeakerBatchMapRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    批量标注会议说话人 ✨新增
+
+    一次提交多个说话人的映射，在同一事务内完成；任一条无效时整体不生效。
+    查询次数与说话人数量无关（会议、联系人、已有映射各一次）
+
+    Args:
+        meeting_id: 会议ID
+        batch: {"items": [{"speaker_id": "说话人1", "contact_id": 123}, {"speaker_id": "说话人2", "custom_name": "张三"}]}
+    """
+    meeting = db.query(Meeting.id).filter(
+        Meeting.id == meeting_id,
+        Meeting.user_id == current_user.id
+    ).first()
+
+    if not meeting:
+        raise HTTPException(status_code=404, detail="会议纪要不存在")
+
+    # 同一说话人出现多次时以最后一条为准
+    items = {item.speaker_id: item for item in batch.items}
+
+    if any(not item.contact_id and not item.custom_name for item in items.values()):
+        raise HTTPException(status_code=400, detail="请提供联系人ID或自定义名称")
+
+    # 一次查询验证全部联系人
+    contact_ids = {item.contact_id for item in items.values() if item.contact_id}
+    contacts = {}
+    if contact_ids:
+        contacts = {
+            contact.id: contact
+            for contact in db.query(Contact).filter(
+                Contact.id.in_(contact_ids),
+                Contact.user_id == current_user.id
+            )
+        }
+        if len(contacts) != len(contact_ids):
+            raise HTTPException(status_code=404, detail="联系人不存在")
+
+    try:
+        existing = {
+            speaker_map.speaker_id: speaker_map
+            for speaker_map in db.query(MeetingSpeaker).filter(
+                MeetingSpeaker.meeting_id == meeting_id,
+                MeetingSpeaker.speaker_id.in_(list(items))
+            )
+        }
+
+        speakers = []
+        new_rows = []
+        for speaker_id, item in items.items():
+            speaker_map = existing.get(speaker_id)
+            if speaker_map is None:
+                speaker_map = MeetingSpeaker(meeting_id=meeting_id, speaker_id=speaker_id)
+                new_rows.append({
+                    "meeting_id": meeting_id,
+                    "speaker_id": speaker_id,
+                    "contact_id": item.contact_id,
+                    "custom_name": item.custom_name,
+                })
+            speaker_map.contact_id = item.contact_id
+            speaker_map.custom_name = item.custom_name
+            speakers.append(_speaker_response(speaker_map, contacts.get(item.contact_id)))
+
+        # 新映射一次 executemany 写入（不需要回读自增ID），已有映射由 flush 批量更新
+        if new_rows:
+            db.execute(insert(MeetingSpeaker), new_rows)
+        db.commit()
+
+        logger.info(f"Speakers mapped: meeting={meeting_id}, count={len(speakers)}")
+
+        return ResponseModel(
+            code=200,
+            message="标注成功",
+            data=SpeakerListResponse(items=speakers)
+        )
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Batch map speakers error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{meeting_id}/speakers", response_model=ResponseModel)
-async def get_meeting_speakers(
+def get_meeting_speakers(
     meeting_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -502,7 +874,7 @@ async def get_meeting_speakers(
     返回该会议中所有说话人的标注信息
     """
     # 验证会议权限
-    meeting = db.query(Meeting).filter(
+    meeting = db.query(Meeting.id).filter(
         Meeting.id == meeting_id,
         Meeting.user_id == current_user.id
     ).first()
@@ -511,29 +883,15 @@ async def get_meeting_speakers(
         raise HTTPException(status_code=404, detail="会议纪要不存在")
     
     try:
-        # 查询所有说话人映射
-        speaker_maps = db.query(MeetingSpeaker).filter(
+        # 一次 JOIN 查询出所有说话人映射及其联系人
+        speaker_maps = db.query(MeetingSpeaker).options(
+            joinedload(MeetingSpeaker.contact)
+        ).filter(
             MeetingSpeaker.meeting_id == meeting_id
-        ).all()
+        ).order_by(MeetingSpeaker.id).all()
         
         # 构建响应
-        speakers = []
-        for speaker_map in speaker_maps:
-            display_name = speaker_map.custom_name or speaker_map.speaker_id
-            contact_info = None
-            
-            if speaker_map.contact_id:
-                contact = db.query(Contact).filter(Contact.id == speaker_map.contact_id).first()
-                if contact:
-                    display_name = contact.name
-                    contact_info = ContactResponse.from_orm(contact)
-            
-            speakers.append(SpeakerResponse(
-                speaker_id=speaker_map.speaker_id,
-                display_name=display_name,
-                contact_id=speaker_map.contact_id,
-                contact=contact_info
-            ))
+        speakers = [_speaker_response(speaker_map, speaker_map.contact) for speaker_map in speaker_maps]
         
         return ResponseModel(
             code=200,
@@ -547,7 +905,7 @@ async def get_meeting_speakers(
 
 
 @router.post("/{meeting_id}/generate-summary", response_model=ResponseModel)
-async def generate_meeting_summary(
+def generate_meeting_summary(
     meeting_id: str,
     request_data: GenerateSummaryRequest,
     current_user: User = Depends(get_current_user),
@@ -615,7 +973,7 @@ async def generate_meeting_summary(
 
 
 @router.patch("/{meeting_id}/mark-viewed", response_model=ResponseModel)
-async def mark_meeting_as_viewed(
+def mark_meeting_as_viewed(
     meeting_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
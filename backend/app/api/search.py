@@ -0,0 +1,88 @@
+"""
+全文检索 API
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.database import get_db
+from app.models import User
+from app.dependencies import get_current_user
+from app.schemas import SearchRequest, SemanticSearchRequest, SearchResultItem, SearchResponse, ResponseModel
+from app.services.search import search_service
+from app.services.embedding import embedding_service
+
+router = APIRouter()
+
+
+@router.post("", response_model=ResponseModel)
+def search(
+    search_data: SearchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    全文检索闪记和会议
+    
+    - 多个关键词用空格分隔，需同时命中
+    - 标题命中的权重高于正文（摘要、要点、行动项、标签、转录）
+    - 结果按相关度排序，highlight 中命中词以 <em> 标记
+    """
+    try:
+        results, total = search_service.search(
+            db,
+            current_user.id,
+            search_data.q,
+            doc_type=search_data.type,
+            page=search_data.page,
+            page_size=search_data.page_size
+        )
+        
+        return ResponseModel(
+            data=SearchResponse(
+                results=[SearchResultItem(**item) for item in results],
+                total=total
+            )
+        )
+    
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Search failed: {e}")
+        raise HTTPException(status_code=500, detail="搜索失败")
+
+
+@router.post("/semantic", response_model=ResponseModel)
+def semantic_search(
+    search_data: SemanticSearchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    语义检索闪记和会议
+    
+    按内容相似度返回最相关的记录，不要求关键词完全命中；
+    score 为余弦相似度，highlight 为空
+    """
+    try:
+        results = embedding_service.search(
+            db,
+            current_user.id,
+            search_data.q,
+            doc_type=search_data.type,
+            limit=search_data.limit
+        )
+        
+        return ResponseModel(
+            data=SearchResponse(
+                results=[SearchResultItem(**item) for item in results],
+                total=len(results)
+            )
+        )
+    
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"Semantic search failed: {e}")
+        raise HTTPException(status_code=500, detail="搜索失败")
@@ -0,0 +1,38 @@
+"""
+统计 API
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from loguru import logger
+
+from app.database import get_db
+from app.models import User
+from app.dependencies import get_current_user
+from app.schemas import StatsResponse, ResponseModel
+from app.services.stats_service import stats_service
+
+router = APIRouter()
+
+
+@router.get("", response_model=ResponseModel)
+def get_stats(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    获取统计数据
+    
+    - today / week / month: 闪记数、会议数及音频总时长（秒），按自然日/周（周一起）/月统计
+    - category_distribution: 闪记分类分布
+    
+    数据来自每日汇总表，查询量只与天数有关
+    """
+    try:
+        return ResponseModel(
+            data=StatsResponse(**stats_service.get_stats(db, current_user.id))
+        )
+    
+    except Exception as e:
+        logger.error(f"Get stats error: {e}")
+        raise HTTPException(status_code=500, detail="获取统计数据失败")
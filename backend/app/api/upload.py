@@ -4,7 +4,9 @@
 
 import os
 import uuid
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from loguru import logger
 
 from app.models import User
@@ -12,6 +14,8 @@ from app.dependencies import get_current_user
 from app.schemas import UploadResponse, ResponseModel
 from app.utils.oss import upload_audio_to_oss, generate_oss_upload_signature
 from config import settings
+from app.services.stats_service import stats_service
+from app.services.folder_count_service import folder_count_service
 
 router = APIRouter()
 
@@ -93,7 +97,7 @@ async def upload_audio(
         
         # 5. 上传到 OSS
         try:
-            oss_url = upload_audio_to_oss(temp_file_path, current_user.id, file_ext)
+            oss_url = await run_in_threadpool(upload_audio_to_oss, temp_file_path, current_user.id, file_ext)
             logger.info(f"用户 {current_user.id} 上传音频到 OSS: {oss_url}")
         except Exception as e:
             logger.error(f"OSS 上传失败: {e}")
@@ -122,6 +126,40 @@ async def upload_audio(
         pass  # 暂时不删除，让系统或定时任务处理
 
 
+def _create_uploaded_meeting(
+    user_id: str, title: str, audio_url: str, folder_id: Optional[int], audio_duration: Optional[int] = None
+) -> str:
+    """
+    为已上传的音频创建会议记录（同步数据库操作，由上传接口放到线程池执行）
+    
+    Returns:
+        会议ID
+    """
+    from app.database import SessionLocal
+    from app.models import Meeting, MeetingStatus
+
+    db = SessionLocal()
+    try:
+        meeting = Meeting(
+            user_id=user_id,
+            title=title,
+            audio_url=audio_url,
+            audio_duration=audio_duration,  # 无法解析时为空（听悟轮询按未知时长处理）
+            folder_id=folder_id,
+            status=MeetingStatus.PENDING  # v0.9.5：保持 PENDING，等待用户点击"立即生成"
+        )
+
+        db.add(meeting)
+        stats_service.add_meeting(db, meeting)
+        folder_count_service.add_meeting(db, meeting)
+        db.commit()
+
+        logger.info(f"会议记录已创建: {meeting.id}，状态: PENDING")
+        return meeting.id
+    finally:
+        db.close()
+
+
 @router.post("/audio-and-meeting", response_model=ResponseModel)
 async def upload_audio_and_create_meeting(
     file: UploadFile = File(..., description="音频文件"),
@@ -135,10 +173,7 @@ async def upload_audio_and_create_meeting(
     这个接口解决了前端上传过程中页面刷新导致状态丢失的问题
     """
     from app.api.meeting import create_meeting
-    from app.schemas import MeetingCreate
-    from sqlalchemy.orm import Session
-    from app.database import get_db
-    
+    from app.services.waveform_service import WaveformService  # librosa 加载较慢，按需导入
     temp_file_path = None
     
     logger.info(f"收到上传请求: filename={file.filename}, title={title}, folder_id={folder_id}")
@@ -175,67 +210,44 @@ async def upload_audio_and_create_meeting(
         
         logger.info(f"临时文件已保存: {temp_file_path} ({file_size} bytes)")
         
+        # 读取音频时长（听悟轮询按时长预计完成时间）
+        audio_duration = await run_in_threadpool(WaveformService.get_duration, temp_file_path)
+        
         # 5. 上传到 OSS
         try:
-            oss_url = upload_audio_to_oss(temp_file_path, current_user.id, file_ext)
+            oss_url = await run_in_threadpool(upload_audio_to_oss, temp_file_path, current_user.id, file_ext)
             logger.info(f"用户 {current_user.id} 上传音频到 OSS: {oss_url}")
         except Exception as e:
             logger.error(f"OSS 上传失败: {e}")
             raise HTTPException(status_code=500, detail=f"OSS 上传失败: {str(e)}")
         
-        # 6. 创建会议记录
-        from app.database import SessionLocal
-        db = SessionLocal()
-        try:
-            # 处理 folder_id：转换为整数或 None
-            parsed_folder_id = None
-            if folder_id and folder_id != 'null' and folder_id != '':
-                try:
-                    parsed_folder_id = int(folder_id)
-                except (ValueError, TypeError):
-                    logger.warning(f"无效的 folder_id: {folder_id}")
-            
-            # 使用传入的 title，如果没有则使用文件名
-            meeting_title = title if title else file.filename
-            logger.info(f"创建会议: title={meeting_title}, folder_id={parsed_folder_id}")
-            
-            meeting_data = MeetingCreate(
-                title=meeting_title,
-                audio_url=oss_url,
-                audio_duration=0,  # TODO: 从音频文件提取
-                folder_id=parsed_folder_id
-            )
-            
-            # 调用创建会议的逻辑
-            from app.models import Meeting, MeetingStatus
-
-            meeting = Meeting(
-                user_id=current_user.id,
-                title=meeting_data.title,
-                audio_url=meeting_data.audio_url,
-                audio_duration=meeting_data.audio_duration,
-                folder_id=meeting_data.folder_id,
-                status=MeetingStatus.PENDING  # v0.9.5：保持 PENDING，等待用户点击"立即生成"
-            )
-
-            db.add(meeting)
-            db.commit()
-            db.refresh(meeting)
-
-            logger.info(f"会议记录已创建: {meeting.id}，状态: PENDING")
-            
-            return ResponseModel(
-                code=200,
-                message="上传成功，请点击「立即生成」开始处理",
-                data={
-                    "id": meeting.id,  # 改为 "id" 以便前端获取
-                    "meeting_id": meeting.id,
-                    "file_url": oss_url,
-                    "file_size": file_size
-                }
-            )
-        finally:
-            db.close()
+        # 6. 创建会议记录（数据库操作放到线程池，不阻塞事件循环）
+        # 处理 folder_id：转换为整数或 None
+        parsed_folder_id = None
+        if folder_id and folder_id != 'null' and folder_id != '':
+            try:
+                parsed_folder_id = int(folder_id)
+            except (ValueError, TypeError):
+                logger.warning(f"无效的 folder_id: {folder_id}")
+        
+        # 使用传入的 title，如果没有则使用文件名
+        meeting_title = title if title else file.filename
+        logger.info(f"创建会议: title={meeting_title}, folder_id={parsed_folder_id}")
+        
+        meeting_id = await run_in_threadpool(
+            _create_uploaded_meeting, current_user.id, meeting_title, oss_url, parsed_folder_id, audio_duration
+        )
+        
+        return ResponseModel(
+            code=200,
+            message="上传成功，请点击「立即生成」开始处理",
+            data={
+                "id": meeting_id,  # 改为 "id" 以便前端获取
+                "meeting_id": meeting_id,
+                "file_url": oss_url,
+                "file_size": file_size
+            }
+        )
     
     except HTTPException:
         raise
@@ -2,22 +2,162 @@
 数据库配置和会话管理
 """
 
-from sqlalchemy import create_engine
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from loguru import logger
 from config import settings
+from app.utils.db_pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool, register_pool_gauges
+from app.utils.db_router import ReplicaRouter, track_writes
+
+
+def _is_sqlite_file(url: str) -> bool:
+    """是否为 SQLite 文件库（内存库不设置连接池和 PRAGMA）"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _pool_options(url: str, poolclass, name: str) -> dict:
+    """
+    连接池参数 ✨新增
+    SQLite 内存库使用 SQLAlchemy 默认的单连接池，不设置池大小
+    """
+    if make_url(url).get_backend_name() == "sqlite" and not _is_sqlite_file(url):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_logging_name": name,
+    }
+
 
 # 创建数据库引擎
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG,
+    echo=settings.DB_ECHO,
     pool_pre_ping=True,
+    **_pool_options(settings.DATABASE_URL, InstrumentedQueuePool, "primary"),
 )
 
+register_pool_gauges(engine, "primary")
+
+
+def _sqlite_pragmas() -> list:
+    """
+    SQLite 生产参数 ✨新增
+    - WAL：读写互不阻塞，只有写与写之间排队
+    - synchronous=NORMAL：WAL 模式下安全且减少 fsync
+    - busy_timeout：写锁被占用时等待而不是立即报 "database is locked"
+    - mmap_size / cache_size：减少读 I/O
+    """
+    pragmas = []
+    if settings.SQLITE_WAL:
+        pragmas += ["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"]
+    pragmas += [
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}",
+    ]
+    return pragmas
+
+
+def install_sqlite_pragmas(sync_engine) -> None:
+    """每个新连接建立时设置 SQLite 参数（同步引擎或异步引擎的 sync_engine）"""
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in _sqlite_pragmas():
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+if _is_sqlite_file(settings.DATABASE_URL):
+    install_sqlite_pragmas(engine)
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读副本 ✨新增（未配置 DATABASE_REPLICA_URL 时只读接口也使用主库）
+replica_engine = create_engine(
+    settings.DATABASE_REPLICA_URL,
+    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_REPLICA_URL else {},
+    echo=settings.DB_ECHO,
+    pool_pre_ping=True,
+    **_pool_options(settings.DATABASE_REPLICA_URL, InstrumentedQueuePool, "replica"),
+) if settings.DATABASE_REPLICA_URL else None
+
+register_pool_gauges(replica_engine, "replica")
+if replica_engine is not None and _is_sqlite_file(settings.DATABASE_REPLICA_URL):
+    install_sqlite_pragmas(replica_engine)
+
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=replica_engine
+) if replica_engine is not None else None
+
+replica_router = ReplicaRouter(
+    replica_engine,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+    read_your_writes_window=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
+track_writes(SessionLocal, replica_router)
+
+# 异步驱动 ✨新增
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """同步连接串 -> 对应的异步驱动连接串（sqlite -> aiosqlite，postgresql -> asyncpg）"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"不支持异步访问的数据库: {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _create_async_engine():
+    """创建异步引擎；未启用或缺少驱动时返回 None，异步接口退回同步会话"""
+    if not settings.DB_ASYNC_ENABLED:
+        return None
+    try:
+        url = async_database_url(settings.DATABASE_URL)
+        return create_async_engine(
+            url,
+            echo=settings.DB_ECHO,
+            pool_pre_ping=True,
+            **_pool_options(url, InstrumentedAsyncQueuePool, "async"),
+        )
+    except (ImportError, ValueError) as e:
+        logger.warning(f"异步数据库引擎不可用，使用同步会话: {e}")
+        return None
+
+
+async_engine = _create_async_engine()
+if async_engine is not None and _is_sqlite_file(settings.DATABASE_URL):
+    install_sqlite_pragmas(async_engine.sync_engine)
+# 异步引擎的连接池挂在内部的同步 Engine 上
+register_pool_gauges(async_engine.sync_engine if async_engine is not None else None, "async")
+
+# 异步会话工厂（提交后不过期对象，避免在事件循环中触发隐式加载）
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+) if async_engine is not None else None
+
 # 创建基类
 Base = declarative_base()
 
@@ -33,3 +173,40 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_session(user_id: Optional[str] = None) -> Session:
+    """
+    创建只读会话 ✨新增
+    副本可用、延迟未超阈值且该用户近期没有写入时使用只读副本，否则使用主库
+    """
+    if replica_router.use_replica(user_id):
+        return ReplicaSessionLocal()
+    return SessionLocal()
+
+
+async def get_async_db():
+    """
+    获取异步数据库会话 ✨新增
+    查询不阻塞事件循环，用于高频轮询等 async 接口；未启用异步引擎时返回 None，
+    配合 fetch_first 使用时会自动退回同步会话
+    """
+    if AsyncSessionLocal is None:
+        yield None
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def fetch_first(db: Optional[AsyncSession], statement):
+    """
+    执行查询并返回第一行 ✨新增
+    有异步会话时直接 await；否则在线程池中用同步会话执行，同样不阻塞事件循环
+    """
+    if db is not None:
+        return (await db.execute(statement)).first()
+
+    def run():
+        with SessionLocal() as session:
+            return session.execute(statement).first()
+
+    return await run_in_threadpool(run)
@@ -3,13 +3,33 @@ FastAPI 依赖项
 """
 
 from fastapi import Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import User, AdminUser
-from app.utils.jwt import verify_token
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.database import get_db, get_read_session
+from app.models import User, AdminUser, SubscriptionTier
+from app.utils.jwt import verify_token, decode_access_token
+from app.utils.auth_cache import auth_cache
+from app.services.admin_activity_service import admin_activity_service
 from datetime import datetime
 
 
+def _user_from_snapshot(snapshot: dict) -> User:
+    """
+    由缓存快照构造用户对象 ✨新增
+    对象处于 detached 状态，不关联会话，只可读取快照中的字段
+    """
+    user = User(
+        id=snapshot["id"],
+        nickname=snapshot["nickname"],
+        avatar=snapshot["avatar"],
+        subscription_tier=SubscriptionTier(snapshot["subscription_tier"]) if snapshot["subscription_tier"] else None,
+        created_at=datetime.fromisoformat(snapshot["created_at"]),
+        is_active=snapshot["is_active"],
+    )
+    make_transient_to_detached(user)
+    return user
+
+
 async def get_current_user(
     authorization: str = Header(...),
     db: Session = Depends(get_db)
@@ -17,6 +37,7 @@ async def get_current_user(
     """
     获取当前登录用户
     从 Authorization Header 中提取 Token 并验证
+    已验证的 Token 与用户快照走认证缓存，命中时不查询数据库 ✨
     
     Args:
         authorization: Authorization Header (格式: Bearer <token>)
@@ -42,15 +63,24 @@ async def get_current_user(
     except ValueError:
         raise credentials_exception
     
-    # 验证 Token
-    user_id = verify_token(token)
+    # 验证 Token（缓存命中时跳过 JWT 解码；Redis 缓存在线程池中访问）
+    user_id = await auth_cache.call(auth_cache.get_token_user_id, token)
     if user_id is None:
-        raise credentials_exception
-    
-    # 查询用户
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        user_id = payload.get("sub") if payload else None
+        if user_id is None:
+            raise credentials_exception
+        await auth_cache.call(auth_cache.set_token_user_id, token, user_id, payload.get("exp"))
+    
+    # 查询用户（缓存命中时不访问数据库；未命中时在线程池中查询，不阻塞事件循环）
+    snapshot = await auth_cache.call(auth_cache.get_user, user_id)
+    if snapshot is not None:
+        user = _user_from_snapshot(snapshot)
+    else:
+        user = await run_in_threadpool(db.get, User, user_id)
+        if user is None:
+            raise credentials_exception
+        await auth_cache.call(auth_cache.set_user, user)
     
     if not user.is_active:
         raise HTTPException(
@@ -58,9 +88,28 @@ async def get_current_user(
             detail="User account is inactive"
         )
     
+    # 请求会话中的批量写入按该用户记录读己之写（见 app/utils/db_router.py）
+    db.info["request_user_id"] = user.id
+    
     return user
 
 
+def get_read_db(current_user: User = Depends(get_current_user)):
+    """
+    获取只读数据库会话 ✨新增
+    用于列表/详情等只读接口：配置只读副本时按副本延迟和读己之写路由到副本或主库，
+    未配置时等同于 get_db。会话内不要写入数据
+    
+    Args:
+        current_user: 当前用户（判断该用户近期是否写过数据）
+    """
+    db = get_read_session(current_user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 async def get_optional_user(
     authorization: str = Header(None),
     db: Session = Depends(get_db)
@@ -122,8 +171,8 @@ async def get_current_admin(
     if admin_id is None:
         raise credentials_exception
     
-    # 查询管理员
-    admin = db.query(AdminUser).filter(AdminUser.id == admin_id).first()
+    # 查询管理员（在线程池中查询，不阻塞事件循环）
+    admin = await run_in_threadpool(db.get, AdminUser, admin_id)
     if admin is None:
         raise credentials_exception
     
@@ -133,9 +182,8 @@ async def get_current_admin(
             detail="管理员账号已被禁用"
         )
     
-    # 更新最后登录时间
-    admin.last_login = datetime.utcnow()
-    db.commit()
+    # 更新最后登录时间（缓冲后批量写库，认证路径不提交事务）
+    admin_activity_service.touch(admin)
     
     return admin
 
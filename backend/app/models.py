@@ -3,11 +3,15 @@
 基于 PRD 第6章数据模型设计
 """
 
+import json
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
+from typing import Optional
+from sqlalchemy import event, inspect, exists, func, delete, insert, or_, select, literal, Column, String, Integer, Boolean, Date, DateTime, Text, ForeignKey, Index, LargeBinary, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, object_session, Session
+from sqlalchemy.orm.attributes import set_committed_value
 from app.database import Base
 import enum
 
@@ -49,6 +53,29 @@ class PromptScenario(str, enum.Enum):
     general_chat = "general_chat"
 
 
+class JSONColumnMixin:
+    """JSON 文本列的解析缓存
+    
+    同一 ORM 实例上重复读取 JSON 列（如多个 schema 的 from_orm）时只解析一次；
+    列值变化（更新、刷新）后按新值重新解析
+    """
+    
+    def load_json(self, name: str):
+        """解析 JSON 文本列，空值返回 None（返回的对象为缓存共享，调用方不要修改）"""
+        raw = getattr(self, name, None)
+        if not raw:
+            return None
+        
+        cache = self.__dict__.setdefault("_json_cache", {})
+        cached = cache.get(name)
+        if cached is not None and (cached[0] is raw or cached[0] == raw):
+            return cached[1]
+        
+        value = json.loads(raw)
+        cache[name] = (raw, value)
+        return value
+
+
 class User(Base):
     """用户表"""
     __tablename__ = "users"
@@ -62,6 +89,7 @@ class User(Base):
     last_login = Column(DateTime, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     subscription_tier = Column(SQLEnum(SubscriptionTier), default=SubscriptionTier.FREE)
+    uncategorized_meeting_count = Column(Integer, default=0, server_default="0", nullable=False)  # 未分类会议数（冗余计数）✨新增
     
     # 关系
     flashes = relationship("Flash", back_populates="user", cascade="all, delete-orphan")
@@ -71,7 +99,7 @@ class User(Base):
     contacts = relationship("Contact", back_populates="user", cascade="all, delete-orphan")
 
 
-class Flash(Base):
+class Flash(JSONColumnMixin, Base):
     """闪记记录表"""
     __tablename__ = "flashes"
     
@@ -94,9 +122,14 @@ class Flash(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, default=1, server_default="1", nullable=False)  # 行版本，每次更新 +1，用于 ETag
+    
+    # 用于语义搜索的向量见 Embedding 表
     
-    # 用于语义搜索的向量字段（V2.0）
-    # embedding = Column(Vector(1536), nullable=True)
+    # 列表游标分页索引：(user_id, created_at, id)
+    __table_args__ = (
+        Index("ix_flashes_user_created", "user_id", "created_at", "id"),
+    )
     
     # 关系
     user = relationship("User", back_populates="flashes")
@@ -104,7 +137,58 @@ class Flash(Base):
     ai_model = relationship("AIModel", foreign_keys=[ai_model_id])
 
 
-class Meeting(Base):
+# 会议内容字段：复制会议时由副本共享，不重复存储
+MEETING_CONTENT_FIELDS = ("transcript", "transcript_paragraphs", "summary", "mind_map", "key_points", "action_items")
+
+
+class MeetingContent(Base):
+    """会议共享内容表 ✨新增
+    
+    复制会议时，原会议的内容转存为一条只读记录，原会议与副本通过 content_id 共同引用；
+    任一方修改内容字段时先把内容拷回自身（写时复制），不会影响其他引用方。
+    不再被引用的记录在提交时自动删除
+    """
+    __tablename__ = "meeting_contents"
+    
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    transcript = Column(Text, nullable=True)
+    transcript_paragraphs = Column(Text, nullable=True)
+    summary = Column(Text, nullable=True)
+    mind_map = Column(Text, nullable=True)
+    key_points = Column(Text, nullable=True)
+    action_items = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+def _content_field(name: str):
+    """
+    会议内容字段：有共享内容时读共享记录，否则读自身列；
+    SQL 表达式为 COALESCE(自身列, 共享记录列)，查询/过滤对副本同样有效（每行一个关联子查询，
+    列表等大批量查询中不要使用）；赋值时先写时复制，再写入自身列
+    """
+    column_name = f"_{name}"
+
+    def fget(self):
+        if self.content_id is not None:
+            # 共享时自身列为空，不能退回读取自身列
+            return getattr(self.get_content(), name)
+        return getattr(self, column_name)
+
+    def fset(self, value):
+        if self.content_id is not None:
+            self.detach_content()
+        setattr(self, column_name, value)
+
+    def expr(cls):
+        shared = select(getattr(MeetingContent, name)).where(
+            MeetingContent.id == cls.content_id
+        ).scalar_subquery()
+        return func.coalesce(getattr(cls, column_name), shared).label(name)
+
+    return hybrid_property(fget, fset, expr=expr)
+
+
+class Meeting(JSONColumnMixin, Base):
     """会议纪要表"""
     __tablename__ = "meetings"
     
@@ -116,24 +200,95 @@ class Meeting(Base):
     meeting_date = Column(DateTime, nullable=True)
     audio_url = Column(Text, nullable=True)
     audio_duration = Column(Integer, nullable=True)  # 秒
-    transcript = Column(Text, nullable=True)  # 通义听悟转录文本
-    transcript_paragraphs = Column(Text, nullable=True)  # 段落级转录数据（JSON格式，含说话人）
-    summary = Column(Text, nullable=True)  # LLM生成的会议摘要
-    mind_map = Column(Text, nullable=True)  # LLM生成的思维导图（Markdown格式）
-    key_points = Column(Text, nullable=True)  # LLM提取的关键要点（JSON格式）
-    action_items = Column(Text, nullable=True)  # LLM提取的行动项（JSON格式）
+    content_id = Column(String(36), ForeignKey("meeting_contents.id"), nullable=True, index=True)  # 共享内容ID（复制产生）✨新增
+    _transcript = Column("transcript", Text, nullable=True)  # 通义听悟转录文本
+    _transcript_paragraphs = Column("transcript_paragraphs", Text, nullable=True)  # 段落级转录数据（JSON格式，含说话人）
+    _summary = Column("summary", Text, nullable=True)  # LLM生成的会议摘要
+    _mind_map = Column("mind_map", Text, nullable=True)  # LLM生成的思维导图（Markdown格式）
+    _key_points = Column("key_points", Text, nullable=True)  # LLM提取的关键要点（JSON格式）
+    _action_items = Column("action_items", Text, nullable=True)  # LLM提取的行动项（JSON格式）
     is_favorite = Column(Boolean, default=False, nullable=False)  # 收藏状态 ✨新增
     is_viewed = Column(Boolean, default=False, nullable=False)  # 已查看状态 ✨v0.9.10新增
     tags = Column(Text, nullable=True)  # AI生成的标签，存储为JSON字符串 ✨新增
     ai_model_id = Column(String(36), ForeignKey("ai_models.id", ondelete="SET NULL"), nullable=True)  # 使用的AI模型 ✨新增
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     status = Column(SQLEnum(MeetingStatus), default=MeetingStatus.PENDING, nullable=False)
+    tingwu_task_id = Column(String(100), nullable=True)  # 转写中的通义听悟任务ID（提交后立即保存，重试时复用）✨新增
+    version = Column(Integer, default=1, server_default="1", nullable=False)  # 行版本，每次更新 +1，用于 ETag
+    
+    # 列表游标分页索引：按时间排序 / 收藏优先排序
+    __table_args__ = (
+        Index("ix_meetings_user_created", "user_id", "created_at", "id"),
+        Index("ix_meetings_user_favorite_created", "user_id", "is_favorite", "created_at", "id"),
+    )
     
     # 关系
     user = relationship("User", back_populates="meetings")
     folder = relationship("Folder", back_populates="meetings")
     speakers = relationship("MeetingSpeaker", back_populates="meeting", cascade="all, delete-orphan")
     ai_model = relationship("AIModel", foreign_keys=[ai_model_id])
+    content = relationship("MeetingContent", lazy="select")  # 共享内容（访问时加载）
+    
+    # 内容字段（可能来自共享内容记录）
+    transcript = _content_field("transcript")
+    transcript_paragraphs = _content_field("transcript_paragraphs")
+    summary = _content_field("summary")
+    mind_map = _content_field("mind_map")
+    key_points = _content_field("key_points")
+    action_items = _content_field("action_items")
+    
+    def get_content(self) -> Optional["MeetingContent"]:
+        """
+        获取共享内容记录（首次访问时加载，之后缓存在对象上）
+        
+        对象已脱离会话且尚未加载过共享内容时抛出 DetachedInstanceError，
+        不会返回共享后已清空的自身列
+        """
+        if self.content_id is None:
+            return None
+        content = self.content
+        if content is None or content.id != self.content_id:
+            # 本会话内刚修改过 content_id，关系尚未同步
+            content = object_session(self).get(MeetingContent, self.content_id)
+            set_committed_value(self, "content", content)
+        if content is None:
+            raise ValueError(f"会议 {self.id} 的共享内容 {self.content_id} 不存在")
+        return content
+    
+    def share_content(self) -> Optional[str]:
+        """
+        获取可供副本引用的共享内容ID
+        
+        首次复制时在数据库内把自身内容转存为共享记录（INSERT ... SELECT，不经过应用内存），
+        之后的复制直接复用同一记录；没有任何内容时不创建记录，返回 None
+        """
+        if self.content_id is None:
+            session = object_session(self)
+            content_id = generate_uuid()
+            columns = [getattr(Meeting, f"_{name}") for name in MEETING_CONTENT_FIELDS]
+            result = session.execute(
+                insert(MeetingContent).from_select(
+                    ["id", *MEETING_CONTENT_FIELDS, "created_at"],
+                    select(literal(content_id), *columns, literal(datetime.utcnow())).where(
+                        Meeting.id == self.id,
+                        or_(*[column.isnot(None) for column in columns])
+                    )
+                )
+            )
+            if not result.rowcount:
+                return None
+            for name in MEETING_CONTENT_FIELDS:
+                setattr(self, f"_{name}", None)
+            self.content_id = content_id
+        return self.content_id
+    
+    def detach_content(self) -> None:
+        """写时复制：把共享内容拷回自身列并解除引用"""
+        content = self.get_content()
+        for name in MEETING_CONTENT_FIELDS:
+            setattr(self, f"_{name}", getattr(content, name) if content is not None else None)
+        self.content_id = None
+        set_committed_value(self, "content", None)
 
 
 class Tag(Base):
@@ -172,12 +327,13 @@ class Folder(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(50), nullable=False)
+    meeting_count = Column(Integer, default=0, server_default="0", nullable=False)  # 会议数（冗余计数）✨新增
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # 关系
+    # 关系（删除知识库时会议移到未分类，不随之删除）
     user = relationship("User", back_populates="folders")
-    meetings = relationship("Meeting", back_populates="folder", cascade="all, delete-orphan")
+    meetings = relationship("Meeting", back_populates="folder", passive_deletes=True)
 
 
 class Contact(Base):
@@ -262,3 +418,167 @@ class AdminUser(Base):
     last_login = Column(DateTime, nullable=True)
 
 
+class SearchDocument(Base):
+    """全文检索文档表 ✨新增
+    
+    记录已建立索引的闪记/会议；SQLite 下 id 即 FTS5 虚表的 rowid，
+    PostgreSQL 下另有 tsv 列（由检索服务建表时添加）
+    """
+    __tablename__ = "search_documents"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    doc_type = Column(String(20), nullable=False)  # flash / meeting
+    doc_id = Column(String(36), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String(200), nullable=True)
+    created_at = Column(DateTime, nullable=False)  # 源记录的创建时间
+    indexed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("doc_type", "doc_id", name="uq_search_documents_doc"),
+    )
+
+
+class Embedding(Base):
+    """语义向量表 ✨新增
+    
+    每篇闪记/会议一行，向量为 float32 数组的原始字节（L2 归一化）；
+    model 记录生成向量的模型，更换模型或维度后旧向量不再参与检索
+    """
+    __tablename__ = "embeddings"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    doc_type = Column(String(20), nullable=False)  # flash / meeting
+    doc_id = Column(String(36), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    model = Column(String(50), nullable=False)  # 如 hashing-256
+    vector = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint("doc_type", "doc_id", name="uq_embeddings_doc"),
+    )
+
+
+class UserDailyStat(Base):
+    """用户每日统计汇总表 ✨新增
+    
+    闪记/会议创建、删除、重新分类时在同一事务内增量更新，
+    统计接口只读本表，查询量与天数相关而与记录数无关
+    """
+    __tablename__ = "user_daily_stats"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)  # STATS_TIMEZONE 时区下的自然日
+    kind = Column(String(20), nullable=False)  # flash / meeting
+    category = Column(String(20), nullable=False, default="")  # 闪记分类，会议为空字符串
+    count = Column(Integer, default=0, nullable=False)
+    duration = Column(Integer, default=0, nullable=False)  # 音频总时长（秒）
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "kind", "category", name="uq_user_daily_stats"),
+    )
+
+
+class Job(Base):
+    """后台任务表 ✨新增
+
+    会议转录/总结、闪记 AI 等后台处理以任务行持久化，由任务队列的工作线程领取执行；
+    领取时写入租约（locked_by / lease_expires_at），进程退出后租约过期的任务会被重新领取
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_type = Column(String(50), nullable=False)  # meeting_transcription / meeting_summary / flash_ai
+    payload = Column(Text, nullable=False, default="{}")  # 任务参数（JSON）
+    status = Column(String(20), nullable=False, default="pending")  # pending / running / succeeded / failed
+    attempts = Column(Integer, default=0, nullable=False)  # 已领取次数
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # 最早可执行时间（失败重试时延后）
+    locked_by = Column(String(100), nullable=True)  # 领取者（主机名:进程号）
+    lease_expires_at = Column(DateTime, nullable=True)  # 租约到期时间，执行中定期续期
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "job_type", "run_at"),
+    )
+
+
+class TingwuTask(Base):
+    """待完成的通义听悟任务 ✨新增
+
+    由 tingwu_poller 统一轮询；完成（或失败、超时）后删除本行，并提交 result_job_type 任务处理结果
+    """
+    __tablename__ = "tingwu_tasks"
+
+    task_id = Column(String(100), primary_key=True)  # 通义听悟任务ID
+    result_job_type = Column(String(50), nullable=False)  # 完成后提交的任务类型
+    payload = Column(Text, nullable=False, default="{}")  # 结果任务参数（JSON，会加上 task_id）
+    poll_interval = Column(Integer, nullable=False, default=2)  # 最小轮询间隔（秒）
+    audio_duration = Column(Integer, nullable=True)  # 音频时长（秒），用于预计完成时间
+    next_poll_at = Column(DateTime, nullable=False, index=True)  # 下次查询时间（领取时顺延）
+    deadline = Column(DateTime, nullable=False)  # 超过该时间仍未完成视为超时
+    polls = Column(Integer, default=0, nullable=False)  # 已查询次数（领取时递增，兼作多进程间的锁）
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class Lease(Base):
+    """后台单实例任务的租约 ✨新增
+
+    多进程部署时只有持有未过期租约的进程执行该任务（如 tingwu_poller），持有者定期续期，
+    进程退出后租约过期由其他进程接管
+    """
+    __tablename__ = "leases"
+
+    name = Column(String(50), primary_key=True)  # 租约名称，如 tingwu_poller
+    holder = Column(String(100), nullable=False)  # 持有者（主机名:进程号）
+    expires_at = Column(DateTime, nullable=False)
+
+
+def _bump_version(mapper, connection, target):
+    """ORM 更新时在同一条 UPDATE 中递增 version（批量 UPDATE 需自行设置 version）"""
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.version = type(target).version + 1
+
+
+event.listen(Flash, "before_update", _bump_version)
+event.listen(Meeting, "before_update", _bump_version)
+
+
+def release_meeting_contents(db, content_ids) -> None:
+    """删除不再被任何会议引用的共享内容（在调用方事务内）"""
+    content_ids = [content_id for content_id in set(content_ids) if content_id]
+    if not content_ids:
+        return
+    db.execute(
+        delete(MeetingContent).where(
+            MeetingContent.id.in_(content_ids),
+            ~exists().where(Meeting.content_id == MeetingContent.id)
+        )
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_released_contents(session, flush_context, instances):
+    """记录本次 flush 中被删除或解除引用的共享内容"""
+    released = set()
+    for obj in session.deleted:
+        if isinstance(obj, Meeting) and obj.content_id:
+            released.add(obj.content_id)
+    for obj in session.dirty:
+        if isinstance(obj, Meeting):
+            released.update(inspect(obj).attrs.content_id.history.deleted)
+    if released:
+        session.info.setdefault("released_content_ids", set()).update(released)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _release_contents(session, flush_context):
+    """flush 完成后清理无引用的共享内容"""
+    content_ids = session.info.pop("released_content_ids", None)
+    if content_ids:
+        release_meeting_contents(session, content_ids)
@@ -3,9 +3,19 @@ Pydantic Schemas
 用于请求验证和响应序列化
 """
 
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Literal
 from datetime import datetime
 from pydantic import BaseModel, Field
+import json
+
+
+def _load_json(obj, name: str):
+    """读取 ORM 对象的 JSON 文本列（优先使用实例上的解析缓存）"""
+    loader = getattr(obj, "load_json", None)
+    if loader is not None:
+        return loader(name)
+    raw = getattr(obj, name, None)
+    return json.loads(raw) if raw else None
 
 
 # ============ 通用响应模型 ============
@@ -89,13 +99,12 @@ class FlashResponse(BaseModel):
     @classmethod
     def from_orm(cls, obj):
         """从 ORM 对象转换，处理 JSON 字段"""
-        import json
         data = {
             "id": obj.id,
             "title": obj.title,
             "content": obj.content,
             "summary": obj.summary,
-            "keywords": json.loads(obj.keywords) if obj.keywords else None,
+            "keywords": _load_json(obj, "keywords"),
             "category": obj.category,
             "audio_url": obj.audio_url,
             "audio_duration": obj.audio_duration,
@@ -108,10 +117,12 @@ class FlashResponse(BaseModel):
 
 class FlashListResponse(BaseModel):
     """闪记列表响应"""
-    total: int
+    total: Optional[int] = None  # with_total=false 时不统计总数
     page: int
     page_size: int
     items: List[FlashResponse]
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # 下一页游标，传回 cursor 参数继续翻页
 
 
 # ============ 会议纪要相关 ============
@@ -162,23 +173,22 @@ class MeetingResponse(BaseModel):
     @classmethod
     def from_orm(cls, obj):
         """从 ORM 对象转换，处理 JSON 字段"""
-        import json
         data = {
             "id": obj.id,
             "title": obj.title,
-            "participants": json.loads(obj.participants) if obj.participants else None,
+            "participants": _load_json(obj, "participants"),
             "meeting_date": obj.meeting_date,
             "audio_url": obj.audio_url,
             "audio_duration": obj.audio_duration,
             "transcript": obj.transcript,
-            "transcript_paragraphs": json.loads(obj.transcript_paragraphs) if (hasattr(obj, 'transcript_paragraphs') and obj.transcript_paragraphs) else None,
+            "transcript_paragraphs": _load_json(obj, "transcript_paragraphs"),
             "summary": obj.summary,
             "mind_map": obj.mind_map if hasattr(obj, 'mind_map') else None,
-            "key_points": json.loads(obj.key_points) if obj.key_points else None,
-            "action_items": json.loads(obj.action_items) if obj.action_items else None,
+            "key_points": _load_json(obj, "key_points"),
+            "action_items": _load_json(obj, "action_items"),
             "is_favorite": obj.is_favorite if hasattr(obj, 'is_favorite') else False,
             "is_viewed": obj.is_viewed if hasattr(obj, 'is_viewed') else False,
-            "tags": json.loads(obj.tags) if (hasattr(obj, 'tags') and obj.tags) else None,
+            "tags": _load_json(obj, "tags"),
             "folder_id": obj.folder_id if hasattr(obj, 'folder_id') else None,
             "status": obj.status.value if hasattr(obj.status, 'value') else obj.status,
             "created_at": obj.created_at
@@ -186,12 +196,72 @@ class MeetingResponse(BaseModel):
         return cls(**data)
 
 
+class MeetingListItem(BaseModel):
+    """会议列表项（卡片视图，不含转录/摘要等大字段）"""
+    id: str
+    title: str
+    participants: Optional[List[str]] = None
+    meeting_date: Optional[datetime] = None
+    audio_url: Optional[str] = None
+    audio_duration: Optional[int] = None
+    is_favorite: bool = False
+    is_viewed: bool = False
+    has_transcript: bool = False  # 是否已有转录文本（用于区分转录中/生成中）
+    tags: Optional[List[str]] = None
+    folder_id: Optional[int] = None
+    status: str
+    created_at: datetime
+
+    @classmethod
+    def from_orm(cls, obj, has_transcript: bool = False):
+        """从 ORM 对象转换（仅访问列表投影中已加载的列）"""
+        data = {
+            "id": obj.id,
+            "title": obj.title,
+            "participants": _load_json(obj, "participants"),
+            "meeting_date": obj.meeting_date,
+            "audio_url": obj.audio_url,
+            "audio_duration": obj.audio_duration,
+            "is_favorite": obj.is_favorite,
+            "is_viewed": obj.is_viewed,
+            "has_transcript": bool(has_transcript),
+            "tags": _load_json(obj, "tags"),
+            "folder_id": obj.folder_id,
+            "status": obj.status.value if hasattr(obj.status, 'value') else obj.status,
+            "created_at": obj.created_at
+        }
+        return cls(**data)
+
+
 class MeetingListResponse(BaseModel):
     """会议列表响应"""
-    total: int
+    total: Optional[int] = None  # with_total=false 时不统计总数
     page: int
     page_size: int
-    items: List[MeetingResponse]
+    items: List[MeetingListItem]
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # 下一页游标，传回 cursor 参数继续翻页
+
+
+class TranscriptParagraph(BaseModel):
+    """转录段落"""
+    index: int  # 段落序号（从0开始）
+    paragraph_id: Optional[str] = None
+    speaker_id: Optional[str] = None
+    start_ms: int
+    end_ms: int
+    text: str
+    words: Optional[List[dict]] = None  # 词级数据（通义听悟原始格式，仅 include_words=true 时返回）
+
+
+class TranscriptParagraphListResponse(BaseModel):
+    """转录段落分段响应"""
+    total: int  # 符合条件的段落总数
+    offset: int
+    limit: int
+    has_more: bool
+    next_offset: Optional[int] = None
+    items: List[TranscriptParagraph]
 
 
 class MeetingStatusResponse(BaseModel):
@@ -218,12 +288,19 @@ class SearchRequest(BaseModel):
     page_size: int = Field(default=20, ge=1, le=100)
 
 
+class SemanticSearchRequest(BaseModel):
+    """语义搜索请求"""
+    q: str = Field(..., min_length=1, description="查询内容（自然语言描述）")
+    type: str = Field(default="all", description="搜索类型：flash/meeting/all")
+    limit: int = Field(default=10, ge=1, le=50)
+
+
 class SearchResultItem(BaseModel):
     """搜索结果项"""
     id: str
     type: str  # flash / meeting
-    title: str
-    highlight: str
+    title: Optional[str] = None
+    highlight: Optional[str] = None  # 命中片段，命中词以 <em> 标记
     score: float
     created_at: datetime
 
@@ -347,6 +424,44 @@ class SpeakerListResponse(BaseModel):
     items: List[SpeakerResponse]
 
 
+# ============ 批量操作 ✨新增 ============
+
+BATCH_MAX_IDS = 100
+
+
+class MeetingBatchRequest(BaseModel):
+    """会议批量操作请求"""
+    ids: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_IDS, description="会议ID列表")
+    action: Literal["move", "favorite", "unfavorite", "mark_viewed", "delete"]
+    folder_id: Optional[int] = Field(None, description="move 的目标知识库ID，为空表示移出知识库")
+
+
+class FlashBatchRequest(BaseModel):
+    """闪记批量操作请求"""
+    ids: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_IDS, description="闪记ID列表")
+    action: Literal["favorite", "unfavorite", "delete"]
+
+
+class SpeakerBatchMapRequest(BaseModel):
+    """批量说话人映射请求"""
+    items: List[SpeakerMapRequest] = Field(..., min_length=1, max_length=BATCH_MAX_IDS, description="说话人映射列表")
+
+
+class BatchItemResult(BaseModel):
+    """批量操作单条结果"""
+    id: str
+    success: bool
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """批量操作响应"""
+    action: str
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+
 # ============ 管理员相关 ✨新增 ============
 
 class AdminLoginRequest(BaseModel):
@@ -363,6 +478,11 @@ class AdminLoginResponse(BaseModel):
     is_superuser: bool
 
 
+class UserStatusUpdate(BaseModel):
+    """启用/停用用户请求 ✨新增"""
+    is_active: bool = Field(..., description="是否启用")
+
+
 class AdminUserResponse(BaseModel):
     """管理员用户响应"""
     id: str
@@ -0,0 +1,110 @@
+"""
+管理员活跃时间服务
+管理员每次请求都会刷新 last_login，改为先记在内存中，由后台线程定期批量写库（write-behind），
+认证路径本身只读；距上次写入不足阈值的刷新直接忽略
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from loguru import logger
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import AdminUser
+
+
+class AdminActivityService:
+    """管理员活跃时间服务"""
+
+    def __init__(self):
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.threshold = timedelta(seconds=60)
+
+    def touch(self, admin: AdminUser, now: Optional[datetime] = None) -> None:
+        """
+        记录管理员活跃（不写库）
+
+        距已保存的 last_login 不足阈值时忽略；否则放入待写缓冲，
+        并更新对象上的值（不标记为脏，避免随其他提交写库）
+        """
+        now = now or datetime.utcnow()
+        if admin.last_login and now - admin.last_login < self.threshold:
+            return
+
+        with self._lock:
+            self._pending[admin.id] = now
+        set_committed_value(admin, "last_login", now)
+
+    def flush(self) -> int:
+        """
+        把缓冲的活跃时间一次性写库
+
+        Returns:
+            写入的管理员数
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        from app.utils.db_writer import db_writer
+
+        def write(db):
+            # 只前进不后退：多进程时以最新时间为准
+            stmt = update(AdminUser).where(
+                AdminUser.id == bindparam("admin_id"),
+                or_(AdminUser.last_login.is_(None), AdminUser.last_login < bindparam("ts"))
+            ).values(last_login=bindparam("ts"))
+            db.connection().execute(stmt, [
+                {"admin_id": admin_id, "ts": ts} for admin_id, ts in pending.items()
+            ])
+
+        try:
+            # 经单写线程提交（SQLite 下与其他后台写操作串行）
+            db_writer.run(write)
+        except Exception as e:
+            # 写失败时放回缓冲，下次重试（保留较新的值）
+            with self._lock:
+                for admin_id, ts in pending.items():
+                    if self._pending.get(admin_id, ts) <= ts:
+                        self._pending[admin_id] = ts
+            logger.error(f"管理员活跃时间写入失败: {e}")
+            return 0
+
+        logger.debug(f"管理员活跃时间写入: {len(pending)} 条")
+        return len(pending)
+
+    def start_flusher(self, interval: int, threshold: int) -> None:
+        """
+        启动后台批量写入线程
+
+        Args:
+            interval: 写入间隔（秒），<=0 表示不启动（缓冲只在关闭时写入）
+            threshold: 活跃时间变化超过该秒数才记录
+        """
+        self.threshold = timedelta(seconds=max(threshold, 0))
+        if interval <= 0 or (self._flusher and self._flusher.is_alive()):
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.flush()
+
+        self._stop.clear()
+        self._flusher = threading.Thread(target=run, name="admin-activity-flusher", daemon=True)
+        self._flusher.start()
+        logger.info(f"管理员活跃时间批量写入已启动，间隔 {interval} 秒")
+
+    def stop_flusher(self) -> None:
+        """停止后台线程并写入剩余缓冲"""
+        self._stop.set()
+        self.flush()
+
+
+# 全局单例
+admin_activity_service = AdminActivityService()
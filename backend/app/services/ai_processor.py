@@ -4,16 +4,21 @@ AI 异步处理器
 """
 
 import json
-import threading
 from typing import Optional
 from loguru import logger
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
+from app.utils.db_writer import db_writer
+from app.services.job_queue import job_queue, PermanentJobError
+from app.services.tingwu_poller import tingwu_poller
 from app.models import Flash
 from app.services.tingwu_service import tingwu_service
 from app.services.classifier import classifier
 from app.services.llm_classifier import llm_classifier
+from app.services.search import search_service
+from app.services.embedding import embedding_service
+from app.services.stats_service import stats_service
 import asyncio
 
 
@@ -26,71 +31,142 @@ def process_flash_ai_async(flash_id: str, audio_url: str, ai_model_id: str = Non
         audio_url: 音频文件URL（需要公网可访问）
         ai_model_id: 使用的AI模型ID（可选）
     """
-    # 在新线程中执行
-    thread = threading.Thread(
-        target=_process_flash_ai,
-        args=(flash_id, audio_url, ai_model_id),
-        daemon=True
+    # 提交到后台任务队列，由工作线程执行
+    job_id = job_queue.enqueue(
+        "flash_ai", {"flash_id": flash_id, "audio_url": audio_url, "ai_model_id": ai_model_id}
     )
-    thread.start()
-    logger.info(f"启动 AI 处理线程: flash_id={flash_id}, model_id={ai_model_id}")
+    logger.info(f"AI 处理任务已入队: flash_id={flash_id}, model_id={ai_model_id}, job_id={job_id}")
+
+
+def _update_flash(db: Session, flash_id: str, category: Optional[str] = None, **fields) -> bool:
+    """
+    更新闪记字段（在写线程中执行）
+
+    Args:
+        db: 写线程提供的会话
+        flash_id: 闪记ID
+        category: 新分类（传入时同步更新分类统计）
+        fields: 要更新的字段
+
+    Returns:
+        闪记是否存在
+    """
+    flash = db.query(Flash).filter(Flash.id == flash_id).first()
+    if not flash:
+        return False
+
+    for name, value in fields.items():
+        setattr(flash, name, value)
+    if category is not None:
+        old_category = flash.category
+        flash.category = category
+        stats_service.recategorize_flash(db, flash, old_category)
+    db.commit()
+    return True
+
+
+def _index_flash(flash_id: str) -> None:
+    """重建闪记的检索索引和语义向量（分词和向量化在调用线程中完成，写线程只执行写入）"""
+    try:
+        with SessionLocal() as db:
+            flash = db.query(Flash).filter(Flash.id == flash_id).first()
+            if not flash:
+                return
+            document = search_service.prepare_flash(flash)
+            vector = embedding_service.prepare_flash(flash)
+        db_writer.run(search_service.write_prepared, document)
+        db_writer.run(embedding_service.write_prepared, vector)
+    except Exception as e:
+        # 索引失败不影响业务数据，可通过 rebuild 补建
+        logger.error(f"更新闪记索引失败: flash_id={flash_id}, {e}")
 
 
 def _process_flash_ai(flash_id: str, audio_url: str, ai_model_id: str = None):
     """
-    执行 AI 处理（在后台线程中）
+    提交闪记 AI 处理（在任务队列的工作线程中）
     
     流程：
     1. 提交通义听悟任务
-    2. 轮询等待完成
-    3. 解析结果
-    4. 智能分类（使用LLM或规则）
-    5. 更新数据库
+    2. 登记到 tingwu_poller 统一轮询，完成后由 flash_ai_result 任务处理结果
     
     Args:
         flash_id: 闪记ID
         audio_url: 音频URL
         ai_model_id: AI模型ID（可选）
     """
-    db: Session = SessionLocal()
-    
     try:
         # 1. 查询闪记记录
-        flash = db.query(Flash).filter(Flash.id == flash_id).first()
+        with SessionLocal() as db:
+            flash = db.query(
+                Flash.id, Flash.audio_duration, Flash.ai_status, Flash.ai_task_id
+            ).filter(Flash.id == flash_id).first()
         if not flash:
             logger.error(f"闪记不存在: {flash_id}")
             return
         
-        # 2. 提交通义听悟任务
-        logger.info(f"提交通义听悟任务: flash_id={flash_id}, audio_url={audio_url}")
-        
-        # 闪记配置：不需要说话人分离
-        task_result = tingwu_service.create_task(
-            file_url=audio_url,
-            source_language="cn",  # 中文
-            enable_summarization=True,
-            enable_chapters=False,  # 短音频不需要章节
-            enable_meeting_assistance=True,  # 开启会议助手获取关键句
-            enable_speaker_diarization=False  # 闪记不需要说话人分离
-        )
-        
-        task_id = task_result['task_id']
-        
-        # 更新状态为处理中
-        flash.ai_status = 'processing'
-        flash.ai_task_id = task_id
-        db.commit()
-        
-        logger.info(f"通义听悟任务已提交: task_id={task_id}")
+        if flash.ai_status == 'processing' and flash.ai_task_id:
+            # 上次执行已提交听悟任务（之后的步骤失败），复用，不重复提交
+            task_id = flash.ai_task_id
+            logger.info(f"复用已提交的通义听悟任务: flash_id={flash_id}, task_id={task_id}")
+        else:
+            # 2. 提交通义听悟任务
+            logger.info(f"提交通义听悟任务: flash_id={flash_id}, audio_url={audio_url}")
+            
+            # 闪记配置：不需要说话人分离
+            task_result = tingwu_service.create_task(
+                file_url=audio_url,
+                source_language="cn",  # 中文
+                enable_summarization=True,
+                enable_chapters=False,  # 短音频不需要章节
+                enable_meeting_assistance=True,  # 开启会议助手获取关键句
+                enable_speaker_diarization=False  # 闪记不需要说话人分离
+            )
+            
+            task_id = task_result['task_id']
+            
+            # 更新状态为处理中（立即保存任务ID，重试时复用）
+            db_writer.run(_update_flash, flash_id, ai_status='processing', ai_task_id=task_id)
+            
+            logger.info(f"通义听悟任务已提交: task_id={task_id}")
         
-        # 3. 等待任务完成（轮询，最多等待30分钟）
-        result = tingwu_service.wait_for_completion(
-            task_id=task_id,
-            max_wait_seconds=1800,  # 30分钟
-            poll_interval=5  # 每5秒查询一次
+        # 3. 登记轮询（按音频时长安排查询时间，最多等待30分钟）
+        tingwu_poller.track(
+            task_id,
+            "flash_ai_result",
+            {"flash_id": flash_id, "ai_model_id": ai_model_id},
+            audio_duration=flash.audio_duration,
+            max_wait_seconds=1800  # 30分钟
         )
         
-        # 4. 解析结果
+    except Exception as e:
+        logger.error(f"AI 处理失败: flash_id={flash_id}, error={e}")
+        
+        # 交给任务队列重试，最终失败时记录错误状态
+        raise
+
+
+def _process_flash_ai_result(flash_id: str, task_id: str, ai_model_id: str = None, error: Optional[str] = None):
+    """
+    处理闪记转写结果（听悟任务结束后由 tingwu_poller 提交）
+    
+    流程：
+    1. 下载并解析结果
+    2. 智能分类（使用LLM或规则）
+    3. 更新数据库
+    
+    Args:
+        flash_id: 闪记ID
+        task_id: 听悟任务ID
+        ai_model_id: AI模型ID（可选）
+        error: 听悟任务失败或超时的原因
+    """
+    if error:
+        # 听悟任务已失败，重试无意义
+        raise PermanentJobError(error)
+    
+    try:
+        # 1. 解析结果
+        result = tingwu_service.get_task_status(task_id)
         parsed_result = result.get('result', {})
         transcription = parsed_result.get('transcription', '')
         summary = parsed_result.get('summary', '')
@@ -98,10 +174,11 @@ def _process_flash_ai(flash_id: str, audio_url: str, ai_model_id: str = None):
         
         logger.info(f"转写完成: flash_id={flash_id}, 文本长度={len(transcription)}")
         
-        # 5. 智能分类（如果指定了AI模型，使用LLM分类，否则使用规则分类）
+        # 2. 智能分类（如果指定了AI模型，使用LLM分类，否则使用规则分类）
         if ai_model_id:
             try:
-                category = asyncio.run(llm_classifier.classify(transcription, model_id=ai_model_id, db=db))
+                with SessionLocal() as db:
+                    category = asyncio.run(llm_classifier.classify(transcription, model_id=ai_model_id, db=db))
                 logger.info(f"使用 LLM 分类: {category}")
             except Exception as e:
                 logger.error(f"LLM 分类失败，降级到规则分类: {e}")
@@ -109,16 +186,17 @@ def _process_flash_ai(flash_id: str, audio_url: str, ai_model_id: str = None):
         else:
             category = classifier.classify(transcription)
         
-        # 6. 提取关键词（如果指定了AI模型，使用LLM提取，否则使用规则提取）
+        # 3. 提取关键词（如果指定了AI模型，使用LLM提取，否则使用规则提取）
         if ai_model_id:
             try:
-                keywords = asyncio.run(llm_classifier.extract_keywords(
-                    text=transcription,
-                    summary=summary,
-                    key_sentences=key_sentences,
-                    model_id=ai_model_id,
-                    db=db
-                ))
+                with SessionLocal() as db:
+                    keywords = asyncio.run(llm_classifier.extract_keywords(
+                        text=transcription,
+                        summary=summary,
+                        key_sentences=key_sentences,
+                        model_id=ai_model_id,
+                        db=db
+                    ))
                 logger.info(f"使用 LLM 提取关键词: {keywords}")
             except Exception as e:
                 logger.error(f"LLM 关键词提取失败，降级到规则提取: {e}")
@@ -134,39 +212,42 @@ def _process_flash_ai(flash_id: str, audio_url: str, ai_model_id: str = None):
                 key_sentences=key_sentences
             )
         
-        # 7. 生成标题（摘要的前20字或转写文本的前20字）
+        # 4. 生成标题（摘要的前20字或转写文本的前20字）
         title = summary[:20] if summary else transcription[:20]
         if not title:
             title = "语音记录"
         
-        # 8. 更新数据库
-        flash.content = transcription or '语音转写中...'
-        flash.title = title
-        flash.summary = summary
-        flash.keywords = json.dumps(keywords, ensure_ascii=False)
-        flash.category = category
-        flash.ai_status = 'completed'
-        flash.ai_error = None
-        
-        db.commit()
+        # 5. 更新数据库
+        db_writer.run(
+            _update_flash, flash_id, category=category,
+            content=transcription or '语音转写中...',
+            title=title,
+            summary=summary,
+            keywords=json.dumps(keywords, ensure_ascii=False),
+            ai_status='completed',
+            ai_error=None
+        )
+        _index_flash(flash_id)
         
         logger.info(f"AI 处理完成: flash_id={flash_id}, category={category}, keywords={keywords}")
         
     except Exception as e:
-        logger.error(f"AI 处理失败: flash_id={flash_id}, error={e}")
+        logger.error(f"AI 结果处理失败: flash_id={flash_id}, error={e}")
         
-        # 更新错误状态
-        try:
-            flash = db.query(Flash).filter(Flash.id == flash_id).first()
-            if flash:
-                flash.ai_status = 'failed'
-                flash.ai_error = str(e)
-                db.commit()
-        except:
-            pass
-            
-    finally:
-        db.close()
+        # 交给任务队列重试，最终失败时记录错误状态
+        raise
+
+
+def _mark_flash_failed(payload: dict, error: str) -> None:
+    """把闪记标记为失败（任务最终失败时调用）"""
+    try:
+        db_writer.run(_update_flash, payload["flash_id"], ai_status='failed', ai_error=error)
+    except Exception as e:
+        logger.error(f"更新闪记失败状态时出错: {e}")
+
+
+job_queue.register("flash_ai", _process_flash_ai, on_failure=_mark_flash_failed)
+job_queue.register("flash_ai_result", _process_flash_ai_result, on_failure=_mark_flash_failed)
 
 
 def check_flash_ai_status(flash_id: str) -> dict:
@@ -198,7 +279,7 @@ def check_flash_ai_status(flash_id: str) -> dict:
         # 如果正在处理中，查询通义听悟任务进度
         if flash.ai_status == 'processing' and flash.ai_task_id:
             try:
-                task_status = tingwu_service.get_task_status(flash.ai_task_id)
+                task_status = tingwu_service.get_task_status(flash.ai_task_id, parse_result=False)
                 if task_status['status'] == 'SUCCEEDED':
                     # 任务已完成但数据库还没更新，触发更新
                     status_info['status'] = 'processing'
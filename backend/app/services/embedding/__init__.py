@@ -0,0 +1,17 @@
+"""
+语义向量检索服务
+"""
+
+from .base import BaseEmbedder
+from .hashing import HashingEmbedder
+from .service import EmbeddingService, PreparedVector, embedding_service, get_embedder, top_k
+
+__all__ = [
+    "BaseEmbedder",
+    "HashingEmbedder",
+    "EmbeddingService",
+    "PreparedVector",
+    "embedding_service",
+    "get_embedder",
+    "top_k",
+]
@@ -0,0 +1,29 @@
+"""
+向量化模型基类
+"""
+
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+
+
+class BaseEmbedder(ABC):
+    """向量化模型基类"""
+
+    # 模型标识（写入 embeddings.model），维度或算法变化时必须随之变化
+    name: str = "base"
+    dim: int = 0
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        批量生成向量
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            shape 为 (len(texts), dim) 的 float32 矩阵，每行已 L2 归一化（空文本为全零行）
+        """
+        pass
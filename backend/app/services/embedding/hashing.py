@@ -0,0 +1,53 @@
+"""
+本地哈希向量化模型
+检索词（中文二元组/英文单词）经带符号的特征哈希映射到稀疏空间，
+按对数词频加权后用固定随机投影压缩为稠密向量；纯 CPU、无外部依赖、结果可复现
+"""
+
+import zlib
+from collections import Counter
+from typing import List
+
+import numpy as np
+
+from app.services.search.tokenizer import tokenize
+from .base import BaseEmbedder
+
+# 哈希空间维度（2 的幂）与随机投影的种子；修改任意一个都需要重建向量
+HASH_DIM = 4096
+PROJECTION_SEED = 20240917
+
+
+class HashingEmbedder(BaseEmbedder):
+    """哈希 n-gram + 随机投影向量化"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        rng = np.random.default_rng(PROJECTION_SEED)
+        self._projection = (rng.standard_normal((HASH_DIM, dim)) / np.sqrt(dim)).astype(np.float32)
+
+    def _features(self, text: str) -> np.ndarray:
+        """文本 -> 哈希空间中的加权词频向量"""
+        features = np.zeros(HASH_DIM, dtype=np.float32)
+        counts = Counter(tokenize(text))
+        if not counts:
+            return features
+
+        # crc32 跨进程稳定（内置 hash 受 PYTHONHASHSEED 影响）
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in counts), dtype=np.uint32, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+
+        buckets = hashes & (HASH_DIM - 1)
+        # 最高位决定符号，哈希冲突在期望上相互抵消
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(features, buckets, signs * (1.0 + np.log(tf)))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        features = np.stack([self._features(text) for text in texts])
+        vectors = features @ self._projection
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
@@ -0,0 +1,393 @@
+"""
+语义向量检索服务
+转录/总结完成后生成向量写入 embeddings 表；检索时按用户把向量加载为
+float32 矩阵缓存在内存中，一次矩阵乘法完成余弦相似度计算并取 top-k
+
+向量可能由其他进程（任务队列的工作线程）写入，每次检索先查询该用户向量的
+行数 / 最大 ID / 最近更新时间，与缓存时不一致则重新加载矩阵
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.models import Embedding, Flash, Meeting
+from app.services.search.tokenizer import json_text
+from .base import BaseEmbedder
+from .hashing import HashingEmbedder
+
+# 可用的向量化模型
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+}
+
+
+def get_embedder(provider: Optional[str] = None) -> Optional[BaseEmbedder]:
+    """
+    根据配置创建向量化模型
+
+    Args:
+        provider: 模型名称，默认读取 settings.EMBEDDING_PROVIDER；none 表示关闭
+
+    Returns:
+        向量化模型实例，关闭或未知时返回 None
+    """
+    provider = (provider or settings.EMBEDDING_PROVIDER or "none").lower()
+    if provider == "none":
+        return None
+
+    embedder_cls = EMBEDDERS.get(provider)
+    if embedder_cls is None:
+        logger.warning(f"未知的向量化模型: {provider}，语义检索已关闭")
+        return None
+    return embedder_cls(dim=settings.EMBEDDING_DIM)
+
+
+def top_k(matrix: np.ndarray, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量余弦相似度 top-k（向量均已归一化，点积即余弦相似度）
+
+    Args:
+        matrix: (n, dim) 文档向量
+        queries: (m, dim) 查询向量
+        k: 每个查询返回的数量
+
+    Returns:
+        (下标矩阵 (m, k), 相似度矩阵 (m, k))，按相似度降序
+    """
+    scores = queries @ matrix.T
+    k = min(k, matrix.shape[0])
+    # argpartition 取前 k 个（O(n)），只对这 k 个排序
+    indexes = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, indexes, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(indexes, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+class PreparedVector(NamedTuple):
+    """已生成、待写入 embeddings 表的向量"""
+    doc_type: str
+    doc_id: str
+    user_id: str
+    model: str
+    vector: bytes
+
+
+class _UserMatrix:
+    """单个用户的向量矩阵"""
+
+    def __init__(self, matrix: np.ndarray, doc_types: np.ndarray, doc_ids: List[str], signature: Tuple):
+        self.matrix = matrix
+        self.doc_types = doc_types
+        self.doc_ids = doc_ids
+        self.signature = signature  # 加载时的 (行数, 最大ID, 最近更新时间)
+
+
+class EmbeddingService:
+    """语义向量检索服务"""
+
+    def __init__(self):
+        self._embedder: Optional[BaseEmbedder] = None
+        self._embedder_loaded = False
+        self._cache: "OrderedDict[str, _UserMatrix]" = OrderedDict()
+        # 每个用户的写入版本号：加载期间发生写入时，加载结果不进入缓存
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def embedder(self) -> Optional[BaseEmbedder]:
+        if not self._embedder_loaded:
+            self._embedder = get_embedder()
+            self._embedder_loaded = True
+        return self._embedder
+
+    # ==================== 向量维护 ====================
+
+    def _prepare(self, doc_type: str, doc_id: str, user_id: str, text: str) -> Optional[PreparedVector]:
+        embedder = self.embedder
+        if embedder is None:
+            return None
+        vector = embedder.embed([text])[0]
+        return PreparedVector(doc_type, doc_id, user_id, embedder.name, vector.tobytes())
+
+    def prepare_flash(self, flash: Flash) -> Optional[PreparedVector]:
+        """生成闪记向量（不写库，可在写线程之外执行），语义检索关闭时返回 None ✨新增"""
+        text = " ".join(filter(None, [flash.title, flash.summary, json_text(flash.keywords), flash.content]))
+        return self._prepare("flash", flash.id, flash.user_id, text)
+
+    def prepare_meeting(self, meeting: Meeting) -> Optional[PreparedVector]:
+        """生成会议向量（不写库，可在写线程之外执行），语义检索关闭时返回 None ✨新增"""
+        text = " ".join(filter(None, [
+            meeting.title,
+            meeting.summary,
+            json_text(meeting.key_points),
+            json_text(meeting.action_items),
+            json_text(meeting.tags),
+            meeting.transcript,
+        ]))
+        return self._prepare("meeting", meeting.id, meeting.user_id, text)
+
+    def index_flash(self, db: Session, flash: Flash) -> None:
+        """生成/更新闪记向量（在业务提交之后调用）"""
+        try:
+            self.write_prepared(db, self.prepare_flash(flash))
+        except Exception as e:
+            logger.error(f"生成语义向量失败: flash={flash.id}, {e}")
+
+    def index_meeting(self, db: Session, meeting: Meeting) -> None:
+        """生成/更新会议向量（在业务提交之后调用）"""
+        try:
+            self.write_prepared(db, self.prepare_meeting(meeting))
+        except Exception as e:
+            logger.error(f"生成语义向量失败: meeting={meeting.id}, {e}")
+
+    def write_prepared(self, db: Session, prepared: Optional[PreparedVector]) -> None:
+        """写入已生成的向量（只有一次 upsert，可经单写线程执行）✨新增"""
+        if prepared is None:
+            return
+
+        try:
+            row = db.query(Embedding).filter(
+                Embedding.doc_type == prepared.doc_type,
+                Embedding.doc_id == prepared.doc_id
+            ).first()
+            if row is None:
+                row = Embedding(doc_type=prepared.doc_type, doc_id=prepared.doc_id, user_id=prepared.user_id)
+                db.add(row)
+            row.model = prepared.model
+            row.vector = prepared.vector
+            db.commit()
+
+            self.invalidate(prepared.user_id)
+        except Exception as e:
+            # 向量失败不影响业务数据，可通过 rebuild 补建
+            db.rollback()
+            logger.error(f"更新语义向量失败: {prepared.doc_type}={prepared.doc_id}, {e}")
+
+    def copy(self, db: Session, doc_type: str, source_id: str, doc_id: str, user_id: str) -> bool:
+        """
+        复制文档向量（副本内容相同，无需重新计算；在业务提交之后调用）
+
+        Returns:
+            是否已复制；源文档没有向量时返回 False，由调用方重新生成
+        """
+        if self.embedder is None:
+            return True
+
+        try:
+            source = db.query(Embedding.model, Embedding.vector).filter(
+                Embedding.doc_type == doc_type,
+                Embedding.doc_id == source_id
+            ).first()
+            if source is None:
+                return False
+
+            db.add(Embedding(
+                doc_type=doc_type,
+                doc_id=doc_id,
+                user_id=user_id,
+                model=source.model,
+                vector=source.vector
+            ))
+            db.commit()
+            self.invalidate(user_id)
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"复制语义向量失败: {doc_type}={source_id}->{doc_id}, {e}")
+            return True
+
+    def remove(self, db: Session, doc_type: str, doc_id: str) -> None:
+        """删除文档向量（在业务提交之后调用）"""
+        self.remove_many(db, doc_type, [doc_id])
+
+    def remove_many(self, db: Session, doc_type: str, doc_ids: List[str]) -> None:
+        """批量删除文档向量（在业务提交之后调用，单个事务）"""
+        if not doc_ids:
+            return
+
+        try:
+            scope = db.query(Embedding).filter(
+                Embedding.doc_type == doc_type,
+                Embedding.doc_id.in_(doc_ids)
+            )
+            user_ids = {user_id for (user_id,) in scope.with_entities(Embedding.user_id).distinct()}
+            if user_ids:
+                scope.delete(synchronize_session=False)
+                db.commit()
+                for user_id in user_ids:
+                    self.invalidate(user_id)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"删除语义向量失败: {doc_type}={doc_ids}, {e}")
+
+    def invalidate(self, user_id: str) -> None:
+        """使用户的向量矩阵缓存失效"""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._cache.pop(user_id, None)
+
+    def rebuild(self, db: Session, user_id: Optional[str] = None) -> int:
+        """
+        重建向量
+
+        Args:
+            db: 数据库会话
+            user_id: 只重建该用户的文档，为空表示全部
+
+        Returns:
+            写入的文档数
+        """
+        if self.embedder is None:
+            logger.warning("语义检索已关闭（EMBEDDING_PROVIDER=none），跳过重建")
+            return 0
+
+        count = 0
+        for model, index in ((Flash, self.index_flash), (Meeting, self.index_meeting)):
+            query = db.query(model.id)
+            if user_id:
+                query = query.filter(model.user_id == user_id)
+            # 逐条加载，避免一次性把全部转录读入内存
+            for (record_id,) in query.all():
+                record = db.query(model).filter(model.id == record_id).first()
+                if record:
+                    index(db, record)
+                    db.expunge(record)
+                    count += 1
+        logger.info(f"语义向量重建完成: user_id={user_id or 'ALL'}, 文档数={count}")
+        return count
+
+    # ==================== 检索 ====================
+
+    def _signature(self, db: Session, user_id: str) -> Tuple:
+        """用户向量的 (行数, 最大ID, 最近更新时间)，任一进程增删改向量后都会变化"""
+        return tuple(db.query(
+            func.count(Embedding.id),
+            func.max(Embedding.id),
+            func.max(Embedding.updated_at)
+        ).filter(
+            Embedding.user_id == user_id,
+            Embedding.model == self.embedder.name
+        ).one())
+
+    def _load_matrix(self, db: Session, user_id: str) -> Optional[_UserMatrix]:
+        """获取用户的向量矩阵（缓存与数据库一致时读缓存）"""
+        # 先取签名再加载：加载期间有写入时签名偏旧，下次检索会重新加载
+        signature = self._signature(db, user_id)
+        if not signature[0]:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and cached.signature == signature:
+                self._cache.move_to_end(user_id)
+                return cached
+            generation = self._generations.get(user_id, 0)
+
+        rows = db.query(Embedding.doc_type, Embedding.doc_id, Embedding.vector).filter(
+            Embedding.user_id == user_id,
+            Embedding.model == self.embedder.name
+        ).all()
+        if not rows:
+            return None
+
+        user_matrix = _UserMatrix(
+            matrix=np.vstack([np.frombuffer(row.vector, dtype=np.float32) for row in rows]),
+            doc_types=np.array([row.doc_type for row in rows]),
+            doc_ids=[row.doc_id for row in rows],
+            signature=signature,
+        )
+
+        with self._lock:
+            if self._generations.get(user_id, 0) == generation:
+                self._cache[user_id] = user_matrix
+                while len(self._cache) > settings.EMBEDDING_CACHE_USERS:
+                    self._cache.popitem(last=False)
+        return user_matrix
+
+    def search(
+        self,
+        db: Session,
+        user_id: str,
+        q: str,
+        doc_type: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Dict]:
+        """
+        语义检索当前用户的闪记/会议
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            q: 查询文本
+            doc_type: flash / meeting，为空或 all 表示全部
+            limit: 返回数量
+
+        Returns:
+            按相似度降序的结果列表
+        """
+        embedder = self.embedder
+        if embedder is None:
+            raise NotImplementedError("语义检索未启用")
+
+        user_matrix = self._load_matrix(db, user_id)
+        if user_matrix is None:
+            return []
+
+        query = embedder.embed([q])
+        if not query.any():
+            return []
+
+        matrix = user_matrix.matrix
+        doc_types = user_matrix.doc_types
+        doc_ids = user_matrix.doc_ids
+        if doc_type in ("flash", "meeting"):
+            mask = doc_types == doc_type
+            if not mask.any():
+                return []
+            positions = np.flatnonzero(mask)
+            matrix, doc_types = matrix[positions], doc_types[positions]
+            doc_ids = [doc_ids[i] for i in positions]
+
+        indexes, scores = top_k(matrix, query, limit)
+        hits = [
+            (str(doc_types[i]), doc_ids[i], float(score))
+            for i, score in zip(indexes[0], scores[0])
+            if score >= settings.EMBEDDING_MIN_SCORE
+        ]
+        return self._build_results(db, hits)
+
+    @staticmethod
+    def _build_results(db: Session, hits: List[Tuple[str, str, float]]) -> List[Dict]:
+        """补充标题和创建时间（只查询需要的列）"""
+        records = {}
+        for doc_type, model in (("flash", Flash), ("meeting", Meeting)):
+            ids = [doc_id for hit_type, doc_id, _ in hits if hit_type == doc_type]
+            if ids:
+                for row in db.query(model.id, model.title, model.created_at).filter(model.id.in_(ids)):
+                    records[(doc_type, row.id)] = row
+
+        results = []
+        for doc_type, doc_id, score in hits:
+            record = records.get((doc_type, doc_id))
+            if record is None:
+                continue
+            results.append({
+                "id": doc_id,
+                "type": doc_type,
+                "title": record.title,
+                "highlight": None,
+                "score": score,
+                "created_at": record.created_at,
+            })
+        return results
+
+
+# 全局单例
+embedding_service = EmbeddingService()
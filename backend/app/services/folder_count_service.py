@@ -0,0 +1,170 @@
+"""
+知识库会议计数服务
+folders.meeting_count 与 users.uncategorized_meeting_count 为冗余计数，
+在会议创建/移动/复制/删除时于同一事务内增量更新，知识库列表直接读取；
+定期对账任务修复可能出现的偏差
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Folder, Meeting, User
+
+
+class FolderCountService:
+    """知识库会议计数服务"""
+
+    def __init__(self):
+        self._reconciler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _adjust(self, db: Session, user_id: str, folder_id: Optional[int], delta: int) -> None:
+        """在调用方事务内原子累加（UPDATE ... SET count = count + delta）"""
+        if not delta:
+            return
+        if folder_id is None:
+            db.query(User).filter(User.id == user_id).update(
+                {User.uncategorized_meeting_count: User.uncategorized_meeting_count + delta},
+                synchronize_session=False
+            )
+        else:
+            # 限定用户：folder_id 指向他人或不存在的知识库时不计数（与列表统计口径一致）
+            db.query(Folder).filter(
+                Folder.id == folder_id,
+                Folder.user_id == user_id
+            ).update(
+                {Folder.meeting_count: Folder.meeting_count + delta},
+                synchronize_session=False
+            )
+
+    # ==================== 增量更新（在业务提交之前调用） ====================
+
+    def add_meeting(self, db: Session, meeting: Meeting, sign: int = 1) -> None:
+        """记录新增会议；sign=-1 表示删除"""
+        self._adjust(db, meeting.user_id, meeting.folder_id, sign)
+
+    def remove_meeting(self, db: Session, meeting: Meeting) -> None:
+        """记录删除会议"""
+        self.add_meeting(db, meeting, sign=-1)
+
+    def move_meeting(
+        self,
+        db: Session,
+        user_id: str,
+        old_folder_id: Optional[int],
+        new_folder_id: Optional[int],
+    ) -> None:
+        """记录会议在知识库之间移动"""
+        if old_folder_id == new_folder_id:
+            return
+        self._adjust(db, user_id, old_folder_id, -1)
+        self._adjust(db, user_id, new_folder_id, 1)
+
+    def apply(self, db: Session, user_id: str, deltas: Dict[Optional[int], int]) -> None:
+        """
+        批量操作时合并后一次性更新
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            deltas: {知识库ID（None 表示未分类）: 变化量}
+        """
+        for folder_id, delta in deltas.items():
+            self._adjust(db, user_id, folder_id, delta)
+
+    @staticmethod
+    def deltas_for_removal(folder_ids: Iterable[Optional[int]]) -> Dict[Optional[int], int]:
+        """删除一批会议时各知识库的变化量"""
+        return {folder_id: -count for folder_id, count in Counter(folder_ids).items()}
+
+    # ==================== 读取 ====================
+
+    def get_uncategorized_count(self, db: Session, user_id: str) -> int:
+        """读取未分类会议数（主键查询）"""
+        count = db.query(User.uncategorized_meeting_count).filter(User.id == user_id).scalar()
+        return max(count or 0, 0)
+
+    # ==================== 对账 ====================
+
+    def reconcile(self, db: Session, user_id: Optional[str] = None) -> int:
+        """
+        按会议表重新计算计数，只修正有偏差的行
+
+        Args:
+            db: 数据库会话
+            user_id: 只对账该用户，为空表示全部
+
+        Returns:
+            修正的行数
+        """
+        # 每类计数一条 UPDATE，实际数量由关联子查询在同一语句内计算：
+        # 不在读取与写入之间留出窗口，避免覆盖请求处理中并发提交的增量
+        folder_actual = select(func.count(Meeting.id)).where(
+            Meeting.folder_id == Folder.id,
+            Meeting.user_id == Folder.user_id
+        ).correlate(Folder).scalar_subquery()
+        folder_update = update(Folder).where(
+            Folder.meeting_count != folder_actual
+        ).values(meeting_count=folder_actual)
+        if user_id:
+            folder_update = folder_update.where(Folder.user_id == user_id)
+
+        user_actual = select(func.count(Meeting.id)).where(
+            Meeting.user_id == User.id,
+            Meeting.folder_id.is_(None)
+        ).correlate(User).scalar_subquery()
+        user_update = update(User).where(
+            User.uncategorized_meeting_count != user_actual
+        ).values(uncategorized_meeting_count=user_actual)
+        if user_id:
+            user_update = user_update.where(User.id == user_id)
+
+        fixed = 0
+        for statement in (folder_update, user_update):
+            fixed += db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+        db.commit()
+
+        if fixed:
+            logger.warning(f"知识库计数对账: 修正 {fixed} 行 (user_id={user_id or 'ALL'})")
+        else:
+            logger.info(f"知识库计数对账: 无偏差 (user_id={user_id or 'ALL'})")
+        return fixed
+
+    def start_reconciler(self, interval: int) -> None:
+        """
+        启动后台定期对账线程
+
+        Args:
+            interval: 对账间隔（秒），<=0 表示不启动
+        """
+        if interval <= 0 or (self._reconciler and self._reconciler.is_alive()):
+            return
+
+        def run():
+            from app.utils.db_writer import db_writer
+
+            while not self._stop.wait(interval):
+                try:
+                    # 经单写线程执行（SQLite 下与其他后台写操作串行）
+                    db_writer.run(self.reconcile)
+                except Exception as e:
+                    logger.error(f"知识库计数对账失败: {e}")
+
+        self._stop.clear()
+        self._reconciler = threading.Thread(target=run, name="folder-count-reconciler", daemon=True)
+        self._reconciler.start()
+        logger.info(f"知识库计数对账任务已启动，间隔 {interval} 秒")
+
+    def stop_reconciler(self) -> None:
+        """停止后台对账线程"""
+        self._stop.set()
+
+
+# 全局单例
+folder_count_service = FolderCountService()
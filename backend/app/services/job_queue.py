@@ -0,0 +1,403 @@
+"""
+后台任务队列
+任务持久化在 jobs 表，由固定数量的工作线程领取执行，取代“每个任务一个线程”：
+  - 各类任务有独立的并发上限（JOB_CONCURRENCY，所有进程合计），突发上传只会排队，不会创建成百上千个线程
+  - 领取时写入租约并在执行中定期续期；进程退出后租约过期的任务会被其他进程或重启后的本进程重新领取
+  - 处理函数抛出异常时按指数退避重试，超过 JOB_MAX_ATTEMPTS 后（或抛出 PermanentJobError 时）标记失败并回调 on_failure
+
+领取在 PostgreSQL 上使用 SELECT ... FOR UPDATE SKIP LOCKED，多个进程互不等待；
+SQLite 不支持行锁，靠带条件的 UPDATE（只有一个进程能改成功）保证同一任务只被领取一次。
+并发上限按 jobs 表中租约有效的 running 行计数；PostgreSQL 上同一类型的领取用事务级 advisory lock 串行，
+SQLite 的写事务本身串行（其他进程并发写入时领取报错，下个周期重试）。
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.models import Job
+from app.utils.db_writer import db_writer
+from app.utils.metrics import metrics
+
+
+class PermanentJobError(Exception):
+    """不可重试的失败（如外部任务已明确失败），直接标记任务失败"""
+
+
+@dataclass
+class _JobType:
+    """已注册的任务类型"""
+    handler: Callable[..., Any]
+    on_failure: Optional[Callable[[Dict, str], None]]
+    concurrency: int
+    max_attempts: int
+
+
+@dataclass
+class _ClaimedJob:
+    """已领取、等待执行的任务"""
+    id: int
+    job_type: str
+    payload: Dict
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    """持久化任务队列 + 工作线程池"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._types: Dict[str, _JobType] = {}
+        self._running: Dict[str, int] = {}  # 本进程各类任务执行中（含已领取待执行）的数量
+        self._running_ids: set = set()
+        self._lock = threading.Lock()
+        self._ready: "queue.Queue[Optional[_ClaimedJob]]" = queue.Queue()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._workers = 0
+
+    # ==================== 注册与提交 ====================
+
+    def register(
+        self,
+        job_type: str,
+        handler: Callable[..., Any],
+        on_failure: Optional[Callable[[Dict, str], None]] = None,
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        """
+        注册任务类型
+
+        Args:
+            job_type: 任务类型
+            handler: 处理函数，以 payload 为关键字参数调用；抛出异常视为失败
+            on_failure: 最终失败（不再重试）时的回调 on_failure(payload, error)
+            max_attempts: 最多执行次数，默认 JOB_MAX_ATTEMPTS
+        """
+        concurrency = settings.job_concurrency_map.get(job_type, settings.JOB_WORKERS)
+        self._types[job_type] = _JobType(
+            handler=handler,
+            on_failure=on_failure,
+            concurrency=max(concurrency, 1),
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        )
+
+    def enqueue(self, job_type: str, payload: Dict, delay: float = 0) -> int:
+        """
+        提交任务（写入 jobs 表后立即返回）
+
+        Args:
+            job_type: 已注册的任务类型
+            payload: 任务参数（可 JSON 序列化）
+            delay: 延迟执行的秒数
+
+        Returns:
+            任务ID
+        """
+        job_id = db_writer.run(lambda db: self.add(db, job_type, payload, delay).id)
+        self.notify()
+        return job_id
+
+    def add(self, db: Session, job_type: str, payload: Dict, delay: float = 0) -> Job:
+        """
+        在调用方的事务中添加任务（随调用方提交生效，提交后可调用 notify 立即调度）
+
+        Args:
+            db: 调用方会话
+            job_type: 已注册的任务类型
+            payload: 任务参数（可 JSON 序列化）
+            delay: 延迟执行的秒数
+        """
+        job_def = self._types.get(job_type)
+        if job_def is None:
+            raise ValueError(f"未注册的任务类型: {job_type}")
+
+        job = Job(
+            job_type=job_type,
+            payload=json.dumps(payload, ensure_ascii=False),
+            max_attempts=job_def.max_attempts,
+            run_at=datetime.utcnow() + timedelta(seconds=delay),
+        )
+        db.add(job)
+        db.flush()
+        metrics.increment("jobs_enqueued_total", job_type=job_type)
+        return job
+
+    def notify(self) -> None:
+        """唤醒调度线程，立即领取新任务"""
+        self._wakeup.set()
+
+    # ==================== 领取 ====================
+
+    def _claimable(self, now: datetime):
+        """可领取：待执行且已到时间，或执行中但租约已过期（领取者已退出）"""
+        return or_(
+            and_(Job.status == "pending", Job.run_at <= now),
+            and_(Job.status == "running", Job.lease_expires_at < now),
+        )
+
+    def _claim(self, db: Session, job_type: str, limit: int, concurrency: int) -> List[_ClaimedJob]:
+        """领取最多 limit 个任务，且所有进程执行中的该类任务不超过 concurrency（在写线程中执行）"""
+        now = datetime.utcnow()
+        if db.get_bind().dialect.name == "postgresql":
+            # 同一类型的领取在各进程间串行，计数与领取之间不会有其他进程插入
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": zlib.crc32(job_type.encode())})
+
+        running = db.execute(
+            select(func.count(Job.id)).where(
+                Job.job_type == job_type,
+                Job.status == "running",
+                Job.lease_expires_at >= now,
+            )
+        ).scalar()
+        limit = min(limit, concurrency - running)
+        if limit <= 0:
+            return []
+
+        candidates = db.execute(
+            select(Job.id)
+            .where(Job.job_type == job_type, self._claimable(now))
+            .order_by(Job.run_at, Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        claimed_ids = []
+        for job_id in candidates:
+            result = db.execute(
+                update(Job)
+                .where(Job.id == job_id, self._claimable(now))
+                .values(
+                    status="running",
+                    locked_by=self.worker_id,
+                    lease_expires_at=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    attempts=Job.attempts + 1,
+                    updated_at=now,
+                )
+            )
+            if result.rowcount == 1:
+                claimed_ids.append(job_id)
+        if not claimed_ids:
+            return []
+
+        rows = db.execute(
+            select(Job.id, Job.payload, Job.attempts, Job.max_attempts).where(Job.id.in_(claimed_ids))
+        ).all()
+        return [
+            _ClaimedJob(id=row.id, job_type=job_type, payload=json.loads(row.payload or "{}"),
+                        attempts=row.attempts, max_attempts=row.max_attempts)
+            for row in rows
+        ]
+
+    def _claim_available(self) -> int:
+        """按各类任务的空闲名额领取任务，返回领取数量"""
+        total = 0
+        for job_type, job_def in self._types.items():
+            with self._lock:
+                free = min(
+                    job_def.concurrency - self._running.get(job_type, 0),
+                    self._workers - sum(self._running.values()),
+                )
+            if free <= 0:
+                continue
+
+            try:
+                jobs = db_writer.run(self._claim, job_type, free, job_def.concurrency)
+            except Exception as e:
+                logger.error(f"领取任务失败: job_type={job_type}, error={e}")
+                continue
+
+            with self._lock:
+                self._running[job_type] = self._running.get(job_type, 0) + len(jobs)
+                self._running_ids.update(job.id for job in jobs)
+            for job in jobs:
+                self._ready.put(job)
+            total += len(jobs)
+        return total
+
+    # ==================== 执行 ====================
+
+    def _finish(self, db: Session, job: _ClaimedJob, error: Optional[str], retryable: bool = True) -> str:
+        """记录执行结果（在写线程中执行），返回最终状态"""
+        now = datetime.utcnow()
+        if error is None:
+            values = {"status": "succeeded", "last_error": None}
+        elif retryable and job.attempts < job.max_attempts:
+            backoff = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+            values = {"status": "pending", "last_error": error, "run_at": now + timedelta(seconds=backoff)}
+        else:
+            values = {"status": "failed", "last_error": error}
+
+        # 只更新仍由本进程持有的任务（租约过期被他人领取后不覆盖对方的状态）
+        result = db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.locked_by == self.worker_id, Job.status == "running")
+            .values(locked_by=None, lease_expires_at=None, updated_at=now, **values)
+        )
+        if result.rowcount != 1:
+            logger.warning(f"任务租约已失效，结果未写入: job_id={job.id}")
+            return "lost"
+        return values["status"]
+
+    def _execute(self, job: _ClaimedJob) -> None:
+        job_def = self._types[job.job_type]
+        start = time.perf_counter()
+        error = None
+        retryable = True
+
+        if job.attempts > job.max_attempts:
+            # 上次执行中进程退出且已用完次数
+            error = "超过最大执行次数"
+        else:
+            try:
+                job_def.handler(**job.payload)
+            except PermanentJobError as e:
+                logger.error(f"任务失败（不重试）: job_id={job.id}, job_type={job.job_type}, error={e}")
+                error = str(e) or type(e).__name__
+                retryable = False
+            except Exception as e:
+                logger.error(f"任务执行失败: job_id={job.id}, job_type={job.job_type}, "
+                             f"attempt={job.attempts}/{job.max_attempts}, error={e}")
+                error = str(e) or type(e).__name__
+
+        try:
+            outcome = db_writer.run(self._finish, job, error, retryable)
+        except Exception as e:
+            logger.error(f"记录任务结果失败: job_id={job.id}, error={e}")
+            outcome = "lost"
+
+        metrics.observe("job_duration_seconds", time.perf_counter() - start, job_type=job.job_type)
+        metrics.increment("jobs_total", job_type=job.job_type, outcome=outcome)
+
+        if outcome == "failed" and job_def.on_failure is not None:
+            try:
+                job_def.on_failure(job.payload, error)
+            except Exception as e:
+                logger.error(f"任务失败回调出错: job_id={job.id}, error={e}")
+
+    def _worker_loop(self) -> None:
+        while True:
+            job = self._ready.get()
+            if job is None:
+                break
+            try:
+                self._execute(job)
+            finally:
+                with self._lock:
+                    self._running[job.job_type] -= 1
+                    self._running_ids.discard(job.id)
+                # 名额空出，立即领取下一个
+                self._wakeup.set()
+
+    # ==================== 租约与清理 ====================
+
+    def _renew(self, db: Session, job_ids: List[int]) -> None:
+        db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.locked_by == self.worker_id, Job.status == "running")
+            .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS))
+        )
+
+    def _purge(self, db: Session) -> int:
+        cutoff = datetime.utcnow() - timedelta(days=settings.JOB_RETENTION_DAYS)
+        return db.execute(
+            delete(Job).where(Job.status == "succeeded", Job.updated_at < cutoff)
+        ).rowcount
+
+    def _dispatch_loop(self) -> None:
+        renew_interval = max(settings.JOB_LEASE_SECONDS / 3, 1)
+        last_renew = time.monotonic()
+        last_purge = 0.0
+
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            try:
+                self._claim_available()
+
+                now = time.monotonic()
+                if now - last_renew >= renew_interval:
+                    with self._lock:
+                        job_ids = list(self._running_ids)
+                    if job_ids:
+                        db_writer.run(self._renew, job_ids)
+                    last_renew = now
+                if settings.JOB_RETENTION_DAYS > 0 and now - last_purge >= 3600:
+                    purged = db_writer.run(self._purge)
+                    if purged:
+                        logger.info(f"清理已完成任务: {purged} 条")
+                    last_purge = now
+            except Exception as e:
+                logger.error(f"任务调度出错: {e}")
+
+            self._wakeup.wait(settings.JOB_POLL_INTERVAL)
+
+    # ==================== 启停 ====================
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """启动调度线程和工作线程"""
+        if self._threads:
+            return
+        self._workers = max(workers or settings.JOB_WORKERS, 1)
+        self._stop.clear()
+
+        dispatcher = threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True)
+        self._threads.append(dispatcher)
+        for i in range(self._workers):
+            self._threads.append(threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+        limits = ", ".join(f"{name}={job_def.concurrency}" for name, job_def in self._types.items())
+        logger.info(f"后台任务队列已启动: {self._workers} 个工作线程（{limits}）")
+
+    def stop(self, timeout: float = 5) -> None:
+        """
+        停止领取新任务（应用关闭时调用）
+        执行中的任务不等待完成，进程退出后租约过期，由重启后的进程重新领取
+        """
+        if not self._threads:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        for _ in range(self._workers):
+            self._ready.put(None)
+        self._threads[0].join(timeout)
+        self._threads = []
+
+    # ==================== 查询 ====================
+
+    def stats(self, db: Session) -> Dict:
+        """各类任务的状态分布和本进程执行中的数量（管理员接口）"""
+        rows = db.execute(
+            select(Job.job_type, Job.status, func.count()).group_by(Job.job_type, Job.status)
+        ).all()
+        counts: Dict[str, Dict[str, int]] = {}
+        for job_type, status, count in rows:
+            counts.setdefault(job_type, {})[status] = count
+        with self._lock:
+            running = dict(self._running)
+        return {
+            "worker_id": self.worker_id,
+            "workers": self._workers,
+            "concurrency": {name: job_def.concurrency for name, job_def in self._types.items()},
+            "running_here": running,
+            "counts": counts,
+        }
+
+
+# 全局单例
+job_queue = JobQueue()
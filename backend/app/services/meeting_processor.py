@@ -6,15 +6,20 @@
 """
 
 import json
-import threading
 from typing import Optional, List, Dict
 from loguru import logger
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
+from app.utils.db_writer import db_writer
+from app.services.job_queue import job_queue, PermanentJobError
+from app.services.tingwu_poller import tingwu_poller
 from app.models import Meeting, MeetingStatus
 from app.services.tingwu_service import tingwu_service
 from app.services.llm_summary_service import llm_summary_service
+from app.services.search import search_service
+from app.services.embedding import embedding_service
 
 
 # ===================== 第一阶段：通义听悟转录 =====================
@@ -23,112 +28,186 @@ from app.services.llm_summary_service import llm_summary_service
 def process_meeting_transcription_async(meeting_id: str, audio_url: str):
     """
     后台异步处理会议音频转录（仅转录 + 说话人分离）
+    提交到后台任务队列，由工作线程执行；失败时自动重试
 
     Args:
         meeting_id: 会议ID
         audio_url: 音频文件URL（需要公网可访问）
     """
-    thread = threading.Thread(
-        target=_process_meeting_transcription,
-        args=(meeting_id, audio_url),
-        daemon=True
-    )
-    thread.start()
-    logger.info(f"启动会议转录线程: meeting_id={meeting_id}")
+    job_id = job_queue.enqueue("meeting_transcription", {"meeting_id": meeting_id, "audio_url": audio_url})
+    logger.info(f"会议转录任务已入队: meeting_id={meeting_id}, job_id={job_id}")
+
+
+def _update_meeting(db: Session, meeting_id: str, **fields) -> bool:
+    """
+    更新会议字段（在写线程中执行，由 db_writer 负责提交）
+
+    Args:
+        db: 写线程提供的会话
+        meeting_id: 会议ID
+        fields: 要更新的字段
+
+    Returns:
+        会议是否存在
+    """
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    if not meeting:
+        return False
+
+    for name, value in fields.items():
+        setattr(meeting, name, value)
+    db.commit()
+    return True
+
+
+def _index_meeting(meeting_id: str) -> None:
+    """
+    重建会议的检索索引和语义向量
+
+    分词和向量化在调用线程中完成（长转录耗时较长），写线程只执行索引/向量的写入，
+    不阻塞任务领取、租约续期等其他写操作
+    """
+    try:
+        with SessionLocal() as db:
+            meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+            if not meeting:
+                return
+            document = search_service.prepare_meeting(meeting)
+            vector = embedding_service.prepare_meeting(meeting)
+        db_writer.run(search_service.write_prepared, document)
+        db_writer.run(embedding_service.write_prepared, vector)
+    except Exception as e:
+        # 索引失败不影响业务数据，可通过 rebuild 补建
+        logger.error(f"更新会议索引失败: meeting_id={meeting_id}, {e}")
+
+
+def _mark_meeting_failed(meeting_id: str) -> None:
+    """把会议标记为失败（任务最终失败时调用）"""
+    try:
+        if db_writer.run(_update_meeting, meeting_id, status=MeetingStatus.FAILED, tingwu_task_id=None):
+            logger.info(f"已将会议 {meeting_id} 状态更新为 FAILED")
+    except Exception as update_error:
+        logger.error(f"更新会议失败状态时出错: {update_error}")
 
 
 def _process_meeting_transcription(meeting_id: str, audio_url: str):
     """
-    执行会议音频转录（在后台线程中）
+    提交会议音频转录（在任务队列的工作线程中）
 
     流程：
-    1. 提交通义听悟任务（仅转录 + 说话人分离）
-    2. 轮询等待完成
-    3. 解析转录文本和段落数据
-    4. 更新数据库（仅转录相关字段）
+    1. 提交通义听悟任务（仅转录 + 说话人分离），任务ID立即保存到 meetings.tingwu_task_id
+    2. 登记到 tingwu_poller 统一轮询，完成后由 meeting_transcription_result 任务处理结果
+
+    提交后的步骤失败重试时复用已保存的任务ID，不重复提交（听悟按任务计费）
 
     Args:
         meeting_id: 会议ID
         audio_url: 音频URL
     """
-    db: Session = SessionLocal()
-
     try:
-        # 1. 查询会议记录
-        meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-        if not meeting:
+        # 1. 更新状态为处理中
+        if not db_writer.run(_update_meeting, meeting_id, status=MeetingStatus.PROCESSING):
             logger.error(f"会议不存在: {meeting_id}")
             return
 
-        # 更新状态为处理中
-        meeting.status = MeetingStatus.PROCESSING
-        db.commit()
-
-        # 2. 提交通义听悟任务（简化配置：仅转录 + 说话人）
-        logger.info(f"提交会议转录任务: meeting_id={meeting_id}, audio_url={audio_url}")
-
-        task_result = tingwu_service.create_task(
-            file_url=audio_url,
-            source_language="cn",
-            enable_summarization=False,  # 关闭智能摘要（由 LLM 生成）
-            enable_chapters=False,  # 关闭章节划分
-            enable_meeting_assistance=False,  # 关闭会议助手
-            enable_speaker_diarization=True,  # 仅开启说话人分离
-            speaker_count=0  # 0表示不定人数，自动识别
-        )
+        with SessionLocal() as db:
+            audio_duration, task_id = db.query(
+                Meeting.audio_duration, Meeting.tingwu_task_id
+            ).filter(Meeting.id == meeting_id).one()
 
-        task_id = task_result['task_id']
-        logger.info(f"会议转录任务已提交: task_id={task_id}")
+        if task_id:
+            # 上次执行已提交听悟任务（之后的步骤失败），复用
+            logger.info(f"复用已提交的会议转录任务: meeting_id={meeting_id}, task_id={task_id}")
+        else:
+            # 2. 提交通义听悟任务（简化配置：仅转录 + 说话人）
+            logger.info(f"提交会议转录任务: meeting_id={meeting_id}, audio_url={audio_url}")
+
+            task_result = tingwu_service.create_task(
+                file_url=audio_url,
+                source_language="cn",
+                enable_summarization=False,  # 关闭智能摘要（由 LLM 生成）
+                enable_chapters=False,  # 关闭章节划分
+                enable_meeting_assistance=False,  # 关闭会议助手
+                enable_speaker_diarization=True,  # 仅开启说话人分离
+                speaker_count=0  # 0表示不定人数，自动识别
+            )
 
-        # 3. 等待任务完成（会议音频可能较长，最多等待60分钟）
-        result = tingwu_service.wait_for_completion(
-            task_id=task_id,
-            max_wait_seconds=3600,  # 60分钟
-            poll_interval=10  # 每10秒查询一次
+            task_id = task_result['task_id']
+            db_writer.run(_update_meeting, meeting_id, tingwu_task_id=task_id)
+            logger.info(f"会议转录任务已提交: task_id={task_id}")
+
+        # 3. 登记轮询（按音频时长安排查询时间，会议音频可能较长，最多等待60分钟）
+        tingwu_poller.track(
+            task_id,
+            "meeting_transcription_result",
+            {"meeting_id": meeting_id},
+            audio_duration=audio_duration,
+            max_wait_seconds=3600  # 60分钟
         )
 
-        # 4. 解析结果
+    except Exception as e:
+        logger.error(f"会议转录处理失败: meeting_id={meeting_id}, error={e}", exc_info=True)
+
+        # 交给任务队列重试，最终失败时标记 FAILED
+        raise
+
+
+def _process_meeting_transcription_result(meeting_id: str, task_id: str, error: Optional[str] = None):
+    """
+    处理会议转录结果（听悟任务结束后由 tingwu_poller 提交）
+
+    流程：
+    1. 下载并解析转录文本和段落数据
+    2. 更新数据库（仅转录相关字段）
+    3. 已选择 AI 模型时提交 LLM 总结
+
+    Args:
+        meeting_id: 会议ID
+        task_id: 听悟任务ID
+        error: 听悟任务失败或超时的原因
+    """
+    if error:
+        # 听悟任务已失败，重试无意义
+        raise PermanentJobError(error)
+
+    try:
+        # 1. 解析结果
+        result = tingwu_service.get_task_status(task_id)
         parsed_result = result.get('result', {})
         transcription = parsed_result.get('transcription', '')
         paragraphs = parsed_result.get('paragraphs', [])  # 段落信息（包含说话人）
 
         logger.info(f"会议转录完成: meeting_id={meeting_id}, 文本长度={len(transcription)}, 段落数={len(paragraphs)}")
 
-        # 5. 更新数据库（仅转录相关字段）
-        meeting.transcript = transcription
-        meeting.transcript_paragraphs = json.dumps(paragraphs, ensure_ascii=False) if paragraphs else None
+        # 检查是否需要继续生成 LLM 总结（转录期间用户可能已选择模型，此时再读取）
+        with SessionLocal() as db:
+            ai_model_id = db.query(Meeting.ai_model_id).filter(Meeting.id == meeting_id).scalar()
+
+        # 2. 更新数据库（仅转录相关字段）
+        db_writer.run(
+            _update_meeting, meeting_id,
+            transcript=transcription,
+            transcript_paragraphs=json.dumps(paragraphs, ensure_ascii=False) if paragraphs else None,
+            tingwu_task_id=None,
+            # 已选择 AI 模型时继续处理，否则仅转录，等待用户手动触发
+            status=MeetingStatus.PROCESSING if ai_model_id else MeetingStatus.COMPLETED
+        )
+        _index_meeting(meeting_id)
 
-        # 检查是否需要继续生成 LLM 总结
-        ai_model_id = meeting.ai_model_id
         if ai_model_id:
             # 用户已选择 AI 模型，转录完成后自动生成总结
             logger.info(f"会议转录完成，继续生成 LLM 总结: meeting_id={meeting_id}, model_id={ai_model_id}")
-            meeting.status = MeetingStatus.PROCESSING  # 继续处理
-            db.commit()
 
             # 触发第二阶段：LLM 总结
             process_meeting_summary_async(meeting_id, ai_model_id)
         else:
-            # 没有选择 AI 模型，仅转录，等待用户手动触发
-            meeting.status = MeetingStatus.COMPLETED
-            db.commit()
             logger.info(f"会议转录处理完成: meeting_id={meeting_id}，等待用户选择 AI 生成总结")
 
     except Exception as e:
-        logger.error(f"会议转录处理失败: meeting_id={meeting_id}, error={e}", exc_info=True)
+        logger.error(f"会议转录结果处理失败: meeting_id={meeting_id}, error={e}", exc_info=True)
 
-        # 更新错误状态
-        try:
-            meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-            if meeting:
-                meeting.status = MeetingStatus.FAILED
-                db.commit()
-                logger.info(f"已将会议 {meeting_id} 状态更新为 FAILED")
-        except Exception as update_error:
-            logger.error(f"更新会议失败状态时出错: {update_error}")
-
-    finally:
-        db.close()
+        # 交给任务队列重试，最终失败时标记 FAILED
+        raise
 
 
 # ===================== 第二阶段：LLM 总结 =====================
@@ -137,59 +216,60 @@ def _process_meeting_transcription(meeting_id: str, audio_url: str):
 def process_meeting_summary_async(meeting_id: str, ai_model_id: str):
     """
     后台异步处理会议总结（基于已有的转录文本）
+    提交到后台任务队列，由工作线程执行；失败时自动重试
 
     Args:
         meeting_id: 会议ID
         ai_model_id: 使用的AI模型ID
     """
-    thread = threading.Thread(
-        target=_process_meeting_summary,
-        args=(meeting_id, ai_model_id),
-        daemon=True
-    )
-    thread.start()
-    logger.info(f"启动会议总结线程: meeting_id={meeting_id}, model_id={ai_model_id}")
+    job_id = job_queue.enqueue("meeting_summary", {"meeting_id": meeting_id, "ai_model_id": ai_model_id})
+    logger.info(f"会议总结任务已入队: meeting_id={meeting_id}, model_id={ai_model_id}, job_id={job_id}")
 
 
 def _process_meeting_summary(meeting_id: str, ai_model_id: str):
     """
-    执行会议 LLM 总结（在后台线程中）
+    执行会议 LLM 总结（在任务队列的工作线程中）
 
     流程：
     1. 查询会议转录文本
     2. 调用 LLM 服务生成摘要/要点/行动项/标签/思维导图
     3. 更新数据库
 
+    写操作经 db_writer 串行执行
+
     Args:
         meeting_id: 会议ID
         ai_model_id: AI模型ID
     """
-    db: Session = SessionLocal()
-
     try:
-        # 1. 查询会议记录
-        meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-        if not meeting:
+        # 1. 查询会议转录（只读，短会话）
+        with SessionLocal() as db:
+            row = db.query(Meeting.transcript, Meeting.transcript_paragraphs).filter(
+                Meeting.id == meeting_id
+            ).first()
+        if not row:
             logger.error(f"会议不存在: {meeting_id}")
             return
+        transcript, transcript_paragraphs = row
 
         # 检查是否有转录文本
-        if not meeting.transcript:
+        if not transcript:
             logger.error(f"会议尚未完成转录: {meeting_id}")
-            meeting.status = MeetingStatus.FAILED
-            db.commit()
+            db_writer.run(_update_meeting, meeting_id, status=MeetingStatus.FAILED)
             return
 
         # 更新状态为处理中
-        meeting.status = MeetingStatus.PROCESSING
-        meeting.ai_model_id = ai_model_id  # 保存使用的 AI 模型
-        db.commit()
+        db_writer.run(
+            _update_meeting, meeting_id,
+            status=MeetingStatus.PROCESSING,
+            ai_model_id=ai_model_id  # 保存使用的 AI 模型
+        )
 
         # 2. 解析说话人信息（如果有）
         speakers_info = None
-        if meeting.transcript_paragraphs:
+        if transcript_paragraphs:
             try:
-                paragraphs = json.loads(meeting.transcript_paragraphs)
+                paragraphs = json.loads(transcript_paragraphs)
                 # 提取唯一说话人列表
                 speakers_set = set()
                 for para in paragraphs:
@@ -201,58 +281,116 @@ def _process_meeting_summary(meeting_id: str, ai_model_id: str):
             except Exception as e:
                 logger.warning(f"解析说话人信息失败: {e}")
 
-        # 3. 调用 LLM 服务生成完整总结
+        # 3. 调用 LLM 服务生成完整总结（会话只用于读取模型配置）
         logger.info(f"开始 LLM 总结: meeting_id={meeting_id}, model_id={ai_model_id}")
 
         import asyncio
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
-        summary_result = loop.run_until_complete(
-            llm_summary_service.generate_full_summary(
-                transcript=meeting.transcript,
-                speakers_info=speakers_info,
-                model_id=ai_model_id,
-                db=db
+        with SessionLocal() as db:
+            summary_result = loop.run_until_complete(
+                llm_summary_service.generate_full_summary(
+                    transcript=transcript,
+                    speakers_info=speakers_info,
+                    model_id=ai_model_id,
+                    db=db
+                )
             )
-        )
 
         loop.close()
 
         logger.info(f"LLM 总结完成: meeting_id={meeting_id}")
 
         # 4. 更新数据库
-        meeting.summary = summary_result.get('summary', '')
-        meeting.key_points = json.dumps(summary_result.get('key_points', []), ensure_ascii=False)
-        meeting.action_items = json.dumps(summary_result.get('action_items', []), ensure_ascii=False)
-        meeting.tags = json.dumps(summary_result.get('tags', []), ensure_ascii=False) if summary_result.get('tags') else None
-        meeting.mind_map = summary_result.get('mind_map', '')
-        meeting.status = MeetingStatus.COMPLETED
-
-        db.commit()
+        db_writer.run(
+            _update_meeting, meeting_id,
+            summary=summary_result.get('summary', ''),
+            key_points=json.dumps(summary_result.get('key_points', []), ensure_ascii=False),
+            action_items=json.dumps(summary_result.get('action_items', []), ensure_ascii=False),
+            tags=json.dumps(summary_result.get('tags', []), ensure_ascii=False) if summary_result.get('tags') else None,
+            mind_map=summary_result.get('mind_map', ''),
+            status=MeetingStatus.COMPLETED
+        )
+        _index_meeting(meeting_id)
 
         logger.info(f"会议总结处理完成: meeting_id={meeting_id}, 要点数={len(summary_result.get('key_points', []))}, 行动项数={len(summary_result.get('action_items', []))}")
 
     except Exception as e:
         logger.error(f"会议总结处理失败: meeting_id={meeting_id}, error={e}", exc_info=True)
 
-        # 更新错误状态
-        try:
-            meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-            if meeting:
-                meeting.status = MeetingStatus.FAILED
-                db.commit()
-                logger.info(f"已将会议 {meeting_id} 状态更新为 FAILED")
-        except Exception as update_error:
-            logger.error(f"更新会议失败状态时出错: {update_error}")
+        # 交给任务队列重试，最终失败时标记 FAILED
+        raise
 
-    finally:
-        db.close()
+
+# ===================== 任务注册 =====================
+
+job_queue.register(
+    "meeting_transcription",
+    _process_meeting_transcription,
+    on_failure=lambda payload, error: _mark_meeting_failed(payload["meeting_id"])
+)
+job_queue.register(
+    "meeting_transcription_result",
+    _process_meeting_transcription_result,
+    on_failure=lambda payload, error: _mark_meeting_failed(payload["meeting_id"])
+)
+job_queue.register(
+    "meeting_summary",
+    _process_meeting_summary,
+    on_failure=lambda payload, error: _mark_meeting_failed(payload["meeting_id"])
+)
 
 
 # ===================== 状态查询 =====================
 
 
+def meeting_status_info(meeting_id: str, status, has_transcript: bool) -> Dict:
+    """
+    根据状态字段组装处理进度信息（只依赖状态和是否已有转录，不需要加载整行）✨新增
+
+    Args:
+        meeting_id: 会议ID
+        status: 会议状态（MeetingStatus 或字符串）
+        has_transcript: 是否已有转录文本
+    """
+    status_value = status.value if hasattr(status, 'value') else str(status)
+
+    status_info = {
+        "meeting_id": meeting_id,
+        "status": status_value
+    }
+
+    # 根据状态提供不同信息
+    if status_value == MeetingStatus.PENDING.value:
+        status_info['message'] = '等待处理...'
+        status_info['progress'] = 0
+    elif status_value == MeetingStatus.PROCESSING.value:
+        # 判断是转录中还是总结中
+        if has_transcript:
+            status_info['message'] = '正在生成 AI 总结...'
+            status_info['progress'] = 70
+        else:
+            status_info['message'] = '正在转录音频...'
+            status_info['progress'] = 30
+    elif status_value == MeetingStatus.COMPLETED.value:
+        status_info['message'] = '处理完成'
+        status_info['progress'] = 100
+    elif status_value == MeetingStatus.FAILED.value:
+        status_info['message'] = '处理失败'
+        status_info['error'] = '音频处理出错，请稍后重试'
+
+    return status_info
+
+
+def meeting_status_columns():
+    """状态查询需要的列：状态 + 是否已有转录（不读取转录正文）✨新增"""
+    return (
+        Meeting.status,
+        func.coalesce(func.length(Meeting.transcript), 0) > 0,
+    )
+
+
 def check_meeting_ai_status(meeting_id: str) -> Dict:
     """
     检查会议纪要的 AI 处理状态
@@ -271,37 +409,11 @@ def check_meeting_ai_status(meeting_id: str) -> Dict:
     db: Session = SessionLocal()
 
     try:
-        meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
-        if not meeting:
+        row = db.query(*meeting_status_columns()).filter(Meeting.id == meeting_id).first()
+        if not row:
             return {"status": "not_found"}
 
-        status_value = meeting.status.value if hasattr(meeting.status, 'value') else str(meeting.status)
-
-        status_info = {
-            "meeting_id": meeting_id,
-            "status": status_value
-        }
-
-        # 根据状态提供不同信息
-        if status_value == MeetingStatus.PENDING.value:
-            status_info['message'] = '等待处理...'
-            status_info['progress'] = 0
-        elif status_value == MeetingStatus.PROCESSING.value:
-            # 判断是转录中还是总结中
-            if meeting.transcript:
-                status_info['message'] = '正在生成 AI 总结...'
-                status_info['progress'] = 70
-            else:
-                status_info['message'] = '正在转录音频...'
-                status_info['progress'] = 30
-        elif status_value == MeetingStatus.COMPLETED.value:
-            status_info['message'] = '处理完成'
-            status_info['progress'] = 100
-        elif status_value == MeetingStatus.FAILED.value:
-            status_info['message'] = '处理失败'
-            status_info['error'] = '音频处理出错，请稍后重试'
-
-        return status_info
+        return meeting_status_info(meeting_id, row[0], row[1])
 
     finally:
         db.close()
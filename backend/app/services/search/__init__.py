@@ -0,0 +1,22 @@
+"""
+全文检索服务
+"""
+
+from .base import BaseSearchBackend, SearchHit
+from .sqlite_fts import SQLiteFTSBackend
+from .postgres_fts import PostgresFTSBackend
+from .tokenizer import tokenize, parse_query, json_text
+from .service import PreparedDocument, SearchService, search_service
+
+__all__ = [
+    "BaseSearchBackend",
+    "SearchHit",
+    "SQLiteFTSBackend",
+    "PostgresFTSBackend",
+    "tokenize",
+    "parse_query",
+    "json_text",
+    "PreparedDocument",
+    "SearchService",
+    "search_service",
+]
@@ -0,0 +1,104 @@
+"""
+全文检索后端基类
+定义统一的索引写入与查询接口
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+
+class SearchHit(NamedTuple):
+    """检索命中"""
+    doc_type: str  # flash / meeting
+    doc_id: str
+    title: Optional[str]
+    created_at: datetime
+    score: float
+
+
+class BaseSearchBackend(ABC):
+    """检索后端基类"""
+
+    name: str = "base"
+
+    @abstractmethod
+    def ensure_schema(self, connection) -> None:
+        """
+        创建后端所需的虚表/列/索引（幂等）
+
+        Args:
+            connection: 数据库连接（在事务中）
+        """
+        pass
+
+    @abstractmethod
+    def write(
+        self,
+        db: Session,
+        row_id: int,
+        user_id: str,
+        doc_type: str,
+        title_tokens: List[str],
+        body_tokens: List[str],
+    ) -> None:
+        """
+        写入（覆盖）一篇文档的索引
+
+        Args:
+            db: 数据库会话
+            row_id: search_documents 表中的行ID
+            user_id: 所属用户ID
+            doc_type: 文档类型
+            title_tokens: 标题检索词
+            body_tokens: 正文检索词
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, db: Session, row_id: int) -> None:
+        """删除一篇文档的索引"""
+        pass
+
+    @abstractmethod
+    def copy(self, db: Session, source_row_id: int, row_id: int, title_tokens: List[str]) -> None:
+        """
+        以已有文档的正文索引为新文档建索引（在数据库内复制，不重新分词正文）
+
+        Args:
+            db: 数据库会话
+            source_row_id: 源文档在 search_documents 表中的行ID
+            row_id: 新文档的行ID（用户、类型与源文档相同）
+            title_tokens: 新文档的标题检索词
+        """
+        pass
+
+    @abstractmethod
+    def search(
+        self,
+        db: Session,
+        user_id: str,
+        phrases: List[List[str]],
+        raw_query: str,
+        doc_type: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> Tuple[List[SearchHit], int]:
+        """
+        检索
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID（只检索该用户的文档）
+            phrases: parse_query 解析出的短语
+            raw_query: 原始关键词
+            doc_type: 文档类型筛选，None 表示全部
+            limit: 返回数量
+            offset: 跳过数量
+
+        Returns:
+            (按相关度排序的命中列表, 命中总数)
+        """
+        pass
@@ -0,0 +1,149 @@
+"""
+PostgreSQL 检索后端
+search_documents.tsv 列（GIN 索引）+ ts_rank_cd 排序，pg_trgm 对标题做模糊匹配补充
+
+tsvector / tsquery 由 Python 直接拼成字面量再 CAST，不经过 PostgreSQL 的文本解析器：
+默认解析器在 C locale 下会丢弃中文字符，且分词规则需与 tokenizer 保持一致
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import DateTime, Float, String, text
+from sqlalchemy.orm import Session
+
+from .base import BaseSearchBackend, SearchHit
+from .tokenizer import is_prefix_phrase
+
+# tsvector 的限制：位置最大 16383，单个词最多记录 256 个位置
+_MAX_POSITION = 16383
+_MAX_POSITIONS_PER_LEXEME = 256
+
+
+def _quote(lexeme: str) -> str:
+    return "'" + lexeme.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def build_tsvector(title_tokens: List[str], body_tokens: List[str]) -> str:
+    """拼接带位置和权重的 tsvector 字面量（标题权重 A，正文权重 B）"""
+    positions: Dict[str, List[str]] = defaultdict(list)
+    position = 0
+    for weight, tokens in (("A", title_tokens), ("B", body_tokens)):
+        for token in tokens:
+            position = min(position + 1, _MAX_POSITION)
+            entries = positions[token]
+            if len(entries) < _MAX_POSITIONS_PER_LEXEME:
+                entries.append(f"{position}{weight}")
+    return " ".join(f"{_quote(lexeme)}:{','.join(entries)}" for lexeme, entries in positions.items())
+
+
+def build_tsquery(phrases: List[List[str]]) -> str:
+    """
+    拼接 tsquery 字面量
+
+    短语内的检索词用 & 连接而不是 <->：长转录的位置会被截断在 16383，
+    用相邻匹配会漏掉后半段；相邻程度仍由 ts_rank_cd 的覆盖密度体现在排序中
+    """
+    parts = []
+    for phrase in phrases:
+        if is_prefix_phrase(phrase):
+            parts.append(f"{_quote(phrase[0])}:*")
+        else:
+            parts.append("(" + " & ".join(_quote(token) for token in phrase) + ")")
+    return " & ".join(parts)
+
+
+class PostgresFTSBackend(BaseSearchBackend):
+    """PostgreSQL tsvector / pg_trgm 检索后端"""
+
+    name = "postgres_tsvector"
+
+    def __init__(self):
+        self.trigram_enabled = False
+
+    def ensure_schema(self, connection) -> None:
+        connection.execute(text("ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS tsv tsvector"))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING gin (tsv)"
+        ))
+
+        # pg_trgm 需要建扩展权限，失败时仅使用 tsvector
+        try:
+            with connection.begin_nested():
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                connection.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_search_documents_title_trgm "
+                    "ON search_documents USING gin (title gin_trgm_ops)"
+                ))
+            self.trigram_enabled = True
+        except Exception as e:
+            logger.warning(f"pg_trgm 不可用，标题模糊匹配已关闭: {e}")
+
+    def write(self, db, row_id, user_id, doc_type, title_tokens, body_tokens) -> None:
+        db.execute(
+            text("UPDATE search_documents SET tsv = CAST(:tsv AS tsvector) WHERE id = :id"),
+            {"id": row_id, "tsv": build_tsvector(title_tokens, body_tokens)}
+        )
+
+    def delete(self, db, row_id) -> None:
+        # 索引与 search_documents 同行存储，删除行即删除索引
+        pass
+
+    def copy(self, db, source_row_id, row_id, title_tokens) -> None:
+        # 新标题（权重 A）拼接源文档的正文部分（ts_filter 只保留权重 B），拼接时正文位置自动后移
+        db.execute(
+            text(
+                "UPDATE search_documents SET tsv = CAST(:title AS tsvector) || "
+                "COALESCE((SELECT ts_filter(tsv, '{b}') FROM search_documents WHERE id = :source_id), CAST('' AS tsvector)) "
+                "WHERE id = :id"
+            ),
+            {"id": row_id, "source_id": source_row_id, "title": build_tsvector(title_tokens, [])}
+        )
+
+    def search(
+        self,
+        db: Session,
+        user_id: str,
+        phrases: List[List[str]],
+        raw_query: str,
+        doc_type: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> Tuple[List[SearchHit], int]:
+        params = {
+            "user_id": user_id,
+            "query": build_tsquery(phrases),
+            "raw": raw_query,
+            "limit": limit,
+            "offset": offset,
+        }
+
+        score = "ts_rank_cd(tsv, q, 1)"
+        matched = "tsv @@ q"
+        if self.trigram_enabled:
+            score += " + similarity(title, :raw)"
+            matched = f"({matched} OR title % :raw)"
+
+        where = f"user_id = :user_id AND {matched}"
+        if doc_type:
+            where += " AND doc_type = :doc_type"
+            params["doc_type"] = doc_type
+
+        rows = db.execute(
+            text(f"""
+                SELECT doc_type, doc_id, title, created_at, {score} AS score
+                FROM search_documents, CAST(:query AS tsquery) AS q
+                WHERE {where}
+                ORDER BY score DESC, created_at DESC
+                LIMIT :limit OFFSET :offset
+            """).columns(doc_type=String, doc_id=String, title=String, created_at=DateTime, score=Float),
+            params
+        ).all()
+
+        total = db.execute(
+            text(f"SELECT count(*) FROM search_documents, CAST(:query AS tsquery) AS q WHERE {where}"),
+            params
+        ).scalar() or 0
+
+        return [SearchHit(*row) for row in rows], total
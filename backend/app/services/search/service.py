@@ -0,0 +1,358 @@
+"""
+全文检索服务
+维护 search_documents 索引并提供按相关度排序的检索
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models import Flash, Meeting, SearchDocument
+from .base import BaseSearchBackend, SearchHit
+from .postgres_fts import PostgresFTSBackend
+from .sqlite_fts import SQLiteFTSBackend
+from .tokenizer import json_text, parse_query, tokenize
+
+# 按数据库方言选择检索后端
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteFTSBackend,
+    "postgresql": PostgresFTSBackend,
+}
+
+DOC_TYPES = ("flash", "meeting")
+
+# 高亮摘要的长度（字符）
+SNIPPET_CONTEXT = 40
+SNIPPET_LENGTH = 120
+
+
+class PreparedDocument(NamedTuple):
+    """分词完成、待写入索引的文档"""
+    doc_type: str
+    doc_id: str
+    user_id: str
+    title: Optional[str]
+    created_at: Optional[datetime]
+    title_tokens: List[str]
+    body_tokens: List[str]
+
+
+def _snippet(text: Optional[str], terms: List[str]) -> Optional[str]:
+    """截取第一个命中词附近的片段，并用 <em> 标记命中词"""
+    if not text:
+        return None
+
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms]
+    positions = [pos for pos in positions if pos >= 0]
+    if not positions:
+        return None
+
+    start = max(min(positions) - SNIPPET_CONTEXT, 0)
+    fragment = text[start:start + SNIPPET_LENGTH]
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    fragment = pattern.sub(lambda m: f"<em>{m.group(0)}</em>", fragment)
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + SNIPPET_LENGTH < len(text) else ""
+    return f"{prefix}{fragment}{suffix}"
+
+
+class SearchService:
+    """全文检索服务"""
+
+    def __init__(self):
+        self._backends: Dict[str, BaseSearchBackend] = {}
+
+    def get_backend(self, bind) -> Optional[BaseSearchBackend]:
+        """
+        获取当前数据库对应的检索后端
+
+        Args:
+            bind: Engine / Connection
+        """
+        dialect = bind.dialect.name
+        if dialect not in self._backends:
+            backend_cls = SEARCH_BACKENDS.get(dialect)
+            if backend_cls is None:
+                return None
+            self._backends[dialect] = backend_cls()
+        return self._backends[dialect]
+
+    def ensure_schema(self, engine) -> None:
+        """创建检索所需的虚表/列/索引（启动时调用，幂等）"""
+        backend = self.get_backend(engine)
+        if backend is None:
+            logger.warning(f"数据库 {engine.dialect.name} 暂不支持全文检索")
+            return
+
+        with engine.begin() as connection:
+            backend.ensure_schema(connection)
+        logger.info(f"全文检索已就绪: backend={backend.name}")
+
+    # ==================== 索引维护 ====================
+
+    @staticmethod
+    def _flash_body(flash: Flash) -> str:
+        return " ".join(filter(None, [flash.content, flash.summary, json_text(flash.keywords)]))
+
+    @staticmethod
+    def _meeting_body(meeting: Meeting) -> str:
+        return " ".join(filter(None, [
+            meeting.summary,
+            json_text(meeting.key_points),
+            json_text(meeting.action_items),
+            json_text(meeting.tags),
+            json_text(meeting.participants),
+            meeting.transcript,
+        ]))
+
+    @staticmethod
+    def _prepare(doc_type, doc_id, user_id, title, body, created_at) -> PreparedDocument:
+        return PreparedDocument(doc_type, doc_id, user_id, title, created_at, tokenize(title or ""), tokenize(body))
+
+    def prepare_flash(self, flash: Flash) -> PreparedDocument:
+        """对闪记分词（不写库，可在写线程之外执行）✨新增"""
+        return self._prepare("flash", flash.id, flash.user_id, flash.title, self._flash_body(flash), flash.created_at)
+
+    def prepare_meeting(self, meeting: Meeting) -> PreparedDocument:
+        """对会议分词（不写库，长转录分词较慢，可在写线程之外执行）✨新增"""
+        return self._prepare(
+            "meeting", meeting.id, meeting.user_id, meeting.title, self._meeting_body(meeting), meeting.created_at
+        )
+
+    def index_flash(self, db: Session, flash: Flash) -> None:
+        """写入/更新闪记索引（在业务提交之后调用）"""
+        self.write_prepared(db, self.prepare_flash(flash))
+
+    def index_meeting(self, db: Session, meeting: Meeting) -> None:
+        """写入/更新会议索引（在业务提交之后调用）"""
+        self.write_prepared(db, self.prepare_meeting(meeting))
+
+    def write_prepared(self, db: Session, document: PreparedDocument) -> None:
+        """写入已分词的文档（只有少量写操作，可经单写线程执行）✨新增"""
+        backend = self.get_backend(db.get_bind())
+        if backend is None:
+            return
+
+        try:
+            doc = db.query(SearchDocument).filter(
+                SearchDocument.doc_type == document.doc_type,
+                SearchDocument.doc_id == document.doc_id
+            ).first()
+            if doc is None:
+                doc = SearchDocument(doc_type=document.doc_type, doc_id=document.doc_id, user_id=document.user_id)
+                db.add(doc)
+            doc.title = document.title
+            doc.created_at = document.created_at
+            db.flush()
+
+            backend.write(db, doc.id, document.user_id, document.doc_type, document.title_tokens, document.body_tokens)
+            db.commit()
+        except Exception as e:
+            # 索引失败不影响业务数据，可通过 rebuild 补建
+            db.rollback()
+            logger.error(f"更新检索索引失败: {document.doc_type}={document.doc_id}, {e}")
+
+    def copy_document(self, db: Session, doc_type: str, source_id: str, record) -> bool:
+        """
+        复制文档索引：新文档与源文档正文相同，只重建标题（在业务提交之后调用）
+
+        Args:
+            db: 数据库会话
+            doc_type: 文档类型
+            source_id: 源文档ID
+            record: 新的闪记/会议（需有 id / user_id / title / created_at）
+
+        Returns:
+            是否已复制；源文档尚未建索引时返回 False，由调用方完整建索引
+        """
+        backend = self.get_backend(db.get_bind())
+        if backend is None:
+            return True
+
+        try:
+            source = db.query(SearchDocument.id).filter(
+                SearchDocument.doc_type == doc_type,
+                SearchDocument.doc_id == source_id
+            ).first()
+            if source is None:
+                return False
+
+            doc = SearchDocument(
+                doc_type=doc_type,
+                doc_id=record.id,
+                user_id=record.user_id,
+                title=record.title,
+                created_at=record.created_at
+            )
+            db.add(doc)
+            db.flush()
+
+            backend.copy(db, source.id, doc.id, tokenize(record.title or ""))
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"复制检索索引失败: {doc_type}={source_id}->{record.id}, {e}")
+            return True
+
+    def remove(self, db: Session, doc_type: str, doc_id: str) -> None:
+        """删除文档索引（在业务提交之后调用）"""
+        self.remove_many(db, doc_type, [doc_id])
+
+    def remove_many(self, db: Session, doc_type: str, doc_ids: List[str]) -> None:
+        """批量删除文档索引（在业务提交之后调用，单个事务）"""
+        backend = self.get_backend(db.get_bind())
+        if backend is None or not doc_ids:
+            return
+
+        try:
+            docs = db.query(SearchDocument).filter(
+                SearchDocument.doc_type == doc_type,
+                SearchDocument.doc_id.in_(doc_ids)
+            ).all()
+            for doc in docs:
+                backend.delete(db, doc.id)
+                db.delete(doc)
+            if docs:
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"删除检索索引失败: {doc_type}={doc_ids}, {e}")
+
+    def rebuild(self, db: Session, user_id: Optional[str] = None) -> int:
+        """
+        重建索引
+
+        Args:
+            db: 数据库会话
+            user_id: 只重建该用户的文档，为空表示全部
+
+        Returns:
+            写入的文档数
+        """
+        count = 0
+        for model, index in ((Flash, self.index_flash), (Meeting, self.index_meeting)):
+            query = db.query(model.id)
+            if user_id:
+                query = query.filter(model.user_id == user_id)
+            # 逐条加载，避免一次性把全部转录读入内存
+            for (record_id,) in query.all():
+                record = db.query(model).filter(model.id == record_id).first()
+                if record:
+                    index(db, record)
+                    db.expunge(record)
+                    count += 1
+        logger.info(f"检索索引重建完成: user_id={user_id or 'ALL'}, 文档数={count}")
+        return count
+
+    # ==================== 检索 ====================
+
+    def search(
+        self,
+        db: Session,
+        user_id: str,
+        q: str,
+        doc_type: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Tuple[List[Dict], int]:
+        """
+        检索当前用户的闪记/会议
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            q: 关键词（空格分隔多个关键词，需同时命中）
+            doc_type: flash / meeting，为空或 all 表示全部
+            page: 页码
+            page_size: 每页数量
+
+        Returns:
+            (结果列表, 命中总数)
+        """
+        backend = self.get_backend(db.get_bind())
+        if backend is None:
+            raise NotImplementedError(f"数据库 {db.get_bind().dialect.name} 暂不支持全文检索")
+
+        phrases = parse_query(q)
+        if not phrases:
+            return [], 0
+
+        if doc_type not in DOC_TYPES:
+            doc_type = None
+
+        hits, total = backend.search(
+            db, user_id, phrases, q.strip(), doc_type,
+            limit=page_size, offset=(page - 1) * page_size
+        )
+        highlights = self._highlights(db, hits, q.lower().split())
+
+        results = [
+            {
+                "id": hit.doc_id,
+                "type": hit.doc_type,
+                "title": hit.title,
+                "highlight": highlights.get((hit.doc_type, hit.doc_id)),
+                "score": float(hit.score or 0.0),
+                "created_at": hit.created_at,
+            }
+            for hit in hits
+        ]
+        return results, total
+
+    def _highlights(self, db: Session, hits: List[SearchHit], terms: List[str]) -> Dict[Tuple[str, str], str]:
+        """为当前页的命中生成高亮片段（只查询需要的列，不加载整篇转录）"""
+        fields: Dict[Tuple[str, str], List[Optional[str]]] = {}
+
+        flash_ids = [hit.doc_id for hit in hits if hit.doc_type == "flash"]
+        if flash_ids:
+            rows = db.query(Flash.id, Flash.title, Flash.summary, Flash.content).filter(Flash.id.in_(flash_ids))
+            for row in rows:
+                fields[("flash", row.id)] = [row.title, row.summary, row.content]
+
+        meeting_ids = [hit.doc_id for hit in hits if hit.doc_type == "meeting"]
+        if meeting_ids:
+            rows = db.query(
+                Meeting.id, Meeting.title, Meeting.summary, Meeting.key_points, Meeting.tags
+            ).filter(Meeting.id.in_(meeting_ids))
+            for row in rows:
+                fields[("meeting", row.id)] = [
+                    row.title, row.summary, json_text(row.key_points), json_text(row.tags)
+                ]
+
+        highlights = {}
+        for key, texts in fields.items():
+            for text in texts:
+                snippet = _snippet(text, terms)
+                if snippet:
+                    highlights[key] = snippet
+                    break
+
+        # 仅命中转录的会议：在数据库中截取命中位置附近的片段
+        missing = [doc_id for doc_id in meeting_ids if ("meeting", doc_id) not in highlights]
+        if missing and terms:
+            for doc_id, fragment in self._transcript_fragments(db, missing, terms[0]):
+                snippet = _snippet(fragment, terms)
+                if snippet:
+                    highlights[("meeting", doc_id)] = f"…{snippet.strip('…')}…"
+
+        return highlights
+
+    @staticmethod
+    def _transcript_fragments(db: Session, meeting_ids: List[str], term: str):
+        locate = func.strpos if db.get_bind().dialect.name == "postgresql" else func.instr
+        position = locate(func.lower(Meeting.transcript), term)
+        start = case((position > SNIPPET_CONTEXT, position - SNIPPET_CONTEXT), else_=1)
+        return db.query(
+            Meeting.id, func.substr(Meeting.transcript, start, SNIPPET_LENGTH)
+        ).filter(Meeting.id.in_(meeting_ids), position > 0).all()
+
+
+# 全局单例
+search_service = SearchService()
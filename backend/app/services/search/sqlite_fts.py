@@ -0,0 +1,101 @@
+"""
+SQLite FTS5 检索后端
+使用 FTS5 虚表 + BM25 排序；scope 列存放用户/类型标记，过滤在 MATCH 内完成
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DateTime, Float, String, text
+from sqlalchemy.orm import Session
+
+from .base import BaseSearchBackend, SearchHit
+from .tokenizer import is_prefix_phrase
+
+# bm25 列权重：scope 不参与评分，标题权重高于正文
+_BM25 = "bm25(search_fts, 0.0, 5.0, 1.0)"
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """SQLite FTS5 检索后端"""
+
+    name = "sqlite_fts5"
+
+    def ensure_schema(self, connection) -> None:
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts "
+            "USING fts5(scope, title, body, tokenize = 'unicode61')"
+        ))
+
+    @staticmethod
+    def _user_scope(user_id: str) -> str:
+        return "u" + user_id.replace("-", "")
+
+    def write(self, db, row_id, user_id, doc_type, title_tokens, body_tokens) -> None:
+        self.delete(db, row_id)
+        db.execute(
+            text("INSERT INTO search_fts(rowid, scope, title, body) VALUES (:id, :scope, :title, :body)"),
+            {
+                "id": row_id,
+                "scope": f"{self._user_scope(user_id)} {doc_type}",
+                "title": " ".join(title_tokens),
+                "body": " ".join(body_tokens),
+            }
+        )
+
+    def delete(self, db, row_id) -> None:
+        db.execute(text("DELETE FROM search_fts WHERE rowid = :id"), {"id": row_id})
+
+    def copy(self, db, source_row_id, row_id, title_tokens) -> None:
+        self.delete(db, row_id)
+        db.execute(
+            text(
+                "INSERT INTO search_fts(rowid, scope, title, body) "
+                "SELECT :id, scope, :title, body FROM search_fts WHERE rowid = :source_id"
+            ),
+            {"id": row_id, "source_id": source_row_id, "title": " ".join(title_tokens)}
+        )
+
+    def _match_expression(self, user_id: str, phrases: List[List[str]], doc_type: Optional[str]) -> str:
+        """构建 MATCH 表达式：scope 过滤 AND 标题/正文中的各短语"""
+        parts = []
+        for phrase in phrases:
+            if is_prefix_phrase(phrase):
+                parts.append(f'"{phrase[0]}"*')
+            else:
+                parts.append('"' + " ".join(phrase) + '"')
+
+        expression = f'scope : "{self._user_scope(user_id)}"'
+        if doc_type:
+            expression += f' AND scope : "{doc_type}"'
+        return expression + " AND {title body} : (" + " AND ".join(parts) + ")"
+
+    def search(
+        self,
+        db: Session,
+        user_id: str,
+        phrases: List[List[str]],
+        raw_query: str,
+        doc_type: Optional[str],
+        limit: int,
+        offset: int,
+    ) -> Tuple[List[SearchHit], int]:
+        match = self._match_expression(user_id, phrases, doc_type)
+
+        rows = db.execute(
+            text(f"""
+                SELECT d.doc_type, d.doc_id, d.title, d.created_at, -{_BM25} AS score
+                FROM search_fts
+                JOIN search_documents d ON d.id = search_fts.rowid
+                WHERE search_fts MATCH :match
+                ORDER BY {_BM25}
+                LIMIT :limit OFFSET :offset
+            """).columns(doc_type=String, doc_id=String, title=String, created_at=DateTime, score=Float),
+            {"match": match, "limit": limit, "offset": offset}
+        ).all()
+
+        total = db.execute(
+            text("SELECT count(*) FROM search_fts WHERE search_fts MATCH :match"),
+            {"match": match}
+        ).scalar() or 0
+
+        return [SearchHit(*row) for row in rows], total
@@ -0,0 +1,93 @@
+"""
+中文友好的分词器
+中日韩文字切分为二元组（bigram），其他文字按单词切分并转小写；
+索引与查询使用同一套规则，无需依赖数据库的中文分词插件
+"""
+
+import json
+import re
+from typing import List, Optional
+
+# 中日韩统一表意文字、扩展A、兼容表意文字、日文假名、韩文音节
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"
+
+# 连续的中日韩字符，或连续的其他字母数字（不含下划线）
+_TOKEN_RE = re.compile(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+_CJK_RE = re.compile(f"[{_CJK}]")
+
+
+def _is_cjk(run: str) -> bool:
+    return bool(_CJK_RE.match(run))
+
+
+def json_text(raw: Optional[str]) -> str:
+    """提取 JSON 字段（列表/字典嵌套）中的全部字符串"""
+    if not raw:
+        return ""
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return raw
+
+    parts = []
+
+    def walk(value):
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+
+    walk(data)
+    return " ".join(parts)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文本切分为检索词
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        检索词列表，如 "会议纪要 AI" -> ["会议", "议纪", "纪要", "ai"]
+    """
+    if not text:
+        return []
+
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if _is_cjk(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def parse_query(q: str) -> List[List[str]]:
+    """
+    解析搜索关键词
+
+    按空白切分为多个短语，每个短语再切分为检索词；
+    短语之间为“与”关系，短语内的检索词需连续出现
+
+    Returns:
+        短语列表，每个短语是检索词列表；单个中文字符的短语按前缀匹配
+    """
+    phrases = []
+    for part in q.split():
+        tokens = tokenize(part)
+        if tokens:
+            phrases.append(tokens)
+    return phrases
+
+
+def is_prefix_phrase(phrase: List[str]) -> bool:
+    """单个中文字符无法与二元组精确匹配，需要按前缀检索"""
+    return len(phrase) == 1 and len(phrase[0]) == 1 and _is_cjk(phrase[0])
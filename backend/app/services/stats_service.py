@@ -0,0 +1,255 @@
+"""
+统计服务
+维护 user_daily_stats 每日汇总表，统计接口只读汇总表
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.models import Flash, Meeting, UserDailyStat
+
+# 支持 INSERT ... ON CONFLICT DO UPDATE 的方言
+_UPSERT_INSERTS = {
+    "sqlite": sqlite_insert,
+    "postgresql": pg_insert,
+}
+
+_CONFLICT_COLUMNS = ["user_id", "day", "kind", "category"]
+
+
+class StatsService:
+    """统计服务"""
+
+    def __init__(self):
+        self.tz = ZoneInfo(settings.STATS_TIMEZONE)
+
+    def local_day(self, dt: Optional[datetime] = None) -> date:
+        """UTC 时间（库中的 naive datetime）-> 统计时区的自然日"""
+        dt = dt or datetime.utcnow()
+        return dt.replace(tzinfo=timezone.utc).astimezone(self.tz).date()
+
+    def _increment(
+        self,
+        db: Session,
+        user_id: str,
+        day: date,
+        kind: str,
+        category: Optional[str],
+        count: int,
+        duration: int,
+    ) -> None:
+        """在调用方事务内累加一条汇总（原子 upsert）"""
+        values = {
+            "user_id": user_id,
+            "day": day,
+            "kind": kind,
+            "category": category or "",
+            "count": count,
+            "duration": duration,
+        }
+
+        insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is not None:
+            stmt = insert(UserDailyStat).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=_CONFLICT_COLUMNS,
+                set_={
+                    "count": UserDailyStat.count + stmt.excluded.count,
+                    "duration": UserDailyStat.duration + stmt.excluded.duration,
+                }
+            )
+            db.execute(stmt)
+            return
+
+        row = db.query(UserDailyStat).filter_by(
+            user_id=user_id, day=day, kind=kind, category=values["category"]
+        ).with_for_update().first()
+        if row is None:
+            db.add(UserDailyStat(**values))
+        else:
+            row.count += count
+            row.duration += duration
+
+    # ==================== 增量更新（在业务提交之前调用） ====================
+
+    def add_flash(self, db: Session, flash: Flash, sign: int = 1) -> None:
+        """记录新增闪记；sign=-1 表示删除"""
+        self._increment(
+            db, flash.user_id, self.local_day(flash.created_at), "flash",
+            flash.category, sign, sign * (flash.audio_duration or 0)
+        )
+
+    def remove_flash(self, db: Session, flash: Flash) -> None:
+        """记录删除闪记"""
+        self.add_flash(db, flash, sign=-1)
+
+    def recategorize_flash(self, db: Session, flash: Flash, old_category: Optional[str]) -> None:
+        """闪记分类变化：从旧分类移到新分类"""
+        if (old_category or "") == (flash.category or ""):
+            return
+        day = self.local_day(flash.created_at)
+        duration = flash.audio_duration or 0
+        self._increment(db, flash.user_id, day, "flash", old_category, -1, -duration)
+        self._increment(db, flash.user_id, day, "flash", flash.category, 1, duration)
+
+    def add_meeting(self, db: Session, meeting: Meeting, sign: int = 1) -> None:
+        """记录新增会议；sign=-1 表示删除"""
+        self._increment(
+            db, meeting.user_id, self.local_day(meeting.created_at), "meeting",
+            None, sign, sign * (meeting.audio_duration or 0)
+        )
+
+    def remove_meeting(self, db: Session, meeting: Meeting) -> None:
+        """记录删除会议"""
+        self.add_meeting(db, meeting, sign=-1)
+
+    def remove_many(self, db: Session, kind: str, records) -> None:
+        """
+        批量删除时按 (用户, 日期, 分类) 合并后扣减
+
+        Args:
+            db: 数据库会话
+            kind: flash / meeting
+            records: 含 user_id / created_at / audio_duration（闪记另含 category）属性的对象或行
+        """
+        totals = defaultdict(lambda: [0, 0])
+        for record in records:
+            category = getattr(record, "category", None) if kind == "flash" else None
+            key = (record.user_id, self.local_day(record.created_at), category or "")
+            totals[key][0] += 1
+            totals[key][1] += record.audio_duration or 0
+
+        for (user_id, day, category), (count, duration) in totals.items():
+            self._increment(db, user_id, day, kind, category, -count, -duration)
+
+    # ==================== 查询 ====================
+
+    def get_stats(self, db: Session, user_id: str) -> Dict:
+        """
+        获取用户统计数据（今日/本周/本月 + 闪记分类分布）
+
+        Returns:
+            与 StatsResponse 对应的字典
+        """
+        today = self.local_day()
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+
+        rows = db.query(
+            UserDailyStat.day,
+            UserDailyStat.kind,
+            func.sum(UserDailyStat.count),
+            func.sum(UserDailyStat.duration)
+        ).filter(
+            UserDailyStat.user_id == user_id,
+            UserDailyStat.day >= min(week_start, month_start),
+            UserDailyStat.day <= today
+        ).group_by(UserDailyStat.day, UserDailyStat.kind).all()
+
+        periods = {"today": today, "week": week_start, "month": month_start}
+        totals = {name: defaultdict(int) for name in periods}
+        for day, kind, count, duration in rows:
+            for name, start in periods.items():
+                if day >= start:
+                    totals[name][f"{kind}_count"] += count or 0
+                    totals[name][f"{kind}_duration"] += duration or 0
+
+        def period(name):
+            data = totals[name]
+            return {
+                "flash_count": max(data["flash_count"], 0),
+                "meeting_count": max(data["meeting_count"], 0),
+                "flash_duration": max(data["flash_duration"], 0),
+                "meeting_duration": max(data["meeting_duration"], 0),
+            }
+
+        categories = db.query(
+            UserDailyStat.category,
+            func.sum(UserDailyStat.count)
+        ).filter(
+            UserDailyStat.user_id == user_id,
+            UserDailyStat.kind == "flash"
+        ).group_by(UserDailyStat.category).all()
+
+        category_distribution = sorted(
+            (
+                {"category": category or None, "count": count}
+                for category, count in categories
+                if count and count > 0
+            ),
+            key=lambda item: item["count"],
+            reverse=True
+        )
+
+        return {
+            "today": period("today"),
+            "week": period("week"),
+            "month": period("month"),
+            "category_distribution": category_distribution,
+        }
+
+    # ==================== 重建 ====================
+
+    def rebuild(self, db: Session, user_id: Optional[str] = None) -> int:
+        """
+        根据闪记/会议表重建汇总（迁移回填或修复偏差时使用）
+
+        Args:
+            db: 数据库会话
+            user_id: 只重建该用户，为空表示全部
+
+        Returns:
+            写入的汇总行数
+        """
+        totals = defaultdict(lambda: [0, 0])
+        sources = (
+            ("flash", Flash, Flash.category),
+            ("meeting", Meeting, None),
+        )
+        for kind, model, category_column in sources:
+            columns = [model.user_id, model.created_at, model.audio_duration]
+            if category_column is not None:
+                columns.append(category_column)
+            query = db.query(*columns)
+            if user_id:
+                query = query.filter(model.user_id == user_id)
+            # 只读取小字段，流式遍历
+            for row in query.yield_per(1000):
+                category = row[3] if category_column is not None else None
+                key = (row.user_id, self.local_day(row.created_at), kind, category or "")
+                totals[key][0] += 1
+                totals[key][1] += row.audio_duration or 0
+
+        delete_query = db.query(UserDailyStat)
+        if user_id:
+            delete_query = delete_query.filter(UserDailyStat.user_id == user_id)
+        delete_query.delete(synchronize_session=False)
+
+        db.bulk_insert_mappings(UserDailyStat, [
+            {
+                "user_id": key[0],
+                "day": key[1],
+                "kind": key[2],
+                "category": key[3],
+                "count": count,
+                "duration": duration,
+            }
+            for key, (count, duration) in totals.items()
+        ])
+        db.commit()
+
+        logger.info(f"统计汇总重建完成: user_id={user_id or 'ALL'}, 行数={len(totals)}")
+        return len(totals)
+
+
+# 全局单例
+stats_service = StatsService()
@@ -0,0 +1,366 @@
+"""
+通义听悟任务轮询
+所有未完成的听悟任务记录在 tingwu_tasks 表，由一个轮询线程按各自的下次查询时间统一查询状态，
+不再为每个任务占用一个 sleep 等待的线程：
+  - 每个检查周期最多查询 TINGWU_POLL_MAX_QPS × TINGWU_POLL_TICK 个到期任务（听悟接口限流）
+  - 状态查询在 TINGWU_POLL_CONCURRENCY 个线程中并发执行，只查状态不下载结果
+  - 任务完成、失败或超时后删除记录并提交结果处理任务（同一事务），由任务队列执行后续处理阶段
+
+查询间隔按预计完成时间安排（预计完成时间 = 固定耗时 + 音频时长 × 转写耗时比例）：
+  - 预计完成前每次等待剩余时间的一半，前期稀疏、临近完成时密集
+  - 超过预计完成时间后间隔按 TINGWU_POLL_BACKOFF 倍数增长
+  - 间隔限制在 [TINGWU_POLL_MIN_INTERVAL, TINGWU_POLL_MAX_INTERVAL]，并加随机抖动；
+    未知时长的任务无法预计完成时间，从一开始就退避，间隔上限为 TINGWU_POLL_UNKNOWN_MAX_INTERVAL
+  - 转写耗时比例按各结果任务类型实际完成的任务做指数滑动平均（进程内），初始值为 TINGWU_TURNAROUND_RATIO
+
+多进程部署（uvicorn --workers N）时各进程通过 leases 表竞争租约，只有持有租约的进程轮询，
+查询速率上限对整个部署生效；持有者退出后租约在 TINGWU_POLL_LEASE_SECONDS 内过期，由其他进程接管。
+领取到期任务时还会顺延 next_poll_at（按查询次数做带条件的 UPDATE），租约交接期间同一任务也只有一个进程查询；
+记录持久化在数据库中，进程重启后继续轮询。
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import Row, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.models import Lease, TingwuTask
+from app.services.job_queue import job_queue
+from app.services.tingwu_service import tingwu_service
+from app.utils.db_writer import db_writer
+from app.utils.metrics import metrics
+
+# 听悟任务的完成状态
+_DONE_STATUSES = ("SUCCEEDED", "COMPLETED")
+
+# 音频时长不少于该值（秒）的任务才用于修正转写耗时比例（短音频以固定耗时为主）
+_MIN_LEARN_DURATION = 60
+
+# 转写耗时比例的滑动平均权重
+_RATIO_ALPHA = 0.2
+
+# 轮询租约名称
+_LEASE_NAME = "tingwu_poller"
+
+
+class TingwuPoller:
+    """通义听悟任务统一轮询"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._ratios: Dict[str, float] = {}
+        self._ratio_lock = threading.Lock()
+        self._gauge_types: set = set()
+        self.worker_id = job_queue.worker_id
+        self.is_leader = False
+
+    # ==================== 登记 ====================
+
+    def track(
+        self,
+        task_id: str,
+        result_job_type: str,
+        payload: Dict,
+        audio_duration: Optional[int] = None,
+        max_wait_seconds: int = 3600,
+        min_interval: Optional[int] = None,
+    ) -> None:
+        """
+        登记听悟任务，完成后提交 result_job_type 任务（参数为 payload + task_id，失败或超时时另有 error）
+        已登记的任务重复登记时忽略（提交任务的处理函数重试时可再次调用）
+
+        Args:
+            task_id: 听悟任务ID
+            result_job_type: 结果处理任务类型（需已在 job_queue 注册）
+            payload: 结果处理任务参数
+            audio_duration: 音频时长（秒），未知时按退避间隔查询
+            max_wait_seconds: 最长等待时间（秒），超过视为超时
+            min_interval: 最小轮询间隔（秒），默认 TINGWU_POLL_MIN_INTERVAL
+        """
+        now = datetime.utcnow()
+        min_interval = min_interval or settings.TINGWU_POLL_MIN_INTERVAL
+        deadline = now + timedelta(seconds=max_wait_seconds)
+        first_delay = self._next_delay(result_job_type, audio_duration, 0, min_interval)
+
+        def insert(db: Session) -> bool:
+            if db.get(TingwuTask, task_id) is not None:
+                return False
+            db.add(TingwuTask(
+                task_id=task_id,
+                result_job_type=result_job_type,
+                payload=json.dumps(payload, ensure_ascii=False),
+                poll_interval=min_interval,
+                audio_duration=audio_duration,
+                next_poll_at=min(now + timedelta(seconds=first_delay), deadline),
+                deadline=deadline,
+                created_at=now,
+            ))
+            return True
+
+        if not db_writer.run(insert):
+            logger.info(f"听悟任务已在轮询中: task_id={task_id}")
+            return
+        logger.info(
+            f"听悟任务已登记轮询: task_id={task_id}, result_job_type={result_job_type}, "
+            f"audio_duration={audio_duration}, 首次查询 {first_delay:.0f} 秒后"
+        )
+
+    # ==================== 查询间隔 ====================
+
+    def turnaround_ratio(self, result_job_type: str) -> float:
+        """当前估计的转写耗时 / 音频时长"""
+        with self._ratio_lock:
+            return self._ratios.get(result_job_type, settings.TINGWU_TURNAROUND_RATIO)
+
+    def _learn(self, result_job_type: str, audio_duration: Optional[int], elapsed: float) -> None:
+        """按完成任务的实际耗时修正转写耗时比例（发现完成的时间略晚于实际完成，估计偏保守）"""
+        if not audio_duration or audio_duration < _MIN_LEARN_DURATION:
+            return
+        observed = max(elapsed - settings.TINGWU_TURNAROUND_OVERHEAD, 0) / audio_duration
+        with self._ratio_lock:
+            ratio = self._ratios.get(result_job_type, settings.TINGWU_TURNAROUND_RATIO)
+            ratio += _RATIO_ALPHA * (observed - ratio)
+            self._ratios[result_job_type] = ratio
+            registered = result_job_type in self._gauge_types
+            self._gauge_types.add(result_job_type)
+        if not registered:
+            # 每种结果任务类型注册一次，导出时读取当前比例
+            metrics.gauge(
+                "tingwu_turnaround_ratio",
+                lambda jt=result_job_type: self.turnaround_ratio(jt),
+                job_type=result_job_type,
+            )
+
+    def _next_delay(
+        self,
+        result_job_type: str,
+        audio_duration: Optional[int],
+        elapsed: float,
+        min_interval: int,
+    ) -> float:
+        """
+        计算距下次查询的秒数
+
+        Args:
+            result_job_type: 结果处理任务类型（各类型分别估计转写耗时比例）
+            audio_duration: 音频时长（秒），未知时视为 0
+            elapsed: 任务已提交的秒数
+            min_interval: 最小轮询间隔（秒）
+        """
+        expected = settings.TINGWU_TURNAROUND_OVERHEAD + (audio_duration or 0) * self.turnaround_ratio(result_job_type)
+        remaining = expected - elapsed
+        if remaining > 0:
+            # 预计完成前：等待剩余时间的一半
+            delay = remaining / 2
+        else:
+            # 超过预计完成时间：间隔随超出时间按倍数增长
+            delay = -remaining * (settings.TINGWU_POLL_BACKOFF - 1)
+
+        delay *= random.uniform(1 - settings.TINGWU_POLL_JITTER, 1 + settings.TINGWU_POLL_JITTER)
+        max_interval = settings.TINGWU_POLL_MAX_INTERVAL
+        if not audio_duration:
+            # 未知时长：退避间隔不宜过长，否则完成后要很久才发现
+            max_interval = min(max_interval, settings.TINGWU_POLL_UNKNOWN_MAX_INTERVAL)
+        return min(max(delay, min_interval), max(max_interval, min_interval))
+
+    # ==================== 租约 ====================
+
+    def _acquire_lease(self, db: Session) -> bool:
+        """获取或续期轮询租约（在写线程中执行），返回本进程是否持有租约"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=settings.TINGWU_POLL_LEASE_SECONDS)
+        holder = self.worker_id
+
+        result = db.execute(
+            update(Lease)
+            .where(Lease.name == _LEASE_NAME, or_(Lease.holder == holder, Lease.expires_at < now))
+            .values(holder=holder, expires_at=expires_at)
+        )
+        if result.rowcount == 1:
+            return True
+        if db.get(Lease, _LEASE_NAME) is not None:
+            return False
+
+        try:
+            db.add(Lease(name=_LEASE_NAME, holder=holder, expires_at=expires_at))
+            db.flush()
+        except IntegrityError:
+            # 其他进程同时创建了租约
+            db.rollback()
+            return False
+        return True
+
+    def _release_lease(self, db: Session) -> None:
+        """释放租约（停止时调用），其他进程下个周期即可接管"""
+        db.execute(
+            update(Lease)
+            .where(Lease.name == _LEASE_NAME, Lease.holder == self.worker_id)
+            .values(expires_at=datetime.utcnow())
+        )
+
+    def _check_lease(self) -> bool:
+        try:
+            leader = db_writer.run(self._acquire_lease)
+        except Exception as e:
+            logger.error(f"获取听悟轮询租约失败: {e}")
+            leader = False
+        if leader != self.is_leader:
+            logger.info(f"听悟轮询租约{'已获取' if leader else '已失去'}: {self.worker_id}")
+        self.is_leader = leader
+        return leader
+
+    # ==================== 轮询 ====================
+
+    def _claim_due(self, db: Session, limit: int) -> List[Row]:
+        """领取到期任务并顺延下次查询时间（在写线程中执行）"""
+        now = datetime.utcnow()
+        due = db.execute(
+            select(
+                TingwuTask.task_id,
+                TingwuTask.result_job_type,
+                TingwuTask.polls,
+                TingwuTask.poll_interval,
+                TingwuTask.audio_duration,
+                TingwuTask.deadline,
+                TingwuTask.created_at,
+            )
+            .where(TingwuTask.next_poll_at <= now)
+            .order_by(TingwuTask.next_poll_at)
+            .limit(limit)
+        ).all()
+
+        claimed = []
+        for task in due:
+            elapsed = (now - task.created_at).total_seconds()
+            delay = self._next_delay(task.result_job_type, task.audio_duration, elapsed, task.poll_interval)
+            result = db.execute(
+                update(TingwuTask)
+                .where(TingwuTask.task_id == task.task_id, TingwuTask.polls == task.polls)
+                .values(
+                    # 超时前至少再查询一次
+                    next_poll_at=min(now + timedelta(seconds=delay), max(task.deadline, now)),
+                    polls=TingwuTask.polls + 1,
+                )
+            )
+            if result.rowcount == 1:
+                claimed.append(task)
+        return claimed
+
+    def _complete(self, db: Session, task_id: str, error: Optional[str]) -> bool:
+        """删除任务记录并提交结果处理任务（在写线程中执行，同一事务）"""
+        task = db.get(TingwuTask, task_id)
+        if task is None:
+            # 已被其他进程处理
+            return False
+
+        payload = json.loads(task.payload or "{}")
+        payload["task_id"] = task_id
+        if error:
+            payload["error"] = error
+        job_queue.add(db, task.result_job_type, payload)
+        db.delete(task)
+        return True
+
+    def _poll_one(self, task: Row) -> None:
+        """查询一个任务的状态，结束时提交结果处理任务"""
+        task_id = task.task_id
+        error = None
+        try:
+            status_info = tingwu_service.get_task_status(task_id, parse_result=False)
+            status = status_info["status"]
+        except Exception as e:
+            # 查询失败（网络等）时等下次轮询，超时后按超时处理
+            logger.warning(f"查询听悟任务状态失败: task_id={task_id}, error={e}")
+            status = "ERROR"
+        metrics.increment("tingwu_polls_total", status=status)
+
+        if status in _DONE_STATUSES:
+            elapsed = (datetime.utcnow() - task.created_at).total_seconds()
+            logger.info(f"听悟任务完成: task_id={task_id}, 耗时 {elapsed:.0f} 秒, 查询 {task.polls + 1} 次")
+            self._learn(task.result_job_type, task.audio_duration, elapsed)
+        elif status == "FAILED":
+            error = f"任务失败: {status_info.get('error_message') or '未知错误'}"
+        elif datetime.utcnow() > task.deadline:
+            error = f"任务超时: {task_id}"
+        else:
+            return
+
+        try:
+            if db_writer.run(self._complete, task_id, error):
+                job_queue.notify()
+        except Exception as e:
+            logger.error(f"提交听悟结果任务失败: task_id={task_id}, error={e}")
+
+    def _loop(self) -> None:
+        tick = max(settings.TINGWU_POLL_TICK, 0.1)
+        budget = max(int(settings.TINGWU_POLL_MAX_QPS * tick), 1)
+        renew_interval = max(settings.TINGWU_POLL_LEASE_SECONDS / 3, tick)
+        lease_checked = None
+
+        while not self._stop.is_set():
+            started = time.monotonic()
+            if lease_checked is None or started - lease_checked >= renew_interval:
+                self._check_lease()
+                lease_checked = started
+            if not self.is_leader:
+                # 其他进程在轮询，定期尝试接管
+                self._wakeup.wait(renew_interval)
+                self._wakeup.clear()
+                continue
+
+            try:
+                due = db_writer.run(self._claim_due, budget)
+                if due:
+                    # 等本批查询结束再领取下一批，查询速率不超过限流
+                    list(self._executor.map(self._poll_one, due))
+            except Exception as e:
+                logger.error(f"听悟任务轮询出错: {e}")
+
+            self._wakeup.wait(max(tick - (time.monotonic() - started), 0))
+            self._wakeup.clear()
+
+    # ==================== 启停 ====================
+
+    def start(self) -> None:
+        """启动轮询线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(settings.TINGWU_POLL_CONCURRENCY, 1), thread_name_prefix="tingwu-poll"
+        )
+        self._thread = threading.Thread(target=self._loop, name="tingwu-poller", daemon=True)
+        self._thread.start()
+        logger.info(f"听悟任务轮询已启动（每秒最多 {settings.TINGWU_POLL_MAX_QPS} 次查询）")
+
+    def stop(self, timeout: float = 5) -> None:
+        """停止轮询（未完成的任务保留在表中，重启后继续）"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._thread = None
+        if self.is_leader:
+            try:
+                db_writer.run(self._release_lease)
+            except Exception as e:
+                logger.warning(f"释放听悟轮询租约失败: {e}")
+            self.is_leader = False
+
+
+# 全局单例
+tingwu_poller = TingwuPoller()
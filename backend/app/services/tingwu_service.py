@@ -4,14 +4,29 @@
 """
 
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
+
+import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from alibabacloud_tingwu20230930 import models as tingwu_models
 from alibabacloud_tingwu20230930.client import Client as TingwuClient
 from alibabacloud_tea_openapi import models as open_api_models
 from config import settings
 
+# 流式解析转写文件（未安装 ijson 时整体下载后解析）
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# 需要下载的结果文件（data.result 中的字段，值为文件 URL）
+_RESULT_FIELDS = ("transcription", "summarization", "meeting_assistance", "auto_chapters")
+
 
 class TingwuService:
     """通义听悟服务"""
@@ -20,6 +35,9 @@ class TingwuService:
         """初始化客户端"""
         self.app_key = settings.TINGWU_APP_KEY
         self.client = self._create_client()
+        self._http: Optional[requests.Session] = None
+        self._download_executor: Optional[ThreadPoolExecutor] = None
+        self._http_lock = threading.Lock()
         
     def _create_client(self) -> TingwuClient:
         """创建通义听悟客户端"""
@@ -31,6 +49,73 @@ class TingwuService:
         config.endpoint = 'tingwu.cn-beijing.aliyuncs.com'
         return TingwuClient(config)
     
+    def _get_http(self) -> requests.Session:
+        """结果文件下载用的共享会话（连接池 + 重试），首次使用时创建"""
+        with self._http_lock:
+            if self._http is None:
+                retry = Retry(
+                    total=settings.TINGWU_HTTP_MAX_RETRIES,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET"]),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=settings.TINGWU_HTTP_MAX_CONNECTIONS,
+                    pool_maxsize=settings.TINGWU_HTTP_MAX_CONNECTIONS,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._http = session
+                self._download_executor = ThreadPoolExecutor(
+                    max_workers=max(settings.TINGWU_DOWNLOAD_CONCURRENCY, 1),
+                    thread_name_prefix="tingwu-download",
+                )
+            return self._http
+    
+    def _timeout(self):
+        """下载超时（连接, 读取）"""
+        return (settings.TINGWU_HTTP_CONNECT_TIMEOUT, settings.TINGWU_HTTP_READ_TIMEOUT)
+    
+    def _download_json(self, url: str):
+        """下载并解析 JSON 结果文件"""
+        response = self._get_http().get(url, timeout=self._timeout())
+        response.raise_for_status()
+        return response.json()
+    
+    def _download_transcription(self, url: str) -> Dict:
+        """
+        下载转写文件，边下载边逐段解析（长会议的转写文件可达数十 MB，不在内存中保留原始内容）
+        
+        Returns:
+            {"Transcription": {"Paragraphs": [...]}}
+        """
+        if ijson is None:
+            return self._download_json(url)
+        
+        with self._get_http().get(url, timeout=self._timeout(), stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True  # 由 urllib3 解压 gzip
+            paragraphs = list(ijson.items(response.raw, "Transcription.Paragraphs.item", use_float=True))
+        return {"Transcription": {"Paragraphs": paragraphs}}
+    
+    def _download_results(self, data) -> Dict:
+        """并发下载所有结果文件，返回 {字段名: Future}"""
+        result = getattr(data, 'result', None)
+        if result is None:
+            return {}
+        
+        self._get_http()
+        futures = {}
+        for field in _RESULT_FIELDS:
+            url = getattr(result, field, None)
+            if url:
+                download = self._download_transcription if field == 'transcription' else self._download_json
+                futures[field] = self._download_executor.submit(download, url)
+        return futures
+    
     def create_task(
         self, 
         file_url: str,
@@ -164,12 +249,13 @@ class TingwuService:
             logger.error(f"创建通义听悟任务失败: {e}", exc_info=True)
             raise Exception(f"创建转写任务失败: {str(e)}")
     
-    def get_task_status(self, task_id: str) -> Dict:
+    def get_task_status(self, task_id: str, parse_result: bool = True) -> Dict:
         """
         查询任务状态和结果
         
         Args:
             task_id: 任务ID
+            parse_result: 任务完成时是否下载并解析结果文件（只关心状态时传 False）
         
         Returns:
             {
@@ -190,7 +276,7 @@ class TingwuService:
             }
             
             # 如果任务完成，解析结果（通义听悟返回 SUCCEEDED 或 COMPLETED）
-            if status in ["SUCCEEDED", "COMPLETED"]:
+            if status in ["SUCCEEDED", "COMPLETED"] and parse_result:
                 logger.info(f"任务 {task_id} 已完成，开始解析结果")
                 result["result"] = self._parse_result(data)
             elif status == "FAILED":
@@ -218,14 +304,14 @@ class TingwuService:
         """
         result = {}
         
+        # 所有结果文件同时开始下载（result.transcription 等字段就是URL）
+        downloads = self._download_results(data)
+        
         try:
-            # 1. 获取转写文本和段落信息（result.transcription 就是URL）
-            if hasattr(data, 'result') and hasattr(data.result, 'transcription') and data.result.transcription:
-                # 需要下载转写文件
-                import requests
-                transcription_url = data.result.transcription  # 直接是URL字符串
-                logger.info(f"下载转写文件: {transcription_url[:100]}...")
-                transcription_data = requests.get(transcription_url).json()
+            # 1. 获取转写文本和段落信息
+            if 'transcription' in downloads:
+                logger.info(f"下载转写文件: {data.result.transcription[:100]}...")
+                transcription_data = downloads['transcription'].result()
                 
                 # 提取完整文本和段落信息（新格式：Transcription.Paragraphs.Words）
                 if 'Transcription' in transcription_data:
@@ -256,15 +342,11 @@ class TingwuService:
                 logger.info(f"🔍 data.result 中非空的字段: {result_fields}")
                 logger.info(f"🔍 summarization 值: {data.result.summarization}")
             
-            if hasattr(data, 'result') and hasattr(data.result, 'summarization') and data.result.summarization:
-                import requests
-                summary_url = data.result.summarization  # 直接是URL字符串
-                logger.info(f"下载摘要文件: {summary_url[:100]}...")
+            if 'summarization' in downloads:
+                logger.info(f"下载摘要文件: {data.result.summarization[:100]}...")
                 
                 try:
-                    response = requests.get(summary_url)
-                    response.raise_for_status()
-                    summary_data = response.json()
+                    summary_data = downloads['summarization'].result()
                     logger.info(f"📥 摘要数据类型: {type(summary_data)}, 键: {summary_data.keys() if isinstance(summary_data, dict) else 'N/A'}")
                     
                     if isinstance(summary_data, dict) and 'Summarization' in summary_data:
@@ -319,10 +401,8 @@ class TingwuService:
                     logger.error(f"❌ 下载或解析摘要文件失败: {e}")
             
             # 3. 获取会议助手结果（关键句、行动项）
-            if hasattr(data, 'result') and hasattr(data.result, 'meeting_assistance') and data.result.meeting_assistance:
-                import requests
-                meeting_url = data.result.meeting_assistance  # 直接是URL字符串
-                meeting_data = requests.get(meeting_url).json()
+            if 'meeting_assistance' in downloads:
+                meeting_data = downloads['meeting_assistance'].result()
                 
                 # 提取关键句作为关键词
                 if 'KeySentences' in meeting_data:
@@ -337,10 +417,8 @@ class TingwuService:
                     ]
             
             # 4. 获取章节信息
-            if hasattr(data, 'result') and hasattr(data.result, 'auto_chapters') and data.result.auto_chapters:
-                import requests
-                chapters_url = data.result.auto_chapters  # 直接是URL字符串
-                chapters_data = requests.get(chapters_url).json()
+            if 'auto_chapters' in downloads:
+                chapters_data = downloads['auto_chapters'].result()
                 
                 if 'AutoChapters' in chapters_data:
                     result['chapters'] = chapters_data['AutoChapters']
@@ -350,6 +428,9 @@ class TingwuService:
         except Exception as e:
             logger.error(f"解析结果失败: {e}")
             # 即使解析失败也返回部分结果
+        finally:
+            for future in downloads.values():
+                future.cancel()
         
         return result
     
@@ -360,7 +441,8 @@ class TingwuService:
         poll_interval: int = 5
     ) -> Dict:
         """
-        等待任务完成（轮询）
+        等待任务完成（在当前线程中轮询）
+        后台处理已改由 tingwu_poller 统一轮询，本方法保留供脚本调试使用
         
         Args:
             task_id: 任务ID
@@ -0,0 +1,123 @@
+"""
+转录段落窗口查询服务
+将通义听悟的段落 JSON 解析为按时间排序的索引，支持按时间窗口/段落范围/说话人分段读取
+"""
+
+import json
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+class TranscriptIndex:
+    """单个会议的转录段落索引"""
+
+    def __init__(self, paragraphs: List[Dict]):
+        self.paragraphs = paragraphs
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.speakers: List[Optional[str]] = []
+        self.texts: List[str] = []
+        # 结束时间的前缀最大值（单调递增），用于二分定位时间窗口起点
+        self._max_ends: List[int] = []
+
+        max_end = 0
+        for para in paragraphs:
+            words = para.get('Words') or []
+            start = words[0].get('Start', 0) if words else 0
+            end = words[-1].get('End', start) if words else start
+            speaker = para.get('SpeakerId')
+
+            self.starts.append(start)
+            self.ends.append(end)
+            self.speakers.append(str(speaker) if speaker is not None else None)
+            self.texts.append(''.join(w.get('Text', '') for w in words))
+
+            max_end = max(max_end, end)
+            self._max_ends.append(max_end)
+
+    def __len__(self) -> int:
+        return len(self.paragraphs)
+
+    def select(
+        self,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        speaker_ids: Optional[Set[str]] = None,
+    ) -> List[int]:
+        """
+        查询与 [start_ms, end_ms) 时间窗口重叠、且属于指定说话人的段落下标
+
+        Args:
+            start_ms: 窗口起点（毫秒），为空表示从头开始
+            end_ms: 窗口终点（毫秒，不含），为空表示到结尾
+            speaker_ids: 说话人ID集合，为空表示不过滤
+
+        Returns:
+            段落下标列表（按时间顺序）
+        """
+        first = 0
+        if start_ms is not None:
+            first = bisect_right(self._max_ends, start_ms)
+
+        indexes = []
+        for i in range(first, len(self.paragraphs)):
+            if end_ms is not None and self.starts[i] >= end_ms:
+                break
+            if start_ms is not None and self.ends[i] <= start_ms:
+                continue
+            if speaker_ids and self.speakers[i] not in speaker_ids:
+                continue
+            indexes.append(i)
+        return indexes
+
+    def to_item(self, i: int, include_words: bool = False) -> Dict:
+        """构建单个段落的响应数据"""
+        para = self.paragraphs[i]
+        return {
+            "index": i,
+            "paragraph_id": para.get('ParagraphId'),
+            "speaker_id": self.speakers[i],
+            "start_ms": self.starts[i],
+            "end_ms": self.ends[i],
+            "text": self.texts[i],
+            "words": (para.get('Words') or []) if include_words else None,
+        }
+
+
+# 缓存的会议索引数
+_CACHE_SIZE = 8
+
+_cache: "OrderedDict[Tuple[str, int], TranscriptIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_transcript_index(meeting_id: str, version: int, load: Callable[[], Optional[str]]) -> TranscriptIndex:
+    """
+    获取会议的段落索引
+
+    以 (会议ID, 行版本) 为缓存键：连续翻页时调用方只需查询 version，
+    未命中时才调用 load 读取段落 JSON 并解析；转录更新后 version 递增，自然失效
+
+    Args:
+        meeting_id: 会议ID
+        version: 会议当前的行版本
+        load: 读取段落 JSON 字符串（没有段落时返回 None）
+    """
+    key = (meeting_id, version)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+
+    raw_paragraphs = load()
+    index = TranscriptIndex(json.loads(raw_paragraphs) if raw_paragraphs else [])
+
+    with _cache_lock:
+        _cache[key] = index
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
@@ -8,12 +8,29 @@ import tempfile
 import librosa
 import numpy as np
 from loguru import logger
-from typing import List
+from typing import List, Optional
 
 
 class WaveformService:
     """音频波形提取服务"""
     
+    @staticmethod
+    def get_duration(audio_path: str) -> Optional[int]:
+        """
+        读取音频时长（秒）✨新增
+        
+        Args:
+            audio_path: 本地音频文件路径
+            
+        Returns:
+            时长（秒，向上取整），无法解析时返回 None
+        """
+        try:
+            return int(np.ceil(librosa.get_duration(path=audio_path)))
+        except Exception as e:
+            logger.warning(f"读取音频时长失败: {audio_path}, {e}")
+            return None
+    
     @staticmethod
     def extract_waveform(audio_path: str, num_points: int = 800) -> List[float]:
         """
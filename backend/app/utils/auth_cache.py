@@ -0,0 +1,242 @@
+"""
+认证缓存
+缓存「已验证 Token -> 用户ID」和「用户ID -> 用户快照」，
+get_current_user 命中缓存时不解码 JWT、不查询数据库
+
+- memory：进程内 LRU + TTL（默认），多进程部署时各进程独立，失效通知只作用于本进程，
+  其他进程最多在 AUTH_CACHE_TTL 秒后读到最新状态
+- redis：使用 REDIS_* 配置，多进程共享，失效立即对所有进程生效（需安装 redis 包）；
+  访问为阻塞的网络调用，异步代码通过 `await auth_cache.call(...)` 放到线程池执行
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+
+from config import settings
+
+try:
+    import redis
+except ImportError:  # redis 为可选依赖
+    redis = None
+
+
+# 用户快照包含的字段（/auth/me 所需字段 + 状态）
+USER_SNAPSHOT_FIELDS = ("id", "nickname", "avatar", "subscription_tier", "created_at", "is_active")
+
+
+def token_key(token: str) -> str:
+    """Token 摘要作为缓存键，缓存中不保存 Token 原文"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def user_snapshot(user) -> Dict[str, Any]:
+    """把 User 对象转成可序列化的快照"""
+    snapshot = {}
+    for field in USER_SNAPSHOT_FIELDS:
+        value = getattr(user, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif hasattr(value, "value"):
+            value = value.value
+        snapshot[field] = value
+    return snapshot
+
+
+class _MemoryBackend:
+    """进程内 LRU + TTL"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _RedisBackend:
+    """Redis 共享缓存"""
+
+    name = "redis"
+    prefix = "cshine:auth:"
+
+    def __init__(self):
+        self._client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD or None,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            decode_responses=True,
+        )
+
+    @property
+    def client(self):
+        return self._client
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._client.set(self.prefix + key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+
+class AuthCache:
+    """认证缓存"""
+
+    def __init__(self):
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = self._create_backend()
+        return self._backend
+
+    @staticmethod
+    def _create_backend():
+        if settings.AUTH_CACHE_BACKEND == "redis":
+            if redis is None:
+                logger.warning("AUTH_CACHE_BACKEND=redis 但未安装 redis 包，认证缓存使用进程内缓存")
+            else:
+                return _RedisBackend()
+        return _MemoryBackend(settings.AUTH_CACHE_MAX_ENTRIES)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.AUTH_CACHE_ENABLED and settings.AUTH_CACHE_TTL > 0
+
+    @property
+    def blocking(self) -> bool:
+        """访问缓存是否为阻塞的网络调用（Redis 后端）✨新增"""
+        return self.enabled and isinstance(self.backend, _RedisBackend)
+
+    async def call(self, func: Callable[..., Any], *args) -> Any:
+        """
+        在异步代码中调用缓存方法 ✨新增
+        Redis 后端放到线程池执行，避免 Redis 缓慢或不可达时阻塞事件循环；进程内缓存直接调用
+        """
+        if self.blocking:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    def redis_client(self):
+        """Redis 后端的客户端（供其他需要多进程共享状态的组件复用），未使用 Redis 时返回 None"""
+        backend = self.backend
+        return backend.client if isinstance(backend, _RedisBackend) else None
+
+    def _get(self, key: str) -> Optional[str]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            # 缓存不可用时退回数据库验证
+            logger.warning(f"认证缓存读取失败: {e}")
+            return None
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"认证缓存写入失败: {e}")
+
+    # ==================== Token ====================
+
+    def get_token_user_id(self, token: str) -> Optional[str]:
+        """已验证过的 Token 对应的用户ID，未缓存返回 None"""
+        if not self.enabled:
+            return None
+        return self._get("token:" + token_key(token))
+
+    def set_token_user_id(self, token: str, user_id: str, expires_at: Optional[int]) -> None:
+        """
+        记录已验证的 Token
+
+        Args:
+            token: JWT Token
+            user_id: Token 中的用户ID
+            expires_at: Token 过期时间戳（exp），缓存不会超过 Token 的有效期
+        """
+        if not self.enabled:
+            return
+        ttl = settings.AUTH_CACHE_TTL
+        if expires_at is not None:
+            ttl = min(ttl, int(expires_at - time.time()))
+        if ttl > 0:
+            self._set("token:" + token_key(token), user_id, ttl)
+
+    # ==================== 用户 ====================
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """获取用户快照，未缓存返回 None"""
+        if not self.enabled:
+            return None
+        raw = self._get("user:" + user_id)
+        return json.loads(raw) if raw else None
+
+    def set_user(self, user) -> None:
+        """缓存用户快照"""
+        if not self.enabled:
+            return
+        self._set("user:" + user.id, json.dumps(user_snapshot(user)), settings.AUTH_CACHE_TTL)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """用户状态/资料变化时调用（如停用账号、更新昵称）"""
+        if not self.enabled:
+            return
+        try:
+            self.backend.delete("user:" + user_id)
+        except Exception as e:
+            logger.warning(f"认证缓存失效失败: user_id={user_id}, {e}")
+
+    def clear(self) -> None:
+        """清空缓存"""
+        try:
+            self.backend.clear()
+        except Exception as e:
+            logger.warning(f"认证缓存清空失败: {e}")
+
+
+# 全局单例
+auth_cache = AuthCache()
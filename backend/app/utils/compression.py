@@ -0,0 +1,188 @@
+"""
+响应压缩中间件
+按 Accept-Encoding 选择 brotli（已安装 brotli 包时）或 gzip，流式压缩，
+不会把整个响应体缓存在内存中；小于阈值的响应和已压缩/二进制内容原样返回
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖
+    brotli = None
+
+
+# 值得压缩的内容类型（音频/图片等已压缩格式不再压缩）
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """解析 Accept-Encoding，返回 q>0 的编码集合"""
+    encodings = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            encodings.add(name)
+    return encodings
+
+
+class _GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        # wbits=31: gzip 头 + 最大窗口
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    流式压缩中间件
+
+    Args:
+        app: ASGI 应用
+        minimum_size: 响应体小于该字节数时不压缩（仅对单块响应生效，流式响应一律压缩）
+        gzip_level: gzip 压缩级别（1-9）
+        brotli_quality: brotli 压缩质量（0-11），移动端接口建议 4-5，兼顾 CPU 与压缩率
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _select_compressor(self, scope: Scope):
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return lambda: _BrotliCompressor(self.brotli_quality)
+        if "gzip" in accepted:
+            return lambda: _GzipCompressor(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        factory = self._select_compressor(scope)
+        if factory is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, factory, self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """拦截单个响应的 send，按需压缩"""
+
+    def __init__(self, send: Send, factory, minimum_size: int):
+        self.send = send
+        self.factory = factory
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # 等到第一块响应体再决定是否压缩
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = not self._should_compress(headers)
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            # 第一块：单块且过小的响应不压缩
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                self.start_message = None
+                await self.send(message)
+                return
+
+            self.compressor = self.factory()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.compressor.encoding
+            headers.add_vary_header("Accept-Encoding")
+            # 压缩后的表示与原文不同，强 ETag 降为弱 ETag（If-None-Match 使用弱比较，仍可命中）
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.compressor.process(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            await self.send(self.start_message)
+            self.start_message = None
+
+        chunk = self.compressor.process(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": chunk})
+        elif chunk:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
@@ -0,0 +1,80 @@
+"""
+数据库连接池监控
+在 QueuePool 取连接时记录等待时间、溢出连接和超时次数，写入进程内指标，
+配合 GET /api/v1/admin/db/pool 观察连接池是否不够用
+"""
+
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.utils.metrics import metrics
+
+
+class _PoolTelemetryMixin:
+    """连接池监控（连接池名称取自 create_engine 的 pool_logging_name）"""
+
+    @property
+    def telemetry_name(self) -> str:
+        return getattr(self, "_orig_logging_name", None) or "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.increment("db_pool_timeouts_total", pool=self.telemetry_name)
+            raise
+        finally:
+            metrics.observe("db_pool_wait_seconds", time.perf_counter() - start, pool=self.telemetry_name)
+
+    def _inc_overflow(self) -> bool:
+        created = super()._inc_overflow()
+        if created and self._overflow > 0:
+            # 常驻连接已用完，新建溢出连接
+            metrics.increment("db_pool_overflow_total", pool=self.telemetry_name)
+        return created
+
+
+class InstrumentedQueuePool(_PoolTelemetryMixin, QueuePool):
+    """带监控的同步连接池"""
+
+
+class InstrumentedAsyncQueuePool(_PoolTelemetryMixin, AsyncAdaptedQueuePool):
+    """带监控的异步连接池"""
+
+
+def pool_status(engine: Optional[Engine]) -> Optional[Dict]:
+    """
+    连接池当前状态
+
+    Returns:
+        {"pool_size", "checked_out", "checked_in", "overflow", "max_overflow", "timeout"}，
+        非 QueuePool（如 SQLite 内存库）只返回类型
+    """
+    if engine is None:
+        return None
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool_class": type(pool).__name__}
+    return {
+        "pool_class": type(pool).__name__,
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    }
+
+
+def register_pool_gauges(engine: Optional[Engine], name: str) -> None:
+    """把连接池已借出/溢出连接数注册为仪表（按需读取 engine.pool，dispose 重建连接池后仍然有效）"""
+    if engine is None or not isinstance(engine.pool, QueuePool):
+        return
+    metrics.gauge("db_pool_checked_out", lambda: engine.pool.checkedout(), pool=name)
+    metrics.gauge("db_pool_overflow", lambda: max(engine.pool.overflow(), 0), pool=name)
+    metrics.gauge("db_pool_size", lambda: engine.pool.size(), pool=name)
@@ -0,0 +1,222 @@
+"""
+读写分离路由
+配置 DATABASE_REPLICA_URL 后，只读列表接口的会话改走只读副本，减少与处理流水线写入的竞争。
+以下情况退回主库：
+  - 副本延迟超过 DB_REPLICA_MAX_LAG_SECONDS，或延迟查询失败（副本不可用）
+  - 同一用户在 DB_READ_YOUR_WRITES_SECONDS 秒内刚写过数据（读己之写）
+
+写入记录来自主库会话的提交事件：
+  - 被新增/修改/删除的 ORM 对象的 user_id（接口和后台处理线程的写入）
+  - 会话执行过 UPDATE/DELETE/INSERT 语句（批量操作不经过 ORM 对象）时，记录发起请求的用户
+    （get_current_user 把用户ID写入请求会话的 info["request_user_id"]）
+AUTH_CACHE_BACKEND=redis 时写入记录同时保存在 Redis 中，多进程部署时所有 worker 可见；
+否则只保存在进程内，其他 worker 的请求依赖延迟阈值兜底。
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.utils.auth_cache import auth_cache
+from app.utils.metrics import metrics
+
+# 副本延迟查询（PostgreSQL 流复制）：已回放到最新位置时视为无延迟，
+# 否则取最后回放事务距今的时间（主库长时间无写入时该值会偏大，只会让读取多走主库）
+_POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+# 读己之写记录的上限，超过时清理过期记录
+_MAX_TRACKED_WRITERS = 10000
+
+# 读己之写记录的 Redis 键前缀
+_REDIS_PREFIX = "cshine:recent_write:"
+
+
+class ReplicaRouter:
+    """只读副本路由"""
+
+    def __init__(
+        self,
+        replica_engine: Optional[Engine],
+        max_lag: float,
+        lag_check_interval: float,
+        read_your_writes_window: float,
+    ):
+        self.replica_engine = replica_engine
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.read_your_writes_window = read_your_writes_window
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._lag: Optional[float] = None
+        self._lag_checked_at: Optional[float] = None
+        self._checking = False
+        if replica_engine is not None:
+            metrics.gauge("db_replica_lag_seconds", lambda: self._lag)
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_engine is not None
+
+    # ==================== 读己之写 ====================
+
+    def record_write(self, user_id: str) -> None:
+        """记录用户刚写入数据（主库会话提交后调用）"""
+        client = auth_cache.redis_client()
+        if client is not None:
+            try:
+                client.set(_REDIS_PREFIX + user_id, 1, px=max(int(self.read_your_writes_window * 1000), 1))
+            except Exception as e:
+                logger.warning(f"读己之写记录写入 Redis 失败: {e}")
+
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[user_id] = now
+            if len(self._recent_writes) > _MAX_TRACKED_WRITERS:
+                cutoff = now - self.read_your_writes_window
+                self._recent_writes = {
+                    uid: ts for uid, ts in self._recent_writes.items() if ts > cutoff
+                }
+
+    def wrote_recently(self, user_id: str) -> bool:
+        """用户是否在读己之写窗口内写过数据（本进程或其他进程）"""
+        with self._lock:
+            ts = self._recent_writes.get(user_id)
+        if ts is not None and time.monotonic() - ts < self.read_your_writes_window:
+            return True
+
+        client = auth_cache.redis_client()
+        if client is not None:
+            try:
+                return bool(client.exists(_REDIS_PREFIX + user_id))
+            except Exception as e:
+                # Redis 不可用时按写过处理，读取走主库
+                logger.warning(f"读己之写记录读取 Redis 失败: {e}")
+                return True
+        return False
+
+    # ==================== 副本延迟 ====================
+
+    def _measure_lag(self) -> float:
+        """查询副本延迟（秒）；非 PostgreSQL 副本无法测量，视为 0"""
+        with self.replica_engine.connect() as conn:
+            if self.replica_engine.dialect.name == "postgresql":
+                return float(conn.execute(_POSTGRES_LAG_SQL).scalar() or 0)
+            conn.execute(text("SELECT 1"))
+            return 0.0
+
+    def replica_lag(self) -> Optional[float]:
+        """
+        副本延迟（秒），按 DB_REPLICA_LAG_CHECK_INTERVAL 缓存
+
+        Returns:
+            延迟秒数；副本不可用时返回 None
+        """
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            fresh = self._lag_checked_at is not None and now - self._lag_checked_at < self.lag_check_interval
+            if fresh or self._checking:
+                # 其他线程正在查询时沿用上次结果，避免并发请求同时查询
+                return self._lag
+            self._checking = True
+
+        try:
+            lag = self._measure_lag()
+        except Exception as e:
+            logger.warning(f"只读副本延迟查询失败，读取退回主库: {e}")
+            lag = None
+
+        with self._lock:
+            self._lag = lag
+            self._lag_checked_at = time.monotonic()
+            self._checking = False
+        return lag
+
+    # ==================== 路由 ====================
+
+    def use_replica(self, user_id: Optional[str]) -> bool:
+        """
+        本次只读请求是否走副本
+
+        Args:
+            user_id: 当前用户ID（用于读己之写判断）
+        """
+        if not self.enabled:
+            return False
+
+        if user_id and self.wrote_recently(user_id):
+            reason = "read_your_writes"
+        else:
+            lag = self.replica_lag()
+            if lag is None:
+                reason = "replica_unavailable"
+            elif lag > self.max_lag:
+                reason = "replica_lag"
+            else:
+                metrics.increment("db_read_route_total", target="replica", reason="ok")
+                return True
+
+        metrics.increment("db_read_route_total", target="primary", reason=reason)
+        return False
+
+    def status(self) -> Dict:
+        """当前路由状态（管理员接口）"""
+        return {
+            "enabled": self.enabled,
+            "lag_seconds": self._lag,
+            "max_lag_seconds": self.max_lag,
+            "read_your_writes_seconds": self.read_your_writes_window,
+            "tracked_writers": len(self._recent_writes),
+            "shared_tracking": auth_cache.redis_client() is not None,
+        }
+
+
+def track_writes(session_factory, router: ReplicaRouter) -> None:
+    """
+    在主库会话上记录写入的用户：flush 时收集被新增/修改/删除对象的 user_id，
+    执行 UPDATE/DELETE/INSERT 语句时收集请求用户，提交成功后写入读己之写记录，
+    回滚时丢弃（未配置副本时不注册）
+    """
+    if not router.enabled:
+        return
+
+    def add_request_user(session: Session, user_ids: set) -> None:
+        request_user_id = session.info.get("request_user_id")
+        if request_user_id:
+            user_ids.add(request_user_id)
+
+    @event.listens_for(session_factory, "after_flush")
+    def collect_writers(session: Session, _flush_context):
+        user_ids = session.info.setdefault("written_user_ids", set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            user_id = getattr(obj, "user_id", None)
+            if user_id:
+                user_ids.add(user_id)
+        add_request_user(session, user_ids)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def collect_bulk_writers(orm_execute_state):
+        # query.update()/delete()、insert() 等语句不产生 ORM 对象变更，按请求用户记录
+        if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+            session = orm_execute_state.session
+            add_request_user(session, session.info.setdefault("written_user_ids", set()))
+
+    @event.listens_for(session_factory, "after_commit")
+    def record_writers(session: Session):
+        for user_id in session.info.pop("written_user_ids", ()):
+            router.record_write(user_id)
+
+    @event.listens_for(session_factory, "after_soft_rollback")
+    def discard_writers(session: Session, _previous_transaction):
+        session.info.pop("written_user_ids", None)
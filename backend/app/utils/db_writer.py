@@ -0,0 +1,107 @@
+"""
+数据库单写线程
+SQLite 同一时刻只允许一个写事务，后台处理线程（会议转录/总结、闪记 AI、定时任务）
+与请求同时写库时会出现 "database is locked"。后台写操作统一提交到一个写线程串行执行，
+每个写操作使用独立的短事务；读操作不经过写线程（WAL 模式下读写互不阻塞）。
+
+非 SQLite 数据库或关闭 SQLITE_WRITER_QUEUE 时直接在调用线程执行。
+
+写线程是每个进程一个，只串行化本进程的后台写操作：请求处理中的写操作不经过写线程，
+多 worker 部署（uvicorn --workers N）时各进程的写线程之间也不互斥，
+这些写操作之间仍会争用 SQLite 写锁，只能依靠 busy_timeout 等待，超时仍会报 "database is locked"。
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.database import SessionLocal, engine
+
+
+class DBWriter:
+    """数据库单写线程（每个进程一个）"""
+
+    def __init__(self):
+        self.enabled = settings.SQLITE_WRITER_QUEUE and engine.dialect.name == "sqlite"
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @staticmethod
+    def _execute(func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        """在新会话中执行写操作并提交；出错回滚"""
+        db: Session = SessionLocal()
+        try:
+            result = func(db, *args, **kwargs)
+            db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            func, args, kwargs, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._execute(func, args, kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        提交写操作，返回 Future
+
+        Args:
+            func: 写操作 func(db, *args, **kwargs)，在独立会话中执行，返回后自动提交；
+                  返回值应为普通数据（会话关闭后 ORM 对象不可再访问）
+        """
+        if not self.enabled or self._stopped or threading.current_thread() is self._thread:
+            # 不排队：非 SQLite、已停止，或写线程内部的嵌套调用
+            future: Future = Future()
+            try:
+                future.set_result(self._execute(func, args, kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((func, args, kwargs, future))
+        return future
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """提交写操作并等待完成，返回 func 的返回值（异常原样抛出）"""
+        return self.submit(func, *args, **kwargs).result()
+
+    def stop(self, timeout: float = 10) -> None:
+        """处理完已排队的写操作后停止写线程（应用关闭时调用）"""
+        self._stopped = True
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("数据库写线程未在超时内退出")
+
+
+# 全局单例
+db_writer = DBWriter()
@@ -0,0 +1,47 @@
+"""
+ETag / 条件请求工具
+ETag 由记录的行版本生成，可在加载大字段之前只查询 version 列完成比对
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Response
+
+from config import settings
+
+# 详情需要客户端每次重新验证，且只能由客户端缓存
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(kind: str, record_id: str, version: int) -> str:
+    """
+    生成强 ETag
+
+    响应结构随版本发布可能变化，APP_VERSION 参与计算，升级后旧缓存自然失效
+    """
+    digest = hashlib.sha1(f"{settings.APP_VERSION}:{kind}:{record_id}:{version}".encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    判断 If-None-Match 是否命中（RFC 9110：If-None-Match 使用弱比较）
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """304 响应（不带响应体）"""
+    return Response(status_code=304, headers=etag_headers(etag))
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """200 响应的 ETag 相关响应头"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
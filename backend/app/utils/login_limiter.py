@@ -0,0 +1,167 @@
+"""
+登录失败限流
+按用户名和客户端 IP 分别统计时间窗口内的失败次数，超过上限后在窗口内拒绝登录，
+被拒绝的请求不会进入密码校验
+
+每次登录先占用一次尝试名额（检查与计数是一步原子操作），尝试在释放前按失败计数：
+并发的登录请求不会在任何失败被记录之前全部通过检查
+
+- AUTH_CACHE_BACKEND=redis 时失败记录保存在 Redis 有序集合中，多进程共享计数
+- 否则为进程内计数，多进程部署时实际上限为「上限 × 进程数」
+Redis 不可用时退回进程内计数
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from config import settings
+from app.utils.auth_cache import auth_cache
+
+# Redis 键前缀
+_REDIS_PREFIX = "cshine:login_failures:"
+
+
+class LoginLimiter:
+    """登录失败限流（滑动窗口）"""
+
+    def __init__(self, window: int, max_per_username: int, max_per_ip: int, max_keys: int = 10000):
+        self.window = window
+        self.max_per_username = max_per_username
+        self.max_per_ip = max_per_ip
+        self.max_keys = max_keys
+        # 键 -> [(时间, 尝试ID)]
+        self._failures: "OrderedDict[str, Deque[tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _keys(self, username: str, ip: Optional[str]) -> Iterable[tuple]:
+        yield f"user:{username.lower()}", self.max_per_username
+        if ip:
+            yield f"ip:{ip}", self.max_per_ip
+
+    def _prune(self, key: str, now: float) -> Deque[tuple]:
+        failures = self._failures.get(key)
+        if failures is None:
+            return deque()
+        while failures and failures[0][0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+        return failures
+
+    # ==================== Redis ====================
+
+    def _redis_acquire(self, client, username: str, ip: Optional[str], attempt_id: str) -> int:
+        now = time.time()
+        keys = list(self._keys(username, ip))
+        # 先计入本次尝试再比较（MULTI 事务），并发请求各自都能看到对方的尝试
+        pipe = client.pipeline()
+        for key, _ in keys:
+            redis_key = _REDIS_PREFIX + key
+            pipe.zremrangebyscore(redis_key, 0, now - self.window)
+            pipe.zadd(redis_key, {attempt_id: now})
+            pipe.expire(redis_key, self.window)
+            pipe.zcard(redis_key)
+            pipe.zrange(redis_key, 0, 0, withscores=True)
+        results = pipe.execute()
+
+        wait = 0.0
+        for i, (_, limit) in enumerate(keys):
+            count, oldest = results[i * 5 + 3], results[i * 5 + 4]
+            if limit > 0 and count > limit and oldest:
+                wait = max(wait, oldest[0][1] + self.window - now)
+        if wait > 0:
+            # 被拒绝的尝试不计数
+            self._redis_release(client, username, ip, attempt_id)
+            return int(wait) + 1
+        return 0
+
+    def _redis_release(self, client, username: str, ip: Optional[str], attempt_id: str) -> None:
+        pipe = client.pipeline()
+        for key, _ in self._keys(username, ip):
+            pipe.zrem(_REDIS_PREFIX + key, attempt_id)
+        pipe.execute()
+
+    # ==================== 接口 ====================
+
+    def acquire(self, username: str, ip: Optional[str]) -> Tuple[int, Optional[str]]:
+        """
+        占用一次登录尝试名额（检查并计数），尝试在 release/reset 之前按失败计数
+
+        使用 Redis 时为阻塞的网络调用，在异步接口中应放到线程池执行
+
+        Returns:
+            (需要等待的秒数, 尝试ID)：被限流时为 (秒数, None)，允许登录时为 (0, 尝试ID)
+        """
+        attempt_id = uuid.uuid4().hex
+        client = auth_cache.redis_client()
+        if client is not None:
+            try:
+                wait = self._redis_acquire(client, username, ip, attempt_id)
+                return (wait, None) if wait else (0, attempt_id)
+            except Exception as e:
+                logger.warning(f"登录限流访问 Redis 失败，使用进程内计数: {e}")
+
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for key, limit in self._keys(username, ip):
+                failures = self._prune(key, now)
+                if limit > 0 and len(failures) >= limit:
+                    wait = max(wait, failures[0][0] + self.window - now)
+            if wait > 0:
+                return int(wait) + 1, None
+
+            for key, _ in self._keys(username, ip):
+                failures = self._failures.setdefault(key, deque())
+                failures.append((now, attempt_id))
+                self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+        return 0, attempt_id
+
+    def release(self, username: str, ip: Optional[str], attempt_id: Optional[str]) -> None:
+        """本次尝试不算失败（如账号已禁用、服务端出错），撤销计数"""
+        if not attempt_id:
+            return
+        client = auth_cache.redis_client()
+        if client is not None:
+            try:
+                self._redis_release(client, username, ip, attempt_id)
+            except Exception as e:
+                logger.warning(f"登录限流撤销 Redis 记录失败: {e}")
+        with self._lock:
+            for key, _ in self._keys(username, ip):
+                failures = self._failures.get(key)
+                if failures is None:
+                    continue
+                for item in failures:
+                    if item[1] == attempt_id:
+                        failures.remove(item)
+                        break
+                if not failures:
+                    del self._failures[key]
+
+    def reset(self, username: str, ip: Optional[str], attempt_id: Optional[str]) -> None:
+        """登录成功后清除该用户名的失败记录，并撤销本次尝试（IP 的其他失败计数保留）"""
+        self.release(username, ip, attempt_id)
+        client = auth_cache.redis_client()
+        if client is not None:
+            try:
+                client.delete(f"{_REDIS_PREFIX}user:{username.lower()}")
+            except Exception as e:
+                logger.warning(f"登录限流清除 Redis 记录失败: {e}")
+        with self._lock:
+            self._failures.pop(f"user:{username.lower()}", None)
+
+
+# 全局单例
+admin_login_limiter = LoginLimiter(
+    window=settings.LOGIN_ATTEMPT_WINDOW,
+    max_per_username=settings.LOGIN_MAX_ATTEMPTS_PER_USERNAME,
+    max_per_ip=settings.LOGIN_MAX_ATTEMPTS_PER_IP,
+)
@@ -0,0 +1,227 @@
+"""
+进程内指标
+延迟直方图 + 计数器 + 仪表（读取时计算），通过管理员接口导出（JSON 或 Prometheus 文本格式）
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 默认延迟分桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """固定分桶直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按分桶线性插值估算分位数"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i >= len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict:
+        cumulative = 0
+        buckets = {}
+        for bound, n in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """指标注册表"""
+
+    def __init__(self):
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, int]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """记录一次耗时（秒）"""
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: int = 1, **labels) -> None:
+        """计数器累加"""
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + value
+
+    def gauge(self, name: str, func: Callable[[], float], **labels) -> None:
+        """注册仪表，导出时调用 func 取当前值（如连接池已借出的连接数）"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = func
+
+    def _gauge_values(self, prefix: str = "") -> Dict[str, Dict[LabelKey, Optional[float]]]:
+        with self._lock:
+            gauges = {
+                name: dict(series) for name, series in self._gauges.items() if name.startswith(prefix)
+            }
+        values = {}
+        for name, series in gauges.items():
+            values[name] = {}
+            for key, func in series.items():
+                try:
+                    values[name][key] = func()
+                except Exception:
+                    values[name][key] = None
+        return values
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """
+        计时上下文，退出时记录耗时；代码块中可修改 labels（如写入结果状态）
+
+        用法：
+            with metrics.timer("wechat_code2session_seconds", outcome="ok") as labels:
+                ...
+                labels["outcome"] = "error"
+        """
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self, prefix: str = "") -> Dict:
+        """
+        导出指标（JSON）
+
+        Args:
+            prefix: 只导出名称以此开头的指标
+        """
+        gauges = self._gauge_values(prefix)
+        with self._lock:
+            return {
+                "histograms": {
+                    name: [{"labels": dict(key), **h.to_dict()} for key, h in series.items()]
+                    for name, series in self._histograms.items()
+                    if name.startswith(prefix)
+                },
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._counters.items()
+                    if name.startswith(prefix)
+                },
+                "gauges": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in gauges.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        """导出 Prometheus 文本格式"""
+        lines: List[str] = []
+        gauges = self._gauge_values()
+
+        def fmt(labels: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{fmt(key, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{fmt(key)} {h.sum}")
+                    lines.append(f"{name}_count{fmt(key)} {h.count}")
+            for name, series in self._counters.items():
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{fmt(key)} {value}")
+        for name, series in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in series.items():
+                if value is not None:
+                    lines.append(f"{name}{fmt(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """清空指标"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# 全局单例
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """记录每个接口的请求耗时（按路由模板分组，避免路径参数导致序列过多）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            metrics.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status_holder["status"],
+            )
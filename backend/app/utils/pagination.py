@@ -0,0 +1,98 @@
+"""
+游标分页（keyset pagination）工具
+按排序键 (..., created_at, id) 定位下一页，翻页成本与页码无关
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import literal, tuple_
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    将排序键编码为不透明游标
+
+    Args:
+        values: 最后一条记录的排序键，如 (created_at, id)
+
+    Returns:
+        URL 安全的 base64 字符串
+    """
+    payload = [
+        {"$dt": v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    解码游标
+
+    Args:
+        cursor: encode_cursor 生成的游标
+        size: 期望的排序键个数
+
+    Returns:
+        排序键列表
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [
+            datetime.fromisoformat(v["$dt"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"无效的游标: {e}")
+
+    if len(values) != size:
+        raise ValueError("无效的游标: 排序键数量不匹配")
+
+    return values
+
+
+def apply_keyset(query, columns: Sequence, cursor: Optional[str]):
+    """
+    为按 columns 全部倒序排列的查询追加排序和游标条件
+
+    Args:
+        query: SQLAlchemy 查询
+        columns: 排序列（需唯一确定一行，最后一列通常是主键）
+        cursor: 上一页返回的 next_cursor，为空表示第一页
+
+    Returns:
+        追加了 ORDER BY 和 WHERE 条件的查询
+    """
+    query = query.order_by(*[col.desc() for col in columns])
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        # 按列类型绑定参数，保证 SQLite 中日期字符串的比较格式一致
+        bound = [literal(v, type_=col.type) for col, v in zip(columns, values)]
+        query = query.filter(tuple_(*columns) < tuple_(*bound))
+    return query
+
+
+def page_of(rows: list, page_size: int, key) -> tuple:
+    """
+    从多取一条的结果中截取当前页
+
+    Args:
+        rows: 查询结果（limit 为 page_size + 1）
+        page_size: 每页数量
+        key: 从一行结果中取排序键的函数
+
+    Returns:
+        (当前页数据, 是否有更多, 下一页游标)
+    """
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = encode_cursor(key(rows[-1])) if (has_more and rows) else None
+    return rows, has_more, next_cursor
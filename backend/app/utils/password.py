@@ -0,0 +1,82 @@
+"""
+密码哈希工具
+bcrypt 计算耗时 100ms 级，放到独立的有界线程池中执行，避免阻塞事件循环；
+排队数超过上限时直接拒绝，防止登录洪峰占满 CPU
+"""
+
+import asyncio
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from config import settings
+
+
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class PasswordHasherBusy(Exception):
+    """密码校验排队已满"""
+
+
+class PasswordHasher:
+    """bcrypt 哈希/校验（异步，有界并发）"""
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @staticmethod
+    def _check(plain_password: str, hashed_password: str) -> bool:
+        try:
+            return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+        except ValueError:
+            # 库中的哈希格式无效
+            return False
+
+    def _hash(self, plain_password: str) -> str:
+        return bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt(self.rounds)).decode("utf-8")
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """校验密码"""
+        return await self._run(self._check, plain_password, hashed_password)
+
+    async def hash(self, plain_password: str) -> str:
+        """生成哈希（使用配置的 cost）"""
+        return await self._run(self._hash, plain_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """哈希的 cost 与当前配置不一致时需要重新哈希"""
+        return self.cost_of(hashed_password) != self.rounds
+
+    @staticmethod
+    def cost_of(hashed_password: str) -> Optional[int]:
+        """解析 bcrypt 哈希中的 cost"""
+        match = _BCRYPT_COST.match(hashed_password or "")
+        return int(match.group(1)) if match else None
+
+
+# 全局单例
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+)
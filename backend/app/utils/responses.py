@@ -0,0 +1,43 @@
+"""
+快速 JSON 响应
+- 默认响应类：安装 orjson 且 FAST_JSON 开启时使用 ORJSONResponse
+- json_response：大响应（会议详情/列表）直接用 pydantic-core 序列化为 JSON，
+  跳过 FastAPI 的 model_dump -> 校验 -> jsonable 转换 -> json.dumps 多次中转
+"""
+
+from typing import Dict, Optional, Type
+
+from fastapi.responses import JSONResponse, Response
+from loguru import logger
+from pydantic import BaseModel
+
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+def default_response_class() -> Type[JSONResponse]:
+    """应用的默认响应类"""
+    if settings.FAST_JSON:
+        if orjson is not None:
+            from fastapi.responses import ORJSONResponse
+            return ORJSONResponse
+        logger.warning("FAST_JSON 已开启但未安装 orjson，使用标准 JSONResponse")
+    return JSONResponse
+
+
+def json_response(model: BaseModel, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    将 pydantic 模型一次性序列化为 JSON 响应
+
+    注意：直接返回 Response 时，路由中通过 Response 参数设置的响应头不会生效，需通过 headers 传入
+    """
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -2,9 +2,83 @@
 微信小程序工具
 """
 
+import asyncio
+from typing import Optional
+
 import httpx
 from loguru import logger
 from config import settings
+from app.utils.metrics import metrics
+
+
+CODE2SESSION_URL = "https://api.weixin.qq.com/sns/jscode2session"
+
+# 微信「系统繁忙」错误码，可重试
+_ERRCODE_BUSY = -1
+
+# 应用生命周期内复用的 HTTP 客户端（长连接池），按事件循环创建
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取共享的微信接口 HTTP 客户端（复用 TCP/TLS 连接）"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=settings.WECHAT_HTTP_CONNECT_TIMEOUT,
+                read=settings.WECHAT_HTTP_READ_TIMEOUT,
+                write=settings.WECHAT_HTTP_READ_TIMEOUT,
+                pool=settings.WECHAT_HTTP_CONNECT_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.WECHAT_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WECHAT_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=settings.WECHAT_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """关闭共享客户端（应用关闭时调用）"""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+async def _get_with_retry(url: str, params: dict) -> dict:
+    """
+    GET 请求，连接阶段失败/5xx/系统繁忙时有限次重试
+
+    读取超时不重试：请求可能已到达微信，code 只能使用一次，重试会得到「code 已使用」
+    """
+    attempts = settings.WECHAT_HTTP_MAX_RETRIES + 1
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        try:
+            response = await get_http_client().get(url, params=params)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            if last_attempt:
+                raise
+            logger.warning(f"WeChat API connect failed, retrying ({attempt + 1}): {e}")
+        else:
+            if response.status_code >= 500 and not last_attempt:
+                logger.warning(f"WeChat API {response.status_code}, retrying ({attempt + 1})")
+            else:
+                response.raise_for_status()
+                data = response.json()
+                if data.get("errcode") == _ERRCODE_BUSY and not last_attempt:
+                    logger.warning(f"WeChat API busy, retrying ({attempt + 1})")
+                else:
+                    return data
+        metrics.increment("wechat_http_retries_total")
+        await asyncio.sleep(0.1 * 2 ** attempt)
 
 
 async def code2session(code: str) -> dict:
@@ -44,7 +118,6 @@ async def code2session(code: str) -> dict:
         }
     
     # 生产环境：调用真实的微信 API
-    url = "https://api.weixin.qq.com/sns/jscode2session"
     params = {
         "appid": settings.WECHAT_APPID,
         "secret": settings.WECHAT_SECRET,
@@ -52,23 +125,22 @@ async def code2session(code: str) -> dict:
         "grant_type": "authorization_code"
     }
     
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=10.0)
-            data = response.json()
-            
-            if "errcode" in data and data["errcode"] != 0:
-                error_msg = data.get("errmsg", "Unknown error")
-                logger.error(f"WeChat code2session error: {error_msg}")
-                raise Exception(f"微信登录失败: {error_msg}")
-            
-            return {
-                "openid": data.get("openid"),
-                "session_key": data.get("session_key"),
-                "unionid": data.get("unionid")
-            }
+    with metrics.timer("wechat_code2session_seconds", outcome="ok") as labels:
+        try:
+            data = await _get_with_retry(CODE2SESSION_URL, params)
+        except httpx.HTTPError as e:
+            labels["outcome"] = "request_error"
+            logger.error(f"WeChat API request error: {e}")
+            raise Exception(f"微信接口请求失败: {str(e)}")
+        
+        if "errcode" in data and data["errcode"] != 0:
+            labels["outcome"] = "wechat_error"
+            error_msg = data.get("errmsg", "Unknown error")
+            logger.error(f"WeChat code2session error: {error_msg}")
+            raise Exception(f"微信登录失败: {error_msg}")
     
-    except httpx.RequestError as e:
-        logger.error(f"WeChat API request error: {e}")
-        raise Exception(f"微信接口请求失败: {str(e)}")
-
+    return {
+        "openid": data.get("openid"),
+        "session_key": data.get("session_key"),
+        "unionid": data.get("unionid")
+    }
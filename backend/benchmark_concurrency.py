@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+接口并发吞吐基准测试
+
+对比同一个 worker 内并发请求的吞吐量和 p99 延迟：
+  1. 旧路径：async def 接口里直接使用同步会话（查询阻塞事件循环，请求被串行化）
+  2. 新路径：
+     - 会议列表：普通 def 接口，FastAPI 在线程池中执行
+     - 处理状态轮询：async def 接口 + 异步会话（aiosqlite / asyncpg）
+
+使用临时 SQLite 库，每条 SQL 额外模拟 --latency-ms 毫秒的数据库往返延迟
+（在执行 SQL 的线程中等待，与真实网络数据库的阻塞位置一致）。
+
+注意：旧路径在事件循环中等待连接池，并发数超过连接池容量（DB_POOL_SIZE + DB_MAX_OVERFLOW，默认 5 + 10）时，
+归还连接的清理步骤也排在被阻塞的事件循环上，请求会卡到连接池超时，因此默认并发取 10。
+
+运行方式：
+    python benchmark_concurrency.py
+    python benchmark_concurrency.py --concurrency 100 --requests 1000 --latency-ms 10
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+# 使用临时数据库，必须在导入应用之前设置
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/benchmark.db"
+os.environ["DEBUG"] = "false"
+os.environ["LOG_LEVEL"] = "WARNING"
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+from fastapi import Depends
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import main
+from app.api import meeting as meeting_api
+from app.database import Base, engine, async_engine, get_db, SessionLocal
+from app.dependencies import get_current_user
+from app.models import User, Meeting, MeetingStatus
+from app.services.meeting_processor import check_meeting_ai_status
+from app.utils.jwt import create_access_token
+
+
+def install_latency(latency: float) -> None:
+    """每条 SQL 执行时在执行线程中等待 latency 秒，模拟数据库往返"""
+
+    def trace(_statement):
+        time.sleep(latency)
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, _record):
+        dbapi_connection.set_trace_callback(trace)
+
+    if async_engine is not None:
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def on_async_connect(dbapi_connection, _record):
+            # aiosqlite 在自己的线程中执行 SQL，回调同样在该线程中等待
+            dbapi_connection.await_(dbapi_connection._connection.set_trace_callback(trace))
+
+
+def register_blocking_routes() -> None:
+    """注册旧写法的对照接口：async def 中直接调用同步查询"""
+
+    @main.app.get("/bench/blocking/meeting/list")
+    async def blocking_meeting_list(
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ):
+        return meeting_api.get_meeting_list(
+            page=1, page_size=20, status=None, is_favorite=None, folder_id=None,
+            sort_by="time", cursor=None, with_total=True,
+            current_user=current_user, db=db
+        )
+
+    @main.app.get("/bench/blocking/meeting/{meeting_id}/status")
+    async def blocking_meeting_status(
+        meeting_id: str,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+    ):
+        db.query(Meeting.id).filter(Meeting.id == meeting_id, Meeting.user_id == current_user.id).first()
+        return check_meeting_ai_status(meeting_id)
+
+
+def seed(meetings: int):
+    """创建测试用户和会议"""
+    db = SessionLocal()
+    try:
+        user = User(openid="benchmark", nickname="benchmark")
+        db.add(user)
+        db.flush()
+        for i in range(meetings):
+            db.add(Meeting(
+                user_id=user.id,
+                title=f"基准测试会议 {i}",
+                transcript="会议内容" * 500,
+                summary="摘要" * 100,
+                status=MeetingStatus.PROCESSING if i == 0 else MeetingStatus.COMPLETED,
+            ))
+        db.commit()
+        first = db.query(Meeting.id).filter(Meeting.user_id == user.id).first()[0]
+        return user.id, first
+    finally:
+        db.close()
+
+
+async def run(client: httpx.AsyncClient, url: str, total: int, concurrency: int):
+    """并发请求 total 次，返回 (req/s, p50 ms, p99 ms)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    await one()  # 预热
+    latencies.clear()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return total / elapsed, p50, p99
+
+
+async def bench_all(args, user_id: str, meeting_id: str):
+    transport = httpx.ASGITransport(app=main.app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": user_id})}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        scenarios = [
+            ("会议列表", "/bench/blocking/meeting/list", "/api/v1/meeting/list"),
+            ("处理状态轮询", f"/bench/blocking/meeting/{meeting_id}/status", f"/api/v1/meeting/{meeting_id}/status"),
+        ]
+        for name, old_url, new_url in scenarios:
+            print(f"\n{name}（并发 {args.concurrency}，共 {args.requests} 次，每条 SQL 延迟 {args.latency_ms} ms）")
+            results = {}
+            for label, url in (("旧：async def + 同步会话", old_url), ("新", new_url)):
+                rps, p50, p99 = await run(client, url, args.requests, args.concurrency)
+                results[label] = rps
+                print(f"  {label:<28} {rps:8.1f} req/s   p50 {p50:8.1f} ms   p99 {p99:8.1f} ms")
+            old, new = results.values()
+            print(f"  吞吐提升: {new / old:.1f}x")
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def main_():
+    parser = argparse.ArgumentParser(description='接口并发吞吐基准测试')
+    parser.add_argument('--concurrency', type=int, default=10, help='并发请求数（旧路径不宜超过连接池容量）')
+    parser.add_argument('--requests', type=int, default=200, help='每个场景的请求总数')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='每条 SQL 模拟的数据库往返延迟（毫秒）')
+    parser.add_argument('--meetings', type=int, default=50, help='测试会议数')
+    args = parser.parse_args()
+
+    logger.remove()
+    Base.metadata.create_all(bind=engine)
+    user_id, meeting_id = seed(args.meetings)
+    install_latency(args.latency_ms / 1000)
+    engine.dispose()  # 让已有连接重新建立，装上延迟回调
+    register_blocking_routes()
+
+    print(f"异步引擎: {'已启用 (' + async_engine.url.drivername + ')' if async_engine is not None else '未启用（状态接口退回线程池）'}")
+    asyncio.run(bench_all(args, user_id, meeting_id))
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+JSON 响应序列化基准测试
+
+对比会议列表页/详情页在不同序列化路径下的耗时（不经过网络和数据库，只测序列化）：
+  1. 旧路径：每次 json.loads JSON 列 + FastAPI jsonable_encoder + json.dumps（JSONResponse）
+  2. ORJSONResponse：同上，但最终编码使用 orjson
+  3. 新路径：JSON 列解析缓存 + pydantic-core model_dump_json（json_response）
+
+运行方式：
+    python benchmark_json.py
+    python benchmark_json.py --page-size 50 --rounds 200
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models import Meeting, MeetingStatus
+from app.schemas import ResponseModel, MeetingListItem, MeetingListResponse, MeetingResponse
+from app.utils.responses import json_response, orjson
+
+
+def make_meeting(i: int, transcript_chars: int) -> Meeting:
+    """构造一条带 JSON 字段的会议（不入库）"""
+    paragraphs = [
+        {
+            "ParagraphId": f"p{n}",
+            "SpeakerId": str(n % 3 + 1),
+            "Words": [{"Id": w, "Start": n * 1000 + w * 100, "End": n * 1000 + w * 100 + 90, "Text": "字"} for w in range(10)],
+        }
+        for n in range(transcript_chars // 10)
+    ]
+    return Meeting(
+        id=f"00000000-0000-0000-0000-{i:012d}",
+        user_id="u",
+        title=f"产品评审会议 {i}",
+        participants=json.dumps(["张三", "李四", "王五"], ensure_ascii=False),
+        meeting_date=datetime(2025, 1, 1),
+        audio_url="https://example.com/audio.m4a",
+        audio_duration=3600,
+        transcript="会议内容" * (transcript_chars // 4),
+        transcript_paragraphs=json.dumps(paragraphs, ensure_ascii=False),
+        summary="本次会议讨论了发布计划" * 20,
+        mind_map="# 思维导图\n" * 50,
+        key_points=json.dumps([{"title": f"要点{k}", "content": "内容" * 20} for k in range(8)], ensure_ascii=False),
+        action_items=json.dumps([{"task": f"任务{k}", "assignee": "张三"} for k in range(5)], ensure_ascii=False),
+        tags=json.dumps(["产品", "评审", "发布"], ensure_ascii=False),
+        is_favorite=False,
+        is_viewed=True,
+        folder_id=None,
+        status=MeetingStatus.COMPLETED,
+        created_at=datetime(2025, 1, 1, 10, 0, 0),
+    )
+
+
+def old_from_orm_detail(obj):
+    """旧实现：每次调用都重新 json.loads 各 JSON 列"""
+    return MeetingResponse(
+        id=obj.id,
+        title=obj.title,
+        participants=json.loads(obj.participants) if obj.participants else None,
+        meeting_date=obj.meeting_date,
+        audio_url=obj.audio_url,
+        audio_duration=obj.audio_duration,
+        transcript=obj.transcript,
+        transcript_paragraphs=json.loads(obj.transcript_paragraphs) if obj.transcript_paragraphs else None,
+        summary=obj.summary,
+        mind_map=obj.mind_map,
+        key_points=json.loads(obj.key_points) if obj.key_points else None,
+        action_items=json.loads(obj.action_items) if obj.action_items else None,
+        is_favorite=obj.is_favorite,
+        is_viewed=obj.is_viewed,
+        tags=json.loads(obj.tags) if obj.tags else None,
+        folder_id=obj.folder_id,
+        status=obj.status.value,
+        created_at=obj.created_at,
+    )
+
+
+def fastapi_render(model, response_class=JSONResponse) -> bytes:
+    """模拟 FastAPI 默认路径：jsonable 转换后由响应类编码"""
+    return response_class(jsonable_encoder(model)).body
+
+
+def bench(name, func, rounds):
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = func()
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+    print(f"  {name:<44} {elapsed:8.3f} ms/次   {len(body) / 1024:8.1f} KB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 序列化基准测试')
+    parser.add_argument('--page-size', type=int, default=20, help='列表每页数量')
+    parser.add_argument('--transcript-chars', type=int, default=20000, help='详情页转录字数')
+    parser.add_argument('--rounds', type=int, default=100, help='每项重复次数')
+    args = parser.parse_args()
+
+    meetings = [make_meeting(i, 200) for i in range(args.page_size)]
+
+    def list_model():
+        return ResponseModel(data=MeetingListResponse(
+            total=1000, page=1, page_size=args.page_size,
+            items=[MeetingListItem.from_orm(m, has_transcript=True) for m in meetings],
+        ))
+
+    print(f"\n会议列表（每页 {args.page_size} 条）")
+    base = bench("JSONResponse（旧）", lambda: fastapi_render(list_model()), args.rounds)
+    if orjson is not None:
+        from fastapi.responses import ORJSONResponse
+        bench("ORJSONResponse", lambda: fastapi_render(list_model(), ORJSONResponse), args.rounds)
+    new = bench("json_response（model_dump_json）", lambda: json_response(list_model()).body, args.rounds)
+    print(f"  提升: {base / new:.1f}x")
+
+    detail = make_meeting(0, args.transcript_chars)
+
+    print(f"\n会议详情（转录 {args.transcript_chars} 字）")
+
+    def old_detail():
+        return fastapi_render(ResponseModel(data=old_from_orm_detail(detail)))
+
+    def new_detail():
+        detail.__dict__.pop("_json_cache", None)  # 每次模拟一个新请求（解析缓存不命中）
+        return json_response(ResponseModel(data=MeetingResponse.from_orm(detail))).body
+
+    base = bench("JSONResponse（旧）", old_detail, args.rounds)
+    new = bench("json_response（model_dump_json）", new_detail, args.rounds)
+    print(f"  提升: {base / new:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 使用 pydantic-settings 管理环境变量
 """
 
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -23,6 +23,25 @@ class Settings(BaseSettings):
         default="sqlite:///./cshine.db",
         description="数据库连接字符串"
     )
+    DB_ASYNC_ENABLED: bool = True  # 高频轮询接口使用异步驱动（aiosqlite / asyncpg）✨新增
+    DB_ECHO: bool = False  # 打印每条 SQL（仅排查问题时开启，不再跟随 DEBUG）✨新增
+    DB_POOL_SIZE: int = 5  # 连接池常驻连接数（每个进程、每个引擎）
+    DB_MAX_OVERFLOW: int = 10  # 高峰期允许额外创建的连接数
+    DB_POOL_TIMEOUT: int = 30  # 等待空闲连接的超时（秒）
+    DB_POOL_RECYCLE: int = 1800  # 连接最长复用时间（秒），避免被数据库/代理断开的空闲连接
+    
+    # 只读副本配置 ✨新增
+    DATABASE_REPLICA_URL: str = ""  # 只读副本连接串，留空则不启用读写分离
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # 副本延迟超过该值时读取退回主库
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 5.0  # 副本延迟查询间隔（秒）
+    DB_READ_YOUR_WRITES_SECONDS: float = 10.0  # 用户写入后该时间内的读取走主库（AUTH_CACHE_BACKEND=redis 时多进程共享记录）
+    
+    # SQLite 配置（仅 DATABASE_URL 为 SQLite 文件库时生效）✨新增
+    SQLITE_WAL: bool = True  # WAL 日志模式 + synchronous=NORMAL，读写互不阻塞
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 写锁等待时间（毫秒）
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 内存映射读取大小（字节）
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # 每个连接的页缓存（KB）
+    SQLITE_WRITER_QUEUE: bool = True  # 本进程后台任务的写操作经写线程串行执行（每个 worker 一个，请求中的写操作不经过，仍依赖 busy_timeout）
     
     # JWT 配置
     SECRET_KEY: str = Field(
@@ -32,6 +51,15 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7天
     
+    # 管理员密码配置 ✨新增
+    BCRYPT_ROUNDS: int = 12  # bcrypt cost，修改后管理员下次登录时自动重新哈希
+    PASSWORD_HASH_WORKERS: int = 2  # 密码校验线程数
+    PASSWORD_HASH_MAX_PENDING: int = 16  # 排队中的密码校验上限，超过返回 503
+    # 失败次数在 AUTH_CACHE_BACKEND=redis 时多进程共享；进程内计数时每个 worker 单独计数，实际上限为「上限 × worker 数」
+    LOGIN_ATTEMPT_WINDOW: int = 900  # 登录失败统计窗口（秒）
+    LOGIN_MAX_ATTEMPTS_PER_USERNAME: int = 5  # 窗口内同一用户名最多失败次数
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 20  # 窗口内同一 IP 最多失败次数
+    
     # 微信小程序配置
     # ⚠️ 必须配置！从微信公众平台获取：https://mp.weixin.qq.com/
     # 开发 → 开发管理 → 开发设置
@@ -43,6 +71,11 @@ class Settings(BaseSettings):
         default="",
         description="微信小程序 AppSecret（必填）"
     )
+    WECHAT_HTTP_CONNECT_TIMEOUT: float = 3.0  # 微信接口连接超时（秒）✨新增
+    WECHAT_HTTP_READ_TIMEOUT: float = 5.0  # 微信接口读取超时（秒）
+    WECHAT_HTTP_MAX_RETRIES: int = 2  # 连接失败/系统繁忙时的最大重试次数
+    WECHAT_HTTP_MAX_CONNECTIONS: int = 20  # 连接池大小
+    WECHAT_HTTP_KEEPALIVE_EXPIRY: float = 60.0  # 空闲长连接保留时间（秒）
     
     # Redis 配置
     REDIS_HOST: str = "localhost"
@@ -50,6 +83,12 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: str = ""
     
+    # 认证缓存配置 ✨新增
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_BACKEND: str = "memory"  # memory / redis（多进程部署时共享缓存与失效）
+    AUTH_CACHE_TTL: int = 300  # 缓存有效期（秒），停用账号最迟在该时间后对其他进程生效
+    AUTH_CACHE_MAX_ENTRIES: int = 10000  # 进程内缓存最大条目数
+    
     # 文件存储配置
     STORAGE_TYPE: str = "local"  # local / oss
     UPLOAD_DIR: str = "./uploads"
@@ -78,6 +117,11 @@ class Settings(BaseSettings):
     TINGWU_APP_KEY: str = ""  # 通义听悟 AppKey
     ALIBABA_CLOUD_ACCESS_KEY_ID: str = ""  # 阿里云 AccessKey ID
     ALIBABA_CLOUD_ACCESS_KEY_SECRET: str = ""  # 阿里云 AccessKey Secret
+    TINGWU_HTTP_CONNECT_TIMEOUT: float = 5.0  # 结果文件下载连接超时（秒）✨新增
+    TINGWU_HTTP_READ_TIMEOUT: float = 60.0  # 结果文件下载读取超时（秒，两次收到数据之间）
+    TINGWU_HTTP_MAX_RETRIES: int = 3  # 连接失败 / 429 / 5xx 时的最大重试次数
+    TINGWU_HTTP_MAX_CONNECTIONS: int = 16  # 下载连接池大小
+    TINGWU_DOWNLOAD_CONCURRENCY: int = 8  # 同时下载的结果文件数（所有任务共享）
     
     # 旧配置（保留备用）
     ASR_PROVIDER: str = "tingwu"  # tingwu / xunfei / tencent / aliyun
@@ -93,12 +137,56 @@ class Settings(BaseSettings):
     QWEN_API_KEY: str = ""
     QWEN_MODEL: str = "qwen-turbo"
     
+    # 语义检索配置 ✨新增
+    EMBEDDING_PROVIDER: str = "hashing"  # hashing（本地 CPU，无外部依赖）/ none（关闭）
+    EMBEDDING_DIM: int = 256  # 向量维度
+    EMBEDDING_MIN_SCORE: float = 0.15  # 低于该余弦相似度的结果视为不相关（随机投影噪声约 1/sqrt(维度)）
+    EMBEDDING_CACHE_USERS: int = 64  # 内存中缓存向量矩阵的用户数
+    
     # 管理员配置 ✨新增
     ADMIN_DEFAULT_PASSWORD: str = Field(
         default="admin123456",
         description="管理员默认密码（首次初始化时使用）"
     )
     
+    # 响应压缩配置 ✨新增（安装 brotli 包后优先使用 br 编码）
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # 小于该字节数的响应不压缩
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11
+    
+    # JSON 序列化 ✨新增：使用 orjson 作为默认响应编码（未安装时自动回退标准库）
+    FAST_JSON: bool = True
+    
+    # 统计配置 ✨新增
+    STATS_TIMEZONE: str = "Asia/Shanghai"  # 按该时区的自然日汇总统计数据
+    METRICS_ENABLED: bool = True  # 记录接口耗时直方图（GET /api/v1/admin/metrics 查看）
+    FOLDER_COUNT_RECONCILE_INTERVAL: int = 86400  # 知识库会议计数对账间隔（秒），0 表示不自动对账
+    ADMIN_ACTIVITY_FLUSH_INTERVAL: int = 5  # 管理员活跃时间批量写库间隔（秒）
+    ADMIN_ACTIVITY_THRESHOLD: int = 60  # 管理员活跃时间变化超过该秒数才写库
+    
+    # 后台任务队列 ✨新增
+    JOB_WORKERS: int = 8  # 工作线程总数（每个进程）
+    JOB_CONCURRENCY: str = "meeting_transcription=4,meeting_transcription_result=4,meeting_summary=2,flash_ai=4,flash_ai_result=4"  # 各类任务的并发上限（所有进程合计，未列出的类型上限为 JOB_WORKERS）
+    JOB_POLL_INTERVAL: float = 2.0  # 空闲时查询待执行任务的间隔（秒）
+    JOB_LEASE_SECONDS: int = 300  # 任务租约时长（秒），执行中每 1/3 租约续期一次
+    JOB_MAX_ATTEMPTS: int = 3  # 最多执行次数（含进程退出后重新领取）
+    JOB_RETRY_BACKOFF: int = 30  # 失败重试的基础延迟（秒），按次数指数增长
+    JOB_RETENTION_DAYS: int = 7  # 已成功任务保留天数（失败任务保留以便排查）
+    
+    # 通义听悟轮询 ✨新增（所有转写任务由一个轮询线程统一查询状态）
+    TINGWU_POLL_TICK: float = 1.0  # 轮询线程检查到期任务的间隔（秒）
+    TINGWU_POLL_MAX_QPS: int = 10  # 每秒最多查询次数（听悟接口限流）
+    TINGWU_POLL_CONCURRENCY: int = 4  # 同时进行的状态查询数
+    TINGWU_POLL_LEASE_SECONDS: int = 30  # 轮询租约时长（秒）：多进程部署时只有持有租约的进程轮询
+    TINGWU_POLL_MIN_INTERVAL: int = 2  # 同一任务两次查询的最小间隔（秒）
+    TINGWU_POLL_MAX_INTERVAL: int = 120  # 同一任务两次查询的最大间隔（秒）
+    TINGWU_POLL_UNKNOWN_MAX_INTERVAL: int = 10  # 音频时长未知的任务两次查询的最大间隔（秒）
+    TINGWU_POLL_BACKOFF: float = 1.5  # 超过预计完成时间后查询间隔的增长倍数
+    TINGWU_POLL_JITTER: float = 0.2  # 查询间隔的随机抖动比例，避免同时提交的任务同时查询
+    TINGWU_TURNAROUND_RATIO: float = 0.3  # 转写耗时 / 音频时长的初始估计（按实际完成情况自动修正）
+    TINGWU_TURNAROUND_OVERHEAD: int = 10  # 与音频时长无关的固定耗时（排队、下载音频等，秒）
+    
     # 日志配置
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "./logs/cshine.log"
@@ -113,6 +201,16 @@ class Settings(BaseSettings):
             return ["*"]
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    @property
+    def job_concurrency_map(self) -> Dict[str, int]:
+        """解析各类任务的并发上限（"类型=数量,..."）"""
+        limits = {}
+        for item in self.JOB_CONCURRENCY.split(","):
+            if "=" in item:
+                job_type, limit = item.split("=", 1)
+                limits[job_type.strip()] = int(limit)
+        return limits
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
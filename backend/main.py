@@ -14,6 +14,7 @@ import os
 from config import settings
 from app.database import engine, Base
 from app.api import api_router
+from app.utils.responses import default_response_class
 
 
 # 配置日志
@@ -34,6 +35,10 @@ logger.add(
 # 创建数据库表
 Base.metadata.create_all(bind=engine)
 
+# 创建全文检索索引
+from app.services.search import search_service
+search_service.ensure_schema(engine)
+
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -42,9 +47,27 @@ app = FastAPI(
     description="Cshine - AI 驱动的语音记录与灵感管理工具 API",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=default_response_class(),
 )
 
 
+# 响应压缩（转录/摘要等大字段，减少移动网络传输量）
+if settings.COMPRESSION_ENABLED:
+    from app.utils.compression import CompressionMiddleware
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+
+# 接口耗时指标
+if settings.METRICS_ENABLED:
+    from app.utils.metrics import MetricsMiddleware
+    app.add_middleware(MetricsMiddleware)
+
+
 # 配置 CORS
 app.add_middleware(
     CORSMiddleware,
@@ -114,6 +137,25 @@ async def startup_event():
         logger.success("✅ OSS 连接正常")
     else:
         logger.warning("⚠️  OSS 连接失败，请检查配置")
+    
+    # 知识库会议计数定期对账
+    from app.services.folder_count_service import folder_count_service
+    folder_count_service.start_reconciler(settings.FOLDER_COUNT_RECONCILE_INTERVAL)
+    
+    # 管理员活跃时间批量写库
+    from app.services.admin_activity_service import admin_activity_service
+    admin_activity_service.start_flusher(
+        settings.ADMIN_ACTIVITY_FLUSH_INTERVAL,
+        settings.ADMIN_ACTIVITY_THRESHOLD
+    )
+    
+    # 后台任务队列（会议转录/总结、闪记 AI）
+    from app.services.job_queue import job_queue
+    job_queue.start()
+    
+    # 通义听悟任务统一轮询
+    from app.services.tingwu_poller import tingwu_poller
+    tingwu_poller.start()
 
 
 # 关闭事件
@@ -121,6 +163,28 @@ async def startup_event():
 async def shutdown_event():
     """应用关闭时执行"""
     logger.info(f"{settings.APP_NAME} is shutting down...")
+    
+    from app.services.tingwu_poller import tingwu_poller
+    tingwu_poller.stop()
+    
+    from app.services.job_queue import job_queue
+    job_queue.stop()
+    
+    from app.services.folder_count_service import folder_count_service
+    folder_count_service.stop_reconciler()
+    
+    from app.services.admin_activity_service import admin_activity_service
+    admin_activity_service.stop_flusher()
+    
+    from app.utils.db_writer import db_writer
+    db_writer.stop()
+    
+    from app.utils.wechat import close_http_client
+    await close_http_client()
+    
+    from app.database import async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 if __name__ == "__main__":
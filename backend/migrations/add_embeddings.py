@@ -0,0 +1,67 @@
+"""
+数据库迁移：创建语义向量表并为已有闪记/会议生成向量
+
+更换 EMBEDDING_PROVIDER / EMBEDDING_DIM 后也需执行本脚本重建向量。
+
+运行方式：
+    python migrations/add_embeddings.py
+    python migrations/add_embeddings.py --user-id <用户ID>   # 只重建某个用户
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+
+from app.database import engine, SessionLocal
+from app.models import Embedding
+from app.services.embedding import embedding_service
+
+
+def run_migration(user_id=None):
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+    
+    print("创建 embeddings 表...")
+    Embedding.__table__.create(bind=engine, checkfirst=True)
+    
+    print("生成向量...")
+    db = SessionLocal()
+    try:
+        count = embedding_service.rebuild(db, user_id=user_id)
+    finally:
+        db.close()
+    
+    print(f"✅ 迁移完成，已生成 {count} 条向量")
+
+
+def rollback_migration():
+    """回滚迁移（删除向量表）"""
+    with engine.connect() as connection:
+        print("删除 embeddings 表...")
+        connection.execute(text("DROP TABLE IF EXISTS embeddings"))
+        connection.commit()
+    
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    parser.add_argument('--user-id', default=None, help='只重建指定用户的向量')
+    args = parser.parse_args()
+    
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration(user_id=args.user_id)
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,84 @@
+"""
+数据库迁移：添加知识库会议计数字段并根据已有会议回填
+- folders.meeting_count：知识库内会议数
+- users.uncategorized_meeting_count：未分类会议数
+
+计数出现偏差（如直接改库）时也可重复执行本脚本对账修复。
+
+运行方式：
+    python migrations/add_folder_meeting_count.py
+    python migrations/add_folder_meeting_count.py --user-id <用户ID>   # 只对账某个用户
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import inspect, text
+
+from app.database import engine, SessionLocal
+from app.services.folder_count_service import folder_count_service
+
+
+COLUMNS = [
+    ("folders", "meeting_count"),
+    ("users", "uncategorized_meeting_count"),
+]
+
+
+def run_migration(user_id=None):
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+
+    with engine.connect() as connection:
+        inspector = inspect(connection)
+        for table, column in COLUMNS:
+            columns = {c["name"] for c in inspector.get_columns(table)}
+            if column in columns:
+                print(f"⚠️  {table}.{column} 已存在，跳过")
+                continue
+
+            print(f"添加 {table}.{column} 字段...")
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+            connection.commit()
+
+    print("回填会议计数...")
+    db = SessionLocal()
+    try:
+        fixed = folder_count_service.reconcile(db, user_id=user_id)
+    finally:
+        db.close()
+
+    print(f"✅ 迁移完成，修正 {fixed} 行计数")
+
+
+def rollback_migration():
+    """回滚迁移（删除计数字段，SQLite 需 3.35+）"""
+    with engine.connect() as connection:
+        for table, column in COLUMNS:
+            print(f"删除 {table}.{column} 字段...")
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+            connection.commit()
+
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    parser.add_argument('--user-id', default=None, help='只对账指定用户的计数')
+    args = parser.parse_args()
+
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration(user_id=args.user_id)
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,56 @@
+"""
+数据库迁移：创建后台任务表 jobs
+
+运行方式：
+    python migrations/add_jobs.py
+    python migrations/add_jobs.py --rollback
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.models import Job
+
+
+def run_migration():
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+    
+    print("创建 jobs 表...")
+    Job.__table__.create(bind=engine, checkfirst=True)
+    
+    print("✅ 迁移完成")
+
+
+def rollback_migration():
+    """回滚迁移（删除任务表，未执行的任务会丢失）"""
+    with engine.connect() as connection:
+        print("删除 jobs 表...")
+        connection.execute(text("DROP TABLE IF EXISTS jobs"))
+        connection.commit()
+    
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    args = parser.parse_args()
+    
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration()
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
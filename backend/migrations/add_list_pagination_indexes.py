@@ -0,0 +1,71 @@
+"""
+数据库迁移：为会议/闪记列表添加游标分页索引
+
+新建数据库由 Base.metadata.create_all 自动创建索引，已有数据库需执行本脚本。
+CREATE INDEX IF NOT EXISTS 在 SQLite 和 PostgreSQL 上均可用。
+
+运行方式：
+    python migrations/add_list_pagination_indexes.py
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, text
+from config import settings
+
+
+INDEXES = [
+    ("ix_flashes_user_created", "flashes", "user_id, created_at, id"),
+    ("ix_meetings_user_created", "meetings", "user_id, created_at, id"),
+    ("ix_meetings_user_favorite_created", "meetings", "user_id, is_favorite, created_at, id"),
+]
+
+
+def run_migration():
+    """执行数据库迁移"""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    print("开始数据库迁移...")
+    
+    with engine.connect() as connection:
+        for name, table, columns in INDEXES:
+            print(f"创建索引 {name} ON {table}({columns})...")
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+            connection.commit()
+    
+    print("✅ 数据库迁移完成！")
+
+
+def rollback_migration():
+    """回滚迁移（删除索引）"""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as connection:
+        for name, _, _ in INDEXES:
+            print(f"删除索引 {name}...")
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            connection.commit()
+    
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    args = parser.parse_args()
+    
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration()
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
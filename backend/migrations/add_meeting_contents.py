@@ -0,0 +1,90 @@
+"""
+数据库迁移：添加会议共享内容表 meeting_contents 与 meetings.content_id 字段
+
+复制会议时副本与原会议共享同一条内容记录（写时复制），不再重复存储转录/摘要等大字段。
+已有的副本保持独立存储，不做转换。
+
+运行方式：
+    python migrations/add_meeting_contents.py
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import inspect, text
+
+from app.database import engine
+from app.models import MeetingContent
+
+
+def run_migration():
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+
+    print("创建 meeting_contents 表...")
+    MeetingContent.__table__.create(bind=engine, checkfirst=True)
+
+    with engine.connect() as connection:
+        columns = {column["name"] for column in inspect(connection).get_columns("meetings")}
+        if "content_id" in columns:
+            print("⚠️  meetings.content_id 已存在，跳过")
+        else:
+            print("添加 meetings.content_id 字段...")
+            connection.execute(text(
+                "ALTER TABLE meetings ADD COLUMN content_id VARCHAR(36) REFERENCES meeting_contents(id)"
+            ))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_meetings_content_id ON meetings (content_id)"
+            ))
+            connection.commit()
+
+    print("✅ 迁移完成")
+
+
+def rollback_migration():
+    """回滚迁移（先把共享内容拷回各会议，再删除字段和表）"""
+    with engine.connect() as connection:
+        print("把共享内容拷回会议...")
+        fields = ["transcript", "transcript_paragraphs", "summary", "mind_map", "key_points", "action_items"]
+        assignments = ", ".join(
+            f"{field} = (SELECT c.{field} FROM meeting_contents c WHERE c.id = meetings.content_id)"
+            for field in fields
+        )
+        connection.execute(text(
+            f"UPDATE meetings SET {assignments}, content_id = NULL WHERE content_id IS NOT NULL"
+        ))
+
+        if connection.dialect.name == "sqlite":
+            # SQLite 无法删除带外键约束的列，保留空字段
+            print("⚠️  SQLite 不支持删除外键字段，meetings.content_id 保留（已全部置空）")
+        else:
+            print("删除 meetings.content_id 字段...")
+            connection.execute(text("DROP INDEX IF EXISTS ix_meetings_content_id"))
+            connection.execute(text("ALTER TABLE meetings DROP COLUMN content_id"))
+
+        print("删除 meeting_contents 表...")
+        connection.execute(text("DROP TABLE IF EXISTS meeting_contents"))
+        connection.commit()
+
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    args = parser.parse_args()
+
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration()
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""
+数据库迁移：为会议添加通义听悟任务ID字段（转写任务提交后立即保存，重试时复用）
+- meetings.tingwu_task_id：转写中的听悟任务ID
+
+运行方式：
+    python migrations/add_meeting_tingwu_task_id.py
+    python migrations/add_meeting_tingwu_task_id.py --rollback
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import inspect, text
+
+from app.database import engine
+
+
+def run_migration():
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+
+    with engine.connect() as connection:
+        columns = {c["name"] for c in inspect(connection).get_columns("meetings")}
+        if "tingwu_task_id" in columns:
+            print("⚠️  meetings.tingwu_task_id 已存在，跳过")
+        else:
+            print("添加 meetings.tingwu_task_id 字段...")
+            connection.execute(text("ALTER TABLE meetings ADD COLUMN tingwu_task_id VARCHAR(100)"))
+            connection.commit()
+
+    print("✅ 迁移完成")
+
+
+def rollback_migration():
+    """回滚迁移（删除听悟任务ID字段，SQLite 需 3.35+）"""
+    with engine.connect() as connection:
+        print("删除 meetings.tingwu_task_id 字段...")
+        connection.execute(text("ALTER TABLE meetings DROP COLUMN tingwu_task_id"))
+        connection.commit()
+
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    args = parser.parse_args()
+
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration()
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,70 @@
+"""
+数据库迁移：为 flashes / meetings 表添加行版本字段 version（用于详情接口 ETag）
+
+运行方式：
+    python migrations/add_row_version.py
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import create_engine, inspect, text
+from config import settings
+
+
+TABLES = ["flashes", "meetings"]
+
+
+def run_migration():
+    """执行数据库迁移"""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    print("开始数据库迁移...")
+    
+    with engine.connect() as connection:
+        inspector = inspect(connection)
+        for table in TABLES:
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            if "version" in columns:
+                print(f"⚠️  {table}.version 已存在，跳过")
+                continue
+            
+            print(f"添加 {table}.version 字段...")
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+            connection.commit()
+    
+    print("✅ 迁移完成")
+
+
+def rollback_migration():
+    """回滚迁移（删除 version 字段，SQLite 需 3.35+）"""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as connection:
+        for table in TABLES:
+            print(f"删除 {table}.version 字段...")
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN version"))
+            connection.commit()
+    
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    args = parser.parse_args()
+    
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration()
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,74 @@
+"""
+数据库迁移：创建全文检索索引并为已有闪记/会议建立索引
+
+SQLite 使用 FTS5 虚表 search_fts，PostgreSQL 使用 search_documents.tsv 列（GIN 索引）。
+应用启动时会自动建表，但已有数据需执行本脚本回填；也可用于索引异常后的重建。
+
+运行方式：
+    python migrations/add_search_index.py
+    python migrations/add_search_index.py --user-id <用户ID>   # 只重建某个用户
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+
+from app.database import engine, SessionLocal
+from app.models import SearchDocument
+from app.services.search import search_service
+
+
+def run_migration(user_id=None):
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+    
+    print("创建 search_documents 表...")
+    SearchDocument.__table__.create(bind=engine, checkfirst=True)
+    
+    print("创建全文检索索引结构...")
+    search_service.ensure_schema(engine)
+    
+    print("回填索引...")
+    db = SessionLocal()
+    try:
+        count = search_service.rebuild(db, user_id=user_id)
+    finally:
+        db.close()
+    
+    print(f"✅ 迁移完成，已索引 {count} 条记录")
+
+
+def rollback_migration():
+    """回滚迁移（删除检索表）"""
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            print("删除 search_fts 虚表...")
+            connection.execute(text("DROP TABLE IF EXISTS search_fts"))
+        print("删除 search_documents 表...")
+        connection.execute(text("DROP TABLE IF EXISTS search_documents"))
+        connection.commit()
+    
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    parser.add_argument('--user-id', default=None, help='只重建指定用户的索引')
+    args = parser.parse_args()
+    
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration(user_id=args.user_id)
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
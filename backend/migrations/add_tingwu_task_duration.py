@@ -0,0 +1,62 @@
+"""
+数据库迁移：为 tingwu_tasks 添加音频时长字段（按预计完成时间安排轮询）
+- tingwu_tasks.audio_duration：音频时长（秒）
+
+运行方式：
+    python migrations/add_tingwu_task_duration.py
+    python migrations/add_tingwu_task_duration.py --rollback
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import inspect, text
+
+from app.database import engine
+
+
+def run_migration():
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+
+    with engine.connect() as connection:
+        columns = {c["name"] for c in inspect(connection).get_columns("tingwu_tasks")}
+        if "audio_duration" in columns:
+            print("⚠️  tingwu_tasks.audio_duration 已存在，跳过")
+        else:
+            print("添加 tingwu_tasks.audio_duration 字段...")
+            connection.execute(text("ALTER TABLE tingwu_tasks ADD COLUMN audio_duration INTEGER"))
+            connection.commit()
+
+    print("✅ 迁移完成")
+
+
+def rollback_migration():
+    """回滚迁移（删除音频时长字段，SQLite 需 3.35+）"""
+    with engine.connect() as connection:
+        print("删除 tingwu_tasks.audio_duration 字段...")
+        connection.execute(text("ALTER TABLE tingwu_tasks DROP COLUMN audio_duration"))
+        connection.commit()
+
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    args = parser.parse_args()
+
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration()
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,67 @@
+"""
+数据库迁移：创建每日统计汇总表并根据已有闪记/会议回填
+
+汇总数据出现偏差（如直接改库）时也可重复执行本脚本重建。
+
+运行方式：
+    python migrations/add_user_daily_stats.py
+    python migrations/add_user_daily_stats.py --user-id <用户ID>   # 只重建某个用户
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+
+from app.database import engine, SessionLocal
+from app.models import UserDailyStat
+from app.services.stats_service import stats_service
+
+
+def run_migration(user_id=None):
+    """执行数据库迁移"""
+    print("开始数据库迁移...")
+    
+    print("创建 user_daily_stats 表...")
+    UserDailyStat.__table__.create(bind=engine, checkfirst=True)
+    
+    print("回填统计汇总...")
+    db = SessionLocal()
+    try:
+        count = stats_service.rebuild(db, user_id=user_id)
+    finally:
+        db.close()
+    
+    print(f"✅ 迁移完成，共 {count} 行汇总")
+
+
+def rollback_migration():
+    """回滚迁移（删除汇总表）"""
+    with engine.connect() as connection:
+        print("删除 user_daily_stats 表...")
+        connection.execute(text("DROP TABLE IF EXISTS user_daily_stats"))
+        connection.commit()
+    
+    print("✅ 回滚完成")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    parser.add_argument('--rollback', action='store_true', help='回滚迁移')
+    parser.add_argument('--user-id', default=None, help='只重建指定用户的汇总')
+    args = parser.parse_args()
+    
+    try:
+        if args.rollback:
+            rollback_migration()
+        else:
+            run_migration(user_id=args.user_id)
+    except Exception as e:
+        print(f"❌ 迁移失败: {e}")
+        sys.exit(1)
@@ -271,6 +271,19 @@ Page({
     }
   },
 
+  /**
+   * 用标注接口的返回值更新本地映射，无需重新拉取全部说话人
+   */
+  updateSpeakerName(speaker) {
+    if (!speaker || !speaker.speaker_id) {
+      this.loadSpeakerMap()
+      return
+    }
+    const speakerMap = Object.assign({}, this.data.speakerMap)
+    speakerMap[speaker.speaker_id] = speaker.display_name
+    this.setData({ speakerMap })
+  },
+
   /**
    * 加载联系人列表
    */
@@ -460,14 +473,14 @@ Page({
     showLoading('标注中...')
     
     try {
-      await API.mapSpeaker(meetingId, {
+      const speaker = await API.mapSpeaker(meetingId, {
         speaker_id: currentSpeaker,
         contact_id: contactId
       })
       
       showToast('标注成功', 'success')
       this.closeSpeakerModal()
-      this.loadSpeakerMap()
+      this.updateSpeakerName(speaker)
     } catch (error) {
       console.error('标注失败:', error)
       showToast('标注失败', 'error')
@@ -491,14 +504,14 @@ Page({
           showLoading('标注中...')
           
           try {
-            await API.mapSpeaker(meetingId, {
+            const speaker = await API.mapSpeaker(meetingId, {
               speaker_id: currentSpeaker,
               custom_name: res.content
             })
             
             showToast('标注成功', 'success')
             this.closeSpeakerModal()
-            this.loadSpeakerMap()
+            this.updateSpeakerName(speaker)
           } catch (error) {
             console.error('标注失败:', error)
             showToast('标注失败', 'error')
@@ -15,6 +15,7 @@ Page({
     loading: false,
     refreshing: false,  // 下拉刷新状态
     hasMore: true,
+    nextCursor: null,   // 游标翻页：后端返回的 next_cursor
     
     // 筛选和排序
     currentFilter: 'all',  // all / favorite / processing / completed / failed
@@ -160,7 +161,8 @@ Page({
       this.setData({
         page: 1,
         meetingList: [],
-        hasMore: true
+        hasMore: true,
+        nextCursor: null
       })
     }
     
@@ -177,6 +179,12 @@ Page({
         page_size: this.data.pageSize,
         sort_by: this.data.currentSort
       }
+
+      // 加载更多时使用游标翻页，且不再重复统计总数
+      if (!refresh && this.data.nextCursor) {
+        params.cursor = this.data.nextCursor
+        params.with_total = false
+      }
       
       // 添加筛选条件
       if (this.data.currentFilter === 'favorite') {
@@ -204,8 +212,9 @@ Page({
         
         this.setData({
           meetingList: newList,
-          total: listData.total,
-          hasMore: newList.length < listData.total,
+          total: listData.total != null ? listData.total : this.data.total,
+          hasMore: listData.has_more,
+          nextCursor: listData.next_cursor || null,
           page: this.data.page + 1
         })
       }
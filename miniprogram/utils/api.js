@@ -59,7 +59,7 @@ function getFlashList(params = {}) {
  * @param {string} flashId 闪记ID
  */
 function getFlashDetail(flashId) {
-  return get(API_ENDPOINTS.FLASH_DETAIL + flashId)
+  return get(API_ENDPOINTS.FLASH_DETAIL + flashId, {}, { useEtag: true })
 }
 
 /**
@@ -95,6 +95,15 @@ function getAIStatus(flashId) {
   return get(API_ENDPOINTS.FLASH_AI_STATUS + flashId + '/ai-status')
 }
 
+/**
+ * 批量操作闪记（多选）
+ * @param {Array<string>} ids 闪记ID列表（最多100个）
+ * @param {string} action favorite / unfavorite / delete
+ */
+function batchFlashes(ids, action) {
+  return post(API_ENDPOINTS.FLASH_BATCH, { ids, action })
+}
+
 /**
  * ==================== 文件上传 ====================
  */
@@ -192,7 +201,7 @@ function getMeetingList(params = {}) {
  * @param {string} meetingId 会议ID
  */
 function getMeetingDetail(meetingId) {
-  return get(API_ENDPOINTS.MEETING_DETAIL + meetingId)
+  return get(API_ENDPOINTS.MEETING_DETAIL + meetingId, {}, { useEtag: true })
 }
 
 /**
@@ -258,6 +267,20 @@ function markMeetingViewed(meetingId) {
   return patch(API_ENDPOINTS.MEETING_UPDATE + meetingId + '/mark-viewed')
 }
 
+/**
+ * 批量操作会议（多选）
+ * @param {Array<string>} ids 会议ID列表（最多100个）
+ * @param {string} action move / favorite / unfavorite / mark_viewed / delete
+ * @param {number|null} folderId move 的目标知识库ID，null 表示移出知识库
+ */
+function batchMeetings(ids, action, folderId = null) {
+  const data = { ids, action }
+  if (action === 'move') {
+    data.folder_id = folderId
+  }
+  return post(API_ENDPOINTS.MEETING_BATCH, data)
+}
+
 /**
  * ==================== 联系人相关 ====================
  */
@@ -315,6 +338,15 @@ function mapSpeaker(meetingId, data) {
   return post(`${API_ENDPOINTS.MEETING_DETAIL}${meetingId}/speakers/map`, data, { showLoad: true })
 }
 
+/**
+ * 批量标注会议说话人（一次请求、一个事务）
+ * @param {string} meetingId 会议ID
+ * @param {Array<object>} items [{ speaker_id, contact_id, custom_name }]
+ */
+function batchMapSpeakers(meetingId, items) {
+  return post(`${API_ENDPOINTS.MEETING_DETAIL}${meetingId}/speakers/batch`, { items }, { showLoad: true })
+}
+
 /**
  * 获取会议说话人映射
  * @param {string} meetingId 会议ID
@@ -350,6 +382,7 @@ module.exports = {
   updateFlash,
   deleteFlash,
   toggleFavorite,
+  batchFlashes,
   getAIStatus,
   
   // 会议纪要
@@ -362,6 +395,7 @@ module.exports = {
   getMeetingStatus,
   toggleMeetingFavorite,
   markMeetingViewed,  // v0.9.10 新增
+  batchMeetings,
   
   // 文件上传
   uploadAudio,
@@ -383,6 +417,7 @@ module.exports = {
   
   // 说话人标注
   mapSpeaker,
+  batchMapSpeakers,
   getMeetingSpeakers,
 
   // 会议处理
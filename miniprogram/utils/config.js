@@ -60,6 +60,7 @@ const API_ENDPOINTS = {
   FLASH_DELETE: '/api/v1/flash/',  // 需要拼接 ID
   FLASH_FAVORITE: '/api/v1/flash/',  // 需要拼接 ID/favorite
   FLASH_AI_STATUS: '/api/v1/flash/',  // 需要拼接 ID/ai-status
+  FLASH_BATCH: '/api/v1/flash/batch',  // ✨新增 批量操作
   
   // 会议纪要相关
   MEETING_CREATE: '/api/v1/meeting/create',
@@ -68,6 +69,7 @@ const API_ENDPOINTS = {
   MEETING_UPDATE: '/api/v1/meeting/',  // 需要拼接 ID
   MEETING_DELETE: '/api/v1/meeting/',  // 需要拼接 ID
   MEETING_STATUS: '/api/v1/meeting/',  // 需要拼接 ID/status
+  MEETING_BATCH: '/api/v1/meeting/batch',  // ✨新增 批量操作
 
   // 知识库相关
   FOLDER_CREATE: '/api/v1/folders',
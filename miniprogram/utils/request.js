@@ -6,6 +6,24 @@
 const { API_BASE_URL, STORAGE_KEYS } = require('./config')
 const { showError, showLoading, hideLoading } = require('./toast')
 
+// 条件请求缓存：url -> { etag, data }，仅保存在内存中（详情接口按需开启）
+const ETAG_CACHE_SIZE = 20
+const etagCache = new Map()
+
+function getHeader(header, name) {
+  if (!header) return undefined
+  const key = Object.keys(header).find(k => k.toLowerCase() === name)
+  return key ? header[key] : undefined
+}
+
+function saveEtagCache(url, etag, data) {
+  etagCache.delete(url)
+  etagCache.set(url, { etag, data })
+  if (etagCache.size > ETAG_CACHE_SIZE) {
+    etagCache.delete(etagCache.keys().next().value)
+  }
+}
+
 /**
  * 发起请求
  * @param {Object} options 请求配置
@@ -19,7 +37,8 @@ function request(options) {
     header = {},
     needAuth = true,
     showLoad = false,
-    loadingText = '加载中...'
+    loadingText = '加载中...',
+    useEtag = false  // 携带 If-None-Match，304 时直接返回缓存数据
   } = options
 
   // 显示加载提示
@@ -50,6 +69,11 @@ function request(options) {
     requestHeader['Authorization'] = `Bearer ${token}`
   }
 
+  const cached = useEtag ? etagCache.get(url) : null
+  if (cached) {
+    requestHeader['If-None-Match'] = cached.etag
+  }
+
   return new Promise((resolve, reject) => {
     wx.request({
       url: fullUrl,
@@ -65,9 +89,16 @@ function request(options) {
         }
 
         // 处理响应
-        if (res.statusCode === 200) {
+        if (res.statusCode === 304 && cached) {
+          // 未修改，使用缓存（返回副本，避免页面修改数据后污染缓存）
+          resolve(JSON.parse(JSON.stringify(cached.data)))
+        } else if (res.statusCode === 200) {
           // 统一响应格式
           if (res.data && res.data.code === 200) {
+            const etag = useEtag && getHeader(res.header, 'etag')
+            if (etag) {
+              saveEtagCache(url, etag, res.data.data)
+            }
             resolve(res.data.data)
           } else {
             // 业务错误